@@ -5,7 +5,7 @@ Loads configuration from environment variables with sensible defaults.
 """
 
 import os
-from typing import Optional
+from typing import Literal, Optional
 from pydantic_settings import BaseSettings
 
 
@@ -30,14 +30,53 @@ class Settings(BaseSettings):
     llm_base_url: Optional[str] = None  # Provider API URL
     llm_max_tokens: int = 256  # Keep low for resource constraints
     llm_temperature: float = 0.1  # Low temperature for deterministic outputs
+    # llama.cpp server slot per task type, e.g. "classification:0,calculation:0,answer:1,joint:1";
+    # needs --parallel > highest slot id (a missing slot stalls its requests), so opt-in
+    llamacpp_slots: str = ""
+    # Restore (or pre-evaluate) the cached system prompts at startup
+    llamacpp_warm_start: bool = True
 
     # Performance Settings
-    request_timeout: int = 30  # Timeout for LLM requests in seconds
+    request_timeout: float = 30.0  # End-to-end budget per chat request in seconds
     max_context_length: int = 1500  # Leave headroom below 2048 token limit
+    llm_max_concurrency: int = 1  # LLM requests decoded at once (llama.cpp --parallel)
+    llm_max_queue: int = 8  # Requests allowed to wait; more get 503 + Retry-After
+
+    # Response Cache Settings
+    llm_cache_enabled: bool = True
+    llm_cache_max_entries: int = 512
+    llm_cache_ttl: int = 3600  # Seconds a cached response stays valid
+    llm_cache_max_temperature: float = 0.1  # Only cache (near-)deterministic calls
+    llm_cache_path: Optional[str] = None  # SQLite file to persist the cache, e.g. ~/.jarvis/llm_cache.db
+    llm_singleflight_enabled: bool = True  # Share concurrent identical LLM requests
+
+    # Local Intent Classifier Settings
+    local_classifier_enabled: bool = True  # Naive Bayes tier in front of the LLM
+    local_classifier_threshold: float = 0.8  # Min confidence to skip the LLM
+    intent_log_path: Optional[str] = "~/.jarvis/intent_examples.jsonl"  # Learned LLM classifications
+
+    # Intent Cache Settings (LLM classifications by normalized message)
+    intent_cache_enabled: bool = True
+    intent_cache_max_entries: int = 256
+    intent_cache_ttl: int = 86400  # Seconds a cached classification stays valid
+
+    # Tool Settings
+    tool_max_workers: int = 4  # Tools executed at once
+    tool_timeout: float = 2.0  # Seconds a tool may take before the answer goes ahead without it
+
+    # Timer Settings
+    timers_journal_path: Optional[str] = "~/.jarvis/timers.jsonl"  # Pending timers and reminders (None = not persisted)
+
+    # Metrics Settings
+    metrics_enabled: bool = True  # Serve latency histograms and token counts on /metrics
+    response_timings: bool = False  # Add per-stage timings to the chat response metadata
 
     # Feature Flags
     enable_command_routing: bool = True
     enable_intent_classification: bool = True
+    # "two_call": classify, then answer; "joint": when the LLM is needed to
+    # classify, one generation returns the intent label and then the answer
+    pipeline_mode: Literal["two_call", "joint"] = "two_call"
 
     class Config:
         env_file = ".env"
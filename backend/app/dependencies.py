@@ -0,0 +1,172 @@
+"""
+Application Services
+
+Long-lived objects shared by every request: the LLM provider stack, the
+context packer, intent classifier, command router, tool manager and
+timer scheduler. They are created once when the app starts (lifespan),
+kept on app.state and injected into endpoints through FastAPI
+dependencies; aclose() releases them at shutdown.
+"""
+
+from dataclasses import dataclass
+from fastapi import Depends, Request
+
+from .config import Settings
+from .llm import (
+    get_llm_provider,
+    BaseLLMProvider,
+    ResponseCache,
+    CachingProvider,
+    SingleFlightProvider,
+    AdmissionScheduler,
+    ScheduledProvider,
+    DeadlineProvider,
+    InstrumentedProvider,
+    parse_slot_map,
+)
+from .llm.cache import TTLCache
+from .services import (
+    IntentClassifier,
+    CommandRouter,
+    ContextPacker,
+    TokenCounter,
+    NaiveBayesIntentModel,
+)
+from .services.timer_scheduler import TimerScheduler
+from .tools.manager import ToolManager
+
+
+def _build_llm_provider(settings: Settings) -> BaseLLMProvider:
+    """Create the LLM provider with its metrics, scheduling, caching and deadline layers."""
+    provider = get_llm_provider(
+        provider_type=settings.llm_provider,
+        model_name=settings.llm_model_name,
+        base_url=settings.llm_base_url,
+        max_tokens=settings.llm_max_tokens,
+        temperature=settings.llm_temperature,
+        slots=parse_slot_map(settings.llamacpp_slots),
+        timeout=settings.request_timeout
+    )
+
+    # Innermost layer: records what the backend actually did
+    provider = InstrumentedProvider(provider, settings.llm_provider.lower())
+
+    # Only admitted requests reach the backend
+    scheduler = AdmissionScheduler(
+        max_concurrency=settings.llm_max_concurrency,
+        max_queue=settings.llm_max_queue
+    )
+    provider = ScheduledProvider(provider, scheduler)
+
+    if settings.llm_singleflight_enabled:
+        provider = SingleFlightProvider(provider)
+
+    if settings.llm_cache_enabled:
+        cache = ResponseCache(
+            max_entries=settings.llm_cache_max_entries,
+            ttl=settings.llm_cache_ttl,
+            path=settings.llm_cache_path
+        )
+        provider = CachingProvider(provider, cache, max_temperature=settings.llm_cache_max_temperature)
+
+    # Outermost layer: the deadline hint must not reach cache keys, and
+    # queue waits count against the request's budget
+    return DeadlineProvider(provider)
+
+
+def _build_intent_classifier(settings: Settings, llm_provider: BaseLLMProvider) -> IntentClassifier:
+    """Create the intent classifier with its local model and cache tiers."""
+    local_model = None
+    if settings.local_classifier_enabled:
+        local_model = NaiveBayesIntentModel.from_files(log_path=settings.intent_log_path)
+
+    intent_cache = None
+    if settings.intent_cache_enabled:
+        intent_cache = TTLCache(max_entries=settings.intent_cache_max_entries, ttl=settings.intent_cache_ttl)
+
+    return IntentClassifier(
+        llm_provider,
+        local_model=local_model,
+        local_threshold=settings.local_classifier_threshold,
+        intent_cache=intent_cache
+    )
+
+
+@dataclass
+class AppServices:
+    """Objects shared by all requests for the lifetime of the app."""
+    llm_provider: BaseLLMProvider
+    context_packer: ContextPacker  # Keeps token counts cached
+    intent_classifier: IntentClassifier  # Keeps the local model and tier statistics
+    command_router: CommandRouter
+    tool_manager: ToolManager
+    timer_scheduler: TimerScheduler
+
+    @classmethod
+    def create(cls, settings: Settings) -> "AppServices":
+        """
+        Create all services from the settings.
+
+        Args:
+            settings: Application settings
+
+        Returns:
+            Services (call start() before serving requests)
+        """
+        llm_provider = _build_llm_provider(settings)
+        context_packer = ContextPacker(TokenCounter(llm_provider), max_context_length=settings.max_context_length)
+        timer_scheduler = TimerScheduler(journal_path=settings.timers_journal_path)
+
+        return cls(
+            llm_provider=llm_provider,
+            context_packer=context_packer,
+            intent_classifier=_build_intent_classifier(settings, llm_provider),
+            command_router=CommandRouter(llm_provider, context_packer, timer_scheduler),
+            tool_manager=ToolManager(max_workers=settings.tool_max_workers, timeout=settings.tool_timeout),
+            timer_scheduler=timer_scheduler,
+        )
+
+    async def start(self) -> None:
+        """Start background work (the timer scheduler)."""
+        await self.timer_scheduler.start()
+
+    async def aclose(self) -> None:
+        """Stop background work and release files and connections."""
+        await self.timer_scheduler.stop()
+        self.tool_manager.close()
+        await self.llm_provider.aclose()
+
+
+def get_services(request: Request) -> AppServices:
+    """Get the services created at startup."""
+    return request.app.state.services
+
+
+def get_llm_provider_instance(services: AppServices = Depends(get_services)) -> BaseLLMProvider:
+    """Get the shared LLM provider."""
+    return services.llm_provider
+
+
+def get_context_packer_instance(services: AppServices = Depends(get_services)) -> ContextPacker:
+    """Get the shared context packer."""
+    return services.context_packer
+
+
+def get_intent_classifier_instance(services: AppServices = Depends(get_services)) -> IntentClassifier:
+    """Get the shared intent classifier."""
+    return services.intent_classifier
+
+
+def get_command_router_instance(services: AppServices = Depends(get_services)) -> CommandRouter:
+    """Get the shared command router."""
+    return services.command_router
+
+
+def get_tool_manager_instance(services: AppServices = Depends(get_services)) -> ToolManager:
+    """Get the shared tool manager."""
+    return services.tool_manager
+
+
+def get_timer_scheduler_instance(services: AppServices = Depends(get_services)) -> TimerScheduler:
+    """Get the shared timer scheduler."""
+    return services.timer_scheduler
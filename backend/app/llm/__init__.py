@@ -4,10 +4,15 @@ LLM Provider Factory
 Creates the appropriate LLM provider based on configuration.
 """
 
-from typing import Optional
-from .base import BaseLLMProvider, LLMResponse
+from typing import Optional, Dict
+from .base import BaseLLMProvider, LLMResponse, LLMTask, ProviderWrapper
+from .cache import ResponseCache, CachingProvider
+from .singleflight import SingleFlightProvider
+from .scheduler import AdmissionScheduler, ScheduledProvider, LLMOverloadedError
+from .deadline import Deadline, DeadlineProvider, DEADLINE_EXCEEDED
+from .instrumentation import InstrumentedProvider
 from .ollama_provider import OllamaProvider
-from .llamacpp_provider import LlamaCppProvider
+from .llamacpp_provider import LlamaCppProvider, parse_slot_map
 
 
 def get_llm_provider(
@@ -15,7 +20,9 @@ def get_llm_provider(
     model_name: Optional[str] = None,
     base_url: Optional[str] = None,
     max_tokens: int = 256,
-    temperature: float = 0.1
+    temperature: float = 0.1,
+    slots: Optional[Dict[str, int]] = None,
+    timeout: float = 30
 ) -> BaseLLMProvider:
     """
     Factory function to create LLM provider.
@@ -26,6 +33,8 @@ def get_llm_provider(
         base_url: Base URL for the provider API
         max_tokens: Maximum tokens to generate
         temperature: Sampling temperature
+        slots: llama.cpp server slot per task type (llamacpp only)
+        timeout: Seconds to wait for a completion
 
     Returns:
         Configured LLM provider instance
@@ -36,7 +45,8 @@ def get_llm_provider(
     if provider_type.lower() == "ollama":
         kwargs = {
             "max_tokens": max_tokens,
-            "temperature": temperature
+            "temperature": temperature,
+            "timeout": timeout
         }
         if model_name:
             kwargs["model_name"] = model_name
@@ -47,12 +57,15 @@ def get_llm_provider(
     elif provider_type.lower() == "llamacpp":
         kwargs = {
             "max_tokens": max_tokens,
-            "temperature": temperature
+            "temperature": temperature,
+            "timeout": timeout
         }
         if model_name:
             kwargs["model_name"] = model_name
         if base_url:
             kwargs["base_url"] = base_url
+        if slots:
+            kwargs["slots"] = slots
         return LlamaCppProvider(**kwargs)
 
     else:
@@ -64,5 +77,18 @@ __all__ = [
     "OllamaProvider",
     "LlamaCppProvider",
     "LLMResponse",
+    "LLMTask",
+    "ProviderWrapper",
+    "ResponseCache",
+    "CachingProvider",
+    "SingleFlightProvider",
+    "AdmissionScheduler",
+    "ScheduledProvider",
+    "LLMOverloadedError",
+    "Deadline",
+    "DeadlineProvider",
+    "DEADLINE_EXCEEDED",
+    "InstrumentedProvider",
+    "parse_slot_map",
     "get_llm_provider"
 ]
@@ -5,11 +5,26 @@ Provides a unified interface for different LLM backends (Ollama, llama.cpp).
 Designed for resource-constrained environments like Raspberry Pi 4.
 """
 
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any
+from enum import Enum
+from typing import Optional, Dict, Any, AsyncIterator, Tuple
 from dataclasses import dataclass
 
 
+class LLMTask(str, Enum):
+    """
+    Kind of work an LLM request does.
+
+    Passed as the task= request hint so provider layers can tell short
+    structured jobs from long free-form answers.
+    """
+    CLASSIFICATION = "classification"
+    CALCULATION = "calculation"
+    ANSWER = "answer"
+    JOINT = "joint"  # Intent label and answer in one generation
+
+
 @dataclass
 class LLMResponse:
     """Standard response format from LLM providers."""
@@ -17,14 +32,17 @@ class LLMResponse:
     tokens_used: Optional[int] = None
     model: Optional[str] = None
     error: Optional[str] = None
+    metadata: Optional[Dict[str, Any]] = None  # Backend details (prompt eval stats, ...)
 
 
 class BaseLLMProvider(ABC):
     """
     Abstract base class for LLM providers.
 
-    All providers must implement generate() to ensure consistent interface
-    regardless of the underlying LLM backend.
+    All providers must implement generate() and agenerate() to ensure a
+    consistent interface regardless of the underlying LLM backend.
+    Request handlers should use agenerate() so they never block the
+    event loop while the model is decoding.
     """
 
     def __init__(self, model_name: str, max_tokens: int = 256, temperature: float = 0.1):
@@ -47,7 +65,8 @@ class BaseLLMProvider(ABC):
         system_prompt: Optional[str] = None,
         max_tokens: Optional[int] = None,
         temperature: Optional[float] = None,
-        json_mode: bool = False
+        json_mode: bool = False,
+        **kwargs
     ) -> LLMResponse:
         """
         Generate text from the LLM.
@@ -58,12 +77,65 @@ class BaseLLMProvider(ABC):
             max_tokens: Override default max_tokens
             temperature: Override default temperature
             json_mode: Request JSON-formatted output
+            **kwargs: Optional request hints; providers ignore the ones
+                they don't support. Common hints: task (LLMTask),
+                json_schema (constrain JSON output to a schema), grammar
+                (GBNF grammar for free-form output, llama.cpp only),
+                partial_ok (a stream closed early still counts as a
+                usable result) and deadline (request Deadline, enforced
+                by DeadlineProvider)
 
         Returns:
             LLMResponse with generated text and metadata
         """
         pass
 
+    @abstractmethod
+    async def agenerate(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        json_mode: bool = False,
+        **kwargs
+    ) -> LLMResponse:
+        """
+        Generate text from the LLM without blocking the event loop.
+
+        Uses the shared keep-alive HTTP client pool. Arguments and return
+        value are the same as generate().
+        """
+        pass
+
+    async def astream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        json_mode: bool = False,
+        **kwargs
+    ) -> AsyncIterator[LLMResponse]:
+        """
+        Stream generated text from the LLM as it is decoded.
+
+        Yields one LLMResponse per text delta. The last chunk carries
+        tokens_used when the backend reports it. On failure a chunk with
+        error set is yielded and the stream ends.
+
+        The default implementation yields the agenerate() result as a
+        single chunk; providers with a streaming API should override it.
+        """
+        yield await self.agenerate(
+            prompt=prompt,
+            system_prompt=system_prompt,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            json_mode=json_mode,
+            **kwargs
+        )
+
     @abstractmethod
     def health_check(self) -> bool:
         """
@@ -73,3 +145,106 @@ class BaseLLMProvider(ABC):
             True if healthy, False otherwise
         """
         pass
+
+    async def ahealth_check(self) -> bool:
+        """
+        Async variant of health_check().
+
+        The default implementation runs health_check() in a worker thread;
+        providers with an async client should override it.
+        """
+        return await asyncio.to_thread(self.health_check)
+
+    async def acount_tokens(self, text: str) -> Optional[int]:
+        """
+        Count tokens in text with the model's tokenizer.
+
+        Returns:
+            Token count, or None if the backend can't tokenize (callers
+            should fall back to an estimate)
+        """
+        return None
+
+    async def warm_start(self, prefixes: Dict[str, Tuple[str, str]]) -> Dict[str, str]:
+        """
+        Prepare the backend's prompt cache for the standard prompt prefixes.
+
+        Args:
+            prefixes: Task type -> (system_prompt, prompt) to keep cached
+
+        Returns:
+            Task type -> outcome; empty if the backend has no prompt cache
+        """
+        return {}
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get runtime statistics (cache hits, queue depth, ...).
+
+        Returns:
+            Dictionary of statistics; empty for plain providers
+        """
+        return {}
+
+    async def aclose(self) -> None:
+        """Release resources held by the provider (called at shutdown)."""
+        return None
+
+
+class ProviderWrapper(BaseLLMProvider):
+    """
+    Base class for layers that wrap another provider (caching, ...).
+
+    Forwards every call to the wrapped provider. Subclasses override the
+    methods they add behaviour to. Unknown attributes are looked up on the
+    wrapped provider, so provider-specific methods stay reachable.
+    """
+
+    def __init__(self, provider: BaseLLMProvider):
+        """
+        Initialize wrapper.
+
+        Args:
+            provider: Provider to wrap
+        """
+        super().__init__(provider.model_name, provider.max_tokens, provider.temperature)
+        self.provider = provider
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called when normal lookup fails
+        if name == "provider":
+            raise AttributeError(name)
+        return getattr(self.provider, name)
+
+    def generate(self, prompt: str, **kwargs) -> LLMResponse:
+        return self.provider.generate(prompt, **kwargs)
+
+    async def agenerate(self, prompt: str, **kwargs) -> LLMResponse:
+        return await self.provider.agenerate(prompt, **kwargs)
+
+    async def astream(self, prompt: str, **kwargs) -> AsyncIterator[LLMResponse]:
+        stream = self.provider.astream(prompt, **kwargs)
+        try:
+            async for chunk in stream:
+                yield chunk
+        finally:
+            # Close now, not at garbage collection, when the caller stops early
+            await stream.aclose()
+
+    def health_check(self) -> bool:
+        return self.provider.health_check()
+
+    async def ahealth_check(self) -> bool:
+        return await self.provider.ahealth_check()
+
+    async def acount_tokens(self, text: str) -> Optional[int]:
+        return await self.provider.acount_tokens(text)
+
+    async def warm_start(self, prefixes: Dict[str, Tuple[str, str]]) -> Dict[str, str]:
+        return await self.provider.warm_start(prefixes)
+
+    def stats(self) -> Dict[str, Any]:
+        return self.provider.stats()
+
+    async def aclose(self) -> None:
+        await self.provider.aclose()
@@ -0,0 +1,337 @@
+"""
+LLM Response Cache
+
+LRU + TTL cache for deterministic LLM calls, with optional SQLite
+persistence so cached answers survive service restarts.
+
+Only low-temperature calls are cached: on the Pi a repeated intent
+classification or calculation costs seconds, a cache hit microseconds.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Dict, Any, AsyncIterator, Hashable
+
+from .base import ProviderWrapper, BaseLLMProvider, LLMResponse
+
+
+class TTLCache:
+    """
+    In-memory LRU cache with per-entry time-to-live.
+
+    Evicts the least recently used entry when full; expired entries are
+    dropped when they are looked up.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl: float = 3600.0):
+        """
+        Initialize cache.
+
+        Args:
+            max_entries: Maximum number of entries kept
+            ttl: Seconds an entry stays valid
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Look up a value, counting the hit or miss.
+
+        Returns:
+            Cached value, or None if missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+            self.misses += 1
+            return None
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entry if full."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and current size."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+        }
+
+
+class ResponseCache:
+    """
+    LLM response cache: in-memory LRU + TTL, optionally backed by SQLite.
+
+    Memory misses fall through to the SQLite store (if configured), so a
+    restarted service starts with the previous run's answers.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl: float = 3600.0, path: Optional[str] = None):
+        """
+        Initialize response cache.
+
+        Args:
+            max_entries: Maximum entries kept in memory and on disk
+            ttl: Seconds an entry stays valid
+            path: SQLite database file for persistence (None = memory only)
+        """
+        self.memory = TTLCache(max_entries, ttl)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_hits = 0
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+
+        if path:
+            db_path = Path(path).expanduser()
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(db_path), check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute("PRAGMA mmap_size=8388608")  # Read through mmap (8 MB)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, text TEXT NOT NULL, tokens_used INTEGER, "
+                "model TEXT, created_at REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_created ON responses (created_at)")
+            self._db.commit()
+
+    @staticmethod
+    def make_key(
+        model: Optional[str],
+        system_prompt: Optional[str],
+        prompt: str,
+        temperature: float,
+        max_tokens: int,
+        json_mode: bool,
+        extra: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Build a cache key from everything that affects the output.
+
+        Args:
+            extra: Additional request options that change the output
+
+        Returns:
+            Hex digest key
+        """
+        material = json.dumps(
+            [model, system_prompt, prompt, temperature, max_tokens, json_mode, extra or {}],
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[LLMResponse]:
+        """
+        Look up a cached response.
+
+        Returns:
+            Cached LLMResponse, or None on a miss
+        """
+        response = self.memory.get(key)
+        if response is not None or self._db is None:
+            return response
+
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT text, tokens_used, model, created_at FROM responses WHERE key = ?",
+                (key,)
+            ).fetchone()
+
+        if row is None or time.time() - row[3] > self.ttl:
+            return None
+
+        response = LLMResponse(text=row[0], tokens_used=row[1], model=row[2])
+        # Promote to memory; count it as a hit instead of the memory miss
+        self.memory.set(key, response)
+        self.memory.misses -= 1
+        self.memory.hits += 1
+        self.disk_hits += 1
+        return response
+
+    def set(self, key: str, response: LLMResponse) -> None:
+        """Store a successful response."""
+        if response.error:
+            return
+
+        # Backend details (prompt eval stats, ...) describe the original
+        # call, not a later cache hit
+        response = LLMResponse(text=response.text, tokens_used=response.tokens_used, model=response.model)
+        self.memory.set(key, response)
+
+        if self._db is None:
+            return
+
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, text, tokens_used, model, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, response.text, response.tokens_used, response.model, time.time())
+            )
+            # Drop expired rows and keep the store bounded (oldest first)
+            self._db.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,))
+            self._db.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._db.commit()
+
+    def close(self) -> None:
+        """Close the SQLite store."""
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+            self._db = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters."""
+        stats = self.memory.stats()
+        stats["disk_hits"] = self.disk_hits
+        stats["persistent"] = self._db is not None
+        return stats
+
+
+class CachingProvider(ProviderWrapper):
+    """
+    Provider layer that serves repeated deterministic calls from cache.
+
+    Calls with a temperature above max_temperature are passed through
+    untouched, since their output is meant to vary.
+    """
+
+    def __init__(self, provider: BaseLLMProvider, cache: ResponseCache, max_temperature: float = 0.1):
+        """
+        Initialize caching layer.
+
+        Args:
+            provider: Provider to wrap
+            cache: Response cache to use
+            max_temperature: Highest temperature that is still cached
+        """
+        super().__init__(provider)
+        self.cache = cache
+        self.max_temperature = max_temperature
+
+    def _cache_key(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        json_mode: bool = False,
+        **kwargs
+    ) -> Optional[str]:
+        """Get the cache key for a call, or None if it must not be cached."""
+        temperature = temperature if temperature is not None else self.provider.temperature
+        if temperature > self.max_temperature:
+            return None
+
+        return ResponseCache.make_key(
+            self.provider.model_name,
+            system_prompt,
+            prompt,
+            temperature,
+            max_tokens or self.provider.max_tokens,
+            json_mode,
+            kwargs
+        )
+
+    def generate(self, prompt: str, **kwargs) -> LLMResponse:
+        key = self._cache_key(prompt, **kwargs)
+        if key is None:
+            return self.provider.generate(prompt, **kwargs)
+
+        response = self.cache.get(key)
+        if response is None:
+            response = self.provider.generate(prompt, **kwargs)
+            self.cache.set(key, response)
+        return response
+
+    async def agenerate(self, prompt: str, **kwargs) -> LLMResponse:
+        key = self._cache_key(prompt, **kwargs)
+        if key is None:
+            return await self.provider.agenerate(prompt, **kwargs)
+
+        response = self.cache.get(key)
+        if response is None:
+            response = await self.provider.agenerate(prompt, **kwargs)
+            self.cache.set(key, response)
+        return response
+
+    async def astream(self, prompt: str, **kwargs) -> AsyncIterator[LLMResponse]:
+        key = self._cache_key(prompt, **kwargs)
+        cached = self.cache.get(key) if key is not None else None
+
+        if cached is not None:
+            yield cached
+            return
+
+        # Only a stream that ran to completion without error is stored,
+        # or one the caller closed early if it accepts partial output (a
+        # stream cancelled by a deadline is cut, not finished, so it is not)
+        text = ""
+        tokens_used = None
+        complete = False
+        closed_early = False
+        stream = self.provider.astream(prompt, **kwargs)
+        try:
+            async for chunk in stream:
+                if chunk.error:
+                    key = None
+                text += chunk.text
+                tokens_used = chunk.tokens_used or tokens_used
+                try:
+                    yield chunk
+                except GeneratorExit:
+                    closed_early = True
+                    raise
+            complete = True
+        finally:
+            await stream.aclose()
+            if key is not None and text and (complete or (closed_early and kwargs.get("partial_ok"))):
+                self.cache.set(key, LLMResponse(text=text.strip(), tokens_used=tokens_used, model=self.model_name))
+
+    def stats(self) -> Dict[str, Any]:
+        stats = dict(self.provider.stats())
+        stats["cache"] = self.cache.stats()
+        return stats
+
+    async def aclose(self) -> None:
+        self.cache.close()
+        await self.provider.aclose()
@@ -0,0 +1,206 @@
+"""
+Request Deadlines
+
+A Deadline is created when a chat request arrives (REQUEST_TIMEOUT) and
+handed to every stage: tools, intent classification and the answer.
+Each stage waits at most for the remaining budget, and work still running
+when it runs out is cancelled. Stages cut short are recorded on the
+deadline, so the response can say which results are partial.
+
+DeadlineProvider enforces the deadline= request hint for LLM calls: it
+shrinks max_tokens to what the remaining time allows (from the decode
+speed it observes) and stops generations at the deadline, keeping the
+text decoded so far.
+"""
+
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from .base import BaseLLMProvider, LLMResponse, ProviderWrapper
+
+
+# Error of LLM responses cut short by the deadline
+DEADLINE_EXCEEDED = "Deadline exceeded"
+
+# Starting estimates until generations have been observed (a small
+# quantized model on a Raspberry Pi 4)
+DEFAULT_TOKENS_PER_SECOND = 8.0
+DEFAULT_FIRST_TOKEN_SECONDS = 1.0
+
+# Weight of each new observation in the running estimates
+ESTIMATE_WEIGHT = 0.2
+
+# Generations with fewer text chunks don't update the decode speed
+MIN_OBSERVED_CHUNKS = 8
+
+# max_tokens is never shrunk below this
+MIN_TOKENS = 16
+
+
+class Deadline:
+    """Point in time a request has to be answered by."""
+
+    def __init__(self, seconds: Optional[float] = None):
+        """
+        Initialize deadline.
+
+        Args:
+            seconds: Budget from now (None = no deadline)
+        """
+        self.budget = seconds
+        self.expires_at = time.monotonic() + seconds if seconds is not None else None
+        self.cut: List[str] = []  # Stages stopped by the deadline, in order
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left (never negative), or None without a deadline."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        """Check whether the budget is used up."""
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def timeout(self, limit: Optional[float] = None) -> Optional[float]:
+        """
+        Get the time a stage may take.
+
+        Args:
+            limit: The stage's own timeout (None = no limit)
+
+        Returns:
+            The smaller of the limit and the remaining budget (None if
+            neither applies)
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return limit
+        return remaining if limit is None else min(limit, remaining)
+
+    def mark_cut(self, stage: str) -> None:
+        """Record that a stage was stopped by the deadline."""
+        if stage not in self.cut:
+            self.cut.append(stage)
+
+
+def _stage(kwargs: Dict[str, Any]) -> str:
+    """Stage name of an LLM call, from its task hint ("llm_answer", ...)."""
+    task = kwargs.get("task")
+    return f"llm_{getattr(task, 'value', task) or 'request'}"
+
+
+class DeadlineProvider(ProviderWrapper):
+    """
+    Enforces the deadline= request hint on a provider.
+
+    Must be the outermost layer: the hint is removed before the call is
+    passed on (it must not reach cache keys), the shrunk max_tokens is
+    part of the cache key, and a cancelled stream is not cached.
+    """
+
+    def __init__(self, provider: BaseLLMProvider):
+        """
+        Initialize wrapper.
+
+        Args:
+            provider: Provider to wrap
+        """
+        super().__init__(provider)
+        self.tokens_per_second = DEFAULT_TOKENS_PER_SECOND
+        self.first_token_seconds = DEFAULT_FIRST_TOKEN_SECONDS
+        self.shrunk = 0
+        self.cut = 0
+
+    def _max_tokens(self, deadline: Deadline, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Limit max_tokens to what can be decoded in the remaining time."""
+        requested = kwargs.get("max_tokens") or self.max_tokens
+        remaining = deadline.remaining()
+        if remaining is None:
+            return kwargs
+
+        affordable = int((remaining - self.first_token_seconds) * self.tokens_per_second)
+        if affordable >= requested:
+            return kwargs
+
+        self.shrunk += 1
+        return dict(kwargs, max_tokens=max(MIN_TOKENS, affordable))
+
+    def _expired(self, deadline: Deadline, kwargs: Dict[str, Any]) -> LLMResponse:
+        """Record a cut and build the response for it."""
+        self.cut += 1
+        deadline.mark_cut(_stage(kwargs))
+        return LLMResponse(text="", model=self.model_name, error=DEADLINE_EXCEEDED)
+
+    def _observe(self, first_token: float, chunks: int, decode: float) -> None:
+        """Update the time-to-first-token and decode speed estimates."""
+        self.first_token_seconds += ESTIMATE_WEIGHT * (first_token - self.first_token_seconds)
+        if chunks >= MIN_OBSERVED_CHUNKS and decode > 0:
+            rate = (chunks - 1) / decode
+            self.tokens_per_second += ESTIMATE_WEIGHT * (rate - self.tokens_per_second)
+
+    def generate(self, prompt: str, **kwargs) -> LLMResponse:
+        deadline = kwargs.pop("deadline", None)
+        if deadline is not None:
+            kwargs = self._max_tokens(deadline, kwargs)
+        return self.provider.generate(prompt, **kwargs)
+
+    async def agenerate(self, prompt: str, **kwargs) -> LLMResponse:
+        deadline = kwargs.pop("deadline", None)
+        if deadline is None:
+            return await self.provider.agenerate(prompt, **kwargs)
+        if deadline.expired():
+            return self._expired(deadline, kwargs)
+
+        kwargs = self._max_tokens(deadline, kwargs)
+        try:
+            return await asyncio.wait_for(self.provider.agenerate(prompt, **kwargs), deadline.remaining())
+        except asyncio.TimeoutError:
+            return self._expired(deadline, kwargs)
+
+    async def astream(self, prompt: str, **kwargs) -> AsyncIterator[LLMResponse]:
+        deadline = kwargs.pop("deadline", None)
+        if deadline is not None and deadline.expired():
+            yield self._expired(deadline, kwargs)
+            return
+        if deadline is not None:
+            kwargs = self._max_tokens(deadline, kwargs)
+
+        started = time.monotonic()
+        first_token = None
+        chunks = 0
+        stream = self.provider.astream(prompt, **kwargs)
+        try:
+            while True:
+                try:
+                    # Cancelling the pending read cancels the generation
+                    chunk = await asyncio.wait_for(
+                        stream.__anext__(), deadline.remaining() if deadline is not None else None
+                    )
+                except StopAsyncIteration:
+                    break
+                except asyncio.TimeoutError:
+                    # The text streamed so far is the partial answer
+                    yield self._expired(deadline, kwargs)
+                    return
+
+                if chunk.text:
+                    chunks += 1
+                    if first_token is None:
+                        first_token = time.monotonic()
+                yield chunk
+        finally:
+            await stream.aclose()
+
+        if first_token is not None:
+            self._observe(first_token - started, chunks, time.monotonic() - first_token)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = dict(self.provider.stats())
+        stats["deadline"] = {
+            "shrunk": self.shrunk,
+            "cut": self.cut,
+            "tokens_per_second": round(self.tokens_per_second, 2),
+            "first_token_seconds": round(self.first_token_seconds, 3),
+        }
+        return stats
@@ -0,0 +1,133 @@
+"""
+JSON Schema to GBNF
+
+Builds llama.cpp grammars from a small subset of JSON Schema, so
+structured outputs can only take the shape the caller expects.
+
+The generic JSON grammar lets a small model wander through free-form
+objects before it closes the brace. A schema grammar pins every key and
+enum value, bounds string lengths and object sizes, and allows no
+whitespace, so the model only decodes the tokens that carry information.
+
+Supported schema keywords:
+- enum (string values)
+- type "string" with maxLength
+- type "number" (minimum 0 / maximum 1 gives a short unit-interval number)
+- type "integer", "boolean"
+- type "object" with properties: either all properties required (emitted
+  in declaration order) or none required (up to maxProperties members;
+  the grammar does not prevent a key from repeating)
+"""
+
+import json
+import re
+from typing import Any, Dict, List
+
+
+# Default maximum string length when the schema has no maxLength
+DEFAULT_MAX_LENGTH = 64
+
+_STRING_CHAR = '[^"\\\\\\x7F\\x00-\\x1F]'
+
+
+def _literal(value: str) -> str:
+    """GBNF literal matching the JSON encoding of a string."""
+    return json.dumps(json.dumps(value))
+
+
+def _repeat(item: str, max_count: int) -> str:
+    """
+    Match item 0..max_count times.
+
+    Written as nested optionals rather than {0,n}, which older llama.cpp
+    servers do not parse.
+    """
+    expression = ""
+    for _ in range(max_count):
+        expression = f"({item} {expression})?" if expression else f"({item})?"
+    return expression
+
+
+class _GrammarBuilder:
+    """Collects named rules while walking a schema."""
+
+    def __init__(self):
+        self.rules: Dict[str, str] = {}
+
+    def add(self, name: str, body: str) -> str:
+        """Register a rule and return its name."""
+        self.rules[name] = body
+        return name
+
+    def visit(self, schema: Dict[str, Any], name: str) -> str:
+        """Build the rule for a schema node; returns the rule name."""
+        if "enum" in schema:
+            return self.add(name, " | ".join(_literal(str(value)) for value in schema["enum"]))
+
+        kind = schema.get("type")
+
+        if kind == "string":
+            # Shared by all strings of the same maximum length
+            max_length = schema.get("maxLength", DEFAULT_MAX_LENGTH)
+            char = self.add("char", _STRING_CHAR)
+            return self.add(f"string-{max_length}", f'"\\"" {_repeat(char, max_length)} "\\""')
+
+        if kind == "number":
+            if schema.get("minimum") == 0 and schema.get("maximum") == 1:
+                return self.add(name, '"0" ("." [0-9] [0-9]?)? | "1" (".0")?')
+            return self.add(name, '"-"? [0-9]+ ("." [0-9]+)?')
+
+        if kind == "integer":
+            return self.add(name, '"-"? [0-9]+')
+
+        if kind == "boolean":
+            return self.add(name, '"true" | "false"')
+
+        if kind == "object":
+            return self._visit_object(schema, name)
+
+        raise ValueError(f"Unsupported schema for grammar: {schema}")
+
+    def _visit_object(self, schema: Dict[str, Any], name: str) -> str:
+        properties: Dict[str, Any] = schema.get("properties", {})
+        required: List[str] = schema.get("required", [])
+
+        members = []
+        for key, subschema in properties.items():
+            value_rule = self.visit(subschema, f"{name}-{re.sub('[^a-zA-Z0-9]+', '-', key)}")
+            members.append(f'{_literal(key)} ":" {value_rule}')
+
+        if properties and set(required) == set(properties):
+            return self.add(name, '"{" ' + ' "," '.join(members) + ' "}"')
+
+        if required:
+            raise ValueError("Objects must have all or none of their properties required")
+
+        if not members:
+            return self.add(name, '"{}"')
+
+        member_rule = self.add(f"{name}-member", " | ".join(members))
+        max_properties = schema.get("maxProperties", len(members))
+        more = _repeat(f'"," {member_rule}', max_properties - 1)
+        return self.add(name, f'"{{" ({member_rule} {more})? "}}"')
+
+
+def json_schema_to_gbnf(schema: Dict[str, Any]) -> str:
+    """
+    Build a GBNF grammar for a JSON schema.
+
+    Args:
+        schema: JSON schema (supported subset, see module docstring)
+
+    Returns:
+        Grammar text with a root rule
+
+    Raises:
+        ValueError: If the schema uses unsupported features
+    """
+    builder = _GrammarBuilder()
+    builder.visit(schema, "root")
+    # The root rule goes first, the rules it references after it
+    rules = [f"root ::= {builder.rules.pop('root')}"]
+    rules += [f"{name} ::= {body}" for name, body in builder.rules.items()]
+    return "\n".join(rules)
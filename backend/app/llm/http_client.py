@@ -0,0 +1,51 @@
+"""
+Shared HTTP Client
+
+A single keep-alive connection pool used by all async LLM providers.
+Reusing connections avoids a TCP handshake per request and lets many
+chat requests wait on the LLM without blocking the event loop.
+"""
+
+from typing import Optional
+
+import httpx
+
+
+# The LLM server is local and decodes few sequences at once, so a small
+# pool is enough; extra requests wait for a free connection.
+MAX_CONNECTIONS = 16
+MAX_KEEPALIVE_CONNECTIONS = 8
+KEEPALIVE_EXPIRY = 60.0  # seconds
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get the shared async HTTP client, creating it on first use.
+
+    Returns:
+        Process-wide httpx.AsyncClient with a keep-alive pool
+    """
+    global _client
+
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(30.0, connect=5.0),
+        )
+
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client and release pooled connections."""
+    global _client
+
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
@@ -0,0 +1,104 @@
+"""
+LLM Instrumentation
+
+Records every request that reaches the LLM backend in the metrics
+(app/metrics.py): request time, the prompt evaluation and decode times
+and token counts the backend reports, and the outcome. The usage is also
+added to the timings of the chat request that made the call.
+
+Wraps the backend provider directly (innermost layer), so cache hits and
+shared single-flight generations are not counted twice and the times
+exclude waiting in the admission queue.
+"""
+
+import time
+from typing import Any, AsyncIterator, Dict, Optional
+
+from .base import BaseLLMProvider, LLMResponse, ProviderWrapper
+from ..metrics import (
+    LLM_DECODE_SECONDS,
+    LLM_PROMPT_EVAL_SECONDS,
+    LLM_REQUESTS,
+    LLM_SECONDS,
+    LLM_TOKENS,
+    current_timings,
+)
+
+
+# Usage fields counted in jarvis_llm_tokens_total, by token kind
+_TOKEN_KINDS = {
+    "prompt_evaluated": "prompt_evaluated",
+    "prompt_reused": "prompt_reused",
+    "completion_tokens": "completion",
+}
+
+
+class InstrumentedProvider(ProviderWrapper):
+    """Provider layer that records backend requests in the metrics."""
+
+    def __init__(self, provider: BaseLLMProvider, name: str):
+        """
+        Initialize instrumentation layer.
+
+        Args:
+            provider: Backend provider to wrap
+            name: Provider label of the metrics ("llamacpp", "ollama")
+        """
+        super().__init__(provider)
+        self.name = name
+
+    def _record(self, kwargs: Dict[str, Any], started: float, outcome: str, usage: Optional[Dict[str, Any]]) -> None:
+        """Record a finished backend request."""
+        task = kwargs.get("task")
+        task = str(getattr(task, "value", task) or "request")
+        labels = {"provider": self.name, "task": task}
+
+        LLM_SECONDS.observe(time.perf_counter() - started, **labels)
+        LLM_REQUESTS.inc(outcome=outcome, **labels)
+        if not usage:
+            return
+
+        for field, kind in _TOKEN_KINDS.items():
+            if usage.get(field):
+                LLM_TOKENS.inc(usage[field], kind=kind, **labels)
+        if usage.get("prompt_eval_seconds") is not None:
+            LLM_PROMPT_EVAL_SECONDS.observe(usage["prompt_eval_seconds"], **labels)
+        if usage.get("decode_seconds") is not None:
+            LLM_DECODE_SECONDS.observe(usage["decode_seconds"], **labels)
+
+        timings = current_timings.get()
+        if timings is not None:
+            timings.add_llm(task, usage)
+
+    def generate(self, prompt: str, **kwargs) -> LLMResponse:
+        started = time.perf_counter()
+        response = self.provider.generate(prompt, **kwargs)
+        self._record(kwargs, started, "error" if response.error else "ok", response.metadata)
+        return response
+
+    async def agenerate(self, prompt: str, **kwargs) -> LLMResponse:
+        started = time.perf_counter()
+        outcome, usage = "cancelled", None
+        try:
+            response = await self.provider.agenerate(prompt, **kwargs)
+            outcome, usage = "error" if response.error else "ok", response.metadata
+            return response
+        finally:
+            self._record(kwargs, started, outcome, usage)
+
+    async def astream(self, prompt: str, **kwargs) -> AsyncIterator[LLMResponse]:
+        started = time.perf_counter()
+        outcome, usage = "cancelled", None  # Closed or cancelled before the end
+        stream = self.provider.astream(prompt, **kwargs)
+        try:
+            async for chunk in stream:
+                if chunk.error:
+                    outcome = "error"
+                if chunk.metadata:
+                    usage = chunk.metadata  # Sent with the final chunk
+                yield chunk
+            if outcome != "error":
+                outcome = "ok"
+        finally:
+            await stream.aclose()
+            self._record(kwargs, started, outcome, usage)
@@ -5,9 +5,18 @@ Uses llama.cpp server for local LLM inference.
 Optimized for production on Raspberry Pi 4.
 """
 
+import hashlib
+import json
+import httpx
 import requests
-from typing import Optional
+from typing import Optional, Dict, Any, AsyncIterator, Tuple
 from .base import BaseLLMProvider, LLMResponse
+from .grammar import json_schema_to_gbnf
+from .http_client import get_http_client
+
+
+# Generic JSON-object grammar used for json_mode
+JSON_GRAMMAR = "root ::= object\nobject ::= \"{\" pair (\",\" pair)* \"}\"\npair ::= string \":\" value\nstring ::= \"\\\"\" [^\"]* \"\\\"\"\nvalue ::= string | number | object | array | \"true\" | \"false\" | \"null\"\narray ::= \"[\" value (\",\" value)* \"]\"\nnumber ::= \"-\"? [0-9]+ (\".\" [0-9]+)?"
 
 
 class LlamaCppProvider(BaseLLMProvider):
@@ -23,7 +32,9 @@ class LlamaCppProvider(BaseLLMProvider):
         model_name: str = "qwen-1_5b-chat-q4_0.gguf",
         base_url: str = "http://localhost:8080",
         max_tokens: int = 256,
-        temperature: float = 0.1
+        temperature: float = 0.1,
+        slots: Optional[Dict[str, int]] = None,
+        timeout: float = 30
     ):
         """
         Initialize llama.cpp provider.
@@ -33,11 +44,141 @@ class LlamaCppProvider(BaseLLMProvider):
             base_url: llama.cpp server base URL
             max_tokens: Maximum tokens to generate
             temperature: Sampling temperature
+            slots: Server slot per task type (see LLMTask), e.g.
+                {"classification": 0, "answer": 1}. Each prompt family
+                then keeps its own cached prefix. The server must run
+                with --parallel greater than the highest slot id.
+            timeout: Seconds to wait for a completion (a request deadline
+                ends it earlier)
         """
         super().__init__(model_name, max_tokens, temperature)
+        self.timeout = timeout
+        self.slots = dict(slots or {})
+        self._grammars: Dict[str, str] = {}
+        self._slot_stats: Dict[int, Dict[str, int]] = {}
         self.base_url = base_url.rstrip("/")
         self.completion_url = f"{self.base_url}/completion"
         self.health_url = f"{self.base_url}/health"
+        self.tokenize_url = f"{self.base_url}/tokenize"
+
+    def format_prompt(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+        """
+        Combine system prompt and user prompt into the raw model prompt.
+
+        The system turn comes first, so a fixed system prompt is a stable
+        prefix that llama.cpp can reuse from its prompt cache.
+        """
+        if not system_prompt:
+            return prompt
+
+        # Use Qwen chat template format
+        return f"<|im_start|>system\n{system_prompt}<|im_end|>\n<|im_start|>user\n{prompt}<|im_end|>\n<|im_start|>assistant\n"
+
+    def _build_payload(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        max_tokens: Optional[int],
+        temperature: Optional[float],
+        json_mode: bool,
+        stream: bool = False,
+        slot: Optional[int] = None,
+        json_schema: Optional[Dict[str, Any]] = None,
+        grammar: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Build the /completion request body."""
+        payload = {
+            "prompt": self.format_prompt(prompt, system_prompt),
+            "n_predict": max_tokens or self.max_tokens,
+            "temperature": temperature if temperature is not None else self.temperature,
+            "stop": ["<|im_end|>", "<|endoftext|>"],  # Stop tokens for Qwen
+            "stream": stream,
+            # Optimizations for Raspberry Pi
+            "cache_prompt": True,  # Cache prompts to save CPU
+            "n_threads": 4,  # Use 4 cores on RPi4
+        }
+
+        if grammar:
+            payload["grammar"] = grammar
+        elif json_schema:
+            # Only schema-valid JSON can be decoded
+            payload["grammar"] = self._grammar_for(json_schema)
+        elif json_mode:
+            # Guide model to output JSON
+            payload["grammar"] = JSON_GRAMMAR
+
+        if slot is not None:
+            # Pin the prompt family to its slot so its prefix stays cached
+            payload["id_slot"] = slot
+
+        return payload
+
+    def _grammar_for(self, json_schema: Dict[str, Any]) -> str:
+        """Get the GBNF grammar for a JSON schema (built once per schema)."""
+        key = json.dumps(json_schema, sort_keys=True)
+        if key not in self._grammars:
+            self._grammars[key] = json_schema_to_gbnf(json_schema)
+        return self._grammars[key]
+
+    def _slot_for(self, task: Optional[str]) -> Optional[int]:
+        """Get the server slot assigned to a task type, if any."""
+        if task is None:
+            return None
+        return self.slots.get(getattr(task, "value", task))
+
+    def _record_slot_stats(self, slot: Optional[int], stats: Dict[str, Any]) -> None:
+        """Accumulate prompt cache reuse per slot."""
+        if slot is None:
+            return
+
+        totals = self._slot_stats.setdefault(slot, {"requests": 0, "prompt_tokens": 0, "prompt_reused": 0})
+        totals["requests"] += 1
+        totals["prompt_tokens"] += stats.get("prompt_tokens") or 0
+        totals["prompt_reused"] += stats.get("prompt_reused") or 0
+
+    @staticmethod
+    def _prompt_stats(data: Dict[str, Any], slot: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Extract prompt cache statistics from a final /completion response.
+
+        prompt_tokens is the prompt length, prompt_evaluated the tokens the
+        server actually had to process and prompt_reused the tokens served
+        from its prompt cache. completion_tokens, prompt_eval_seconds and
+        decode_seconds are reported the same way by every provider.
+        """
+        timings = data.get("timings") or {}
+        prompt_tokens = data.get("tokens_evaluated")
+        evaluated = timings.get("prompt_n")
+
+        if "cache_n" in timings:
+            reused = timings["cache_n"]
+        elif prompt_tokens is not None and evaluated is not None:
+            reused = max(prompt_tokens - evaluated, 0)
+        else:
+            reused = data.get("tokens_cached")
+
+        return {
+            "slot": data.get("id_slot", slot),
+            "prompt_tokens": prompt_tokens,
+            "prompt_evaluated": evaluated,
+            "prompt_reused": reused,
+            "completion_tokens": timings.get("predicted_n", data.get("tokens_predicted")),
+            "prompt_eval_seconds": timings["prompt_ms"] / 1000 if "prompt_ms" in timings else None,
+            "decode_seconds": timings["predicted_ms"] / 1000 if "predicted_ms" in timings else None,
+            "timings": timings,
+        }
+
+    def _parse_response(self, data: Dict[str, Any], slot: Optional[int] = None) -> LLMResponse:
+        """Convert a /completion response body into an LLMResponse."""
+        metadata = self._prompt_stats(data, slot)
+        self._record_slot_stats(metadata["slot"], metadata)
+
+        return LLMResponse(
+            text=data["content"].strip(),
+            tokens_used=data.get("tokens_evaluated"),
+            model=self.model_name,
+            metadata=metadata
+        )
 
     def generate(
         self,
@@ -45,42 +186,58 @@ class LlamaCppProvider(BaseLLMProvider):
         system_prompt: Optional[str] = None,
         max_tokens: Optional[int] = None,
         temperature: Optional[float] = None,
-        json_mode: bool = False
+        json_mode: bool = False,
+        **kwargs
     ) -> LLMResponse:
         """Generate text using llama.cpp server."""
         try:
-            # Combine system prompt and user prompt
-            full_prompt = prompt
-            if system_prompt:
-                # Use Qwen chat template format
-                full_prompt = f"<|im_start|>system\n{system_prompt}<|im_end|>\n<|im_start|>user\n{prompt}<|im_end|>\n<|im_start|>assistant\n"
-
-            payload = {
-                "prompt": full_prompt,
-                "n_predict": max_tokens or self.max_tokens,
-                "temperature": temperature if temperature is not None else self.temperature,
-                "stop": ["<|im_end|>", "<|endoftext|>"],  # Stop tokens for Qwen
-                "stream": False,
-                # Optimizations for Raspberry Pi
-                "cache_prompt": True,  # Cache prompts to save CPU
-                "n_threads": 4,  # Use 4 cores on RPi4
-            }
-
-            if json_mode:
-                # Guide model to output JSON
-                payload["grammar"] = "root ::= object\nobject ::= \"{\" pair (\",\" pair)* \"}\"\npair ::= string \":\" value\nstring ::= \"\\\"\" [^\"]* \"\\\"\"\nvalue ::= string | number | object | array | \"true\" | \"false\" | \"null\"\narray ::= \"[\" value (\",\" value)* \"]\"\nnumber ::= \"-\"? [0-9]+ (\".\" [0-9]+)?"
-
-            response = requests.post(self.completion_url, json=payload, timeout=30)
+            slot = self._slot_for(kwargs.get("task"))
+            payload = self._build_payload(
+                prompt, system_prompt, max_tokens, temperature, json_mode, slot=slot, json_schema=kwargs.get("json_schema"),
+                grammar=kwargs.get("grammar")
+            )
+
+            response = requests.post(self.completion_url, json=payload, timeout=self.timeout)
             response.raise_for_status()
-            data = response.json()
 
+            return self._parse_response(response.json(), slot)
+
+        except requests.RequestException as e:
+            return LLMResponse(
+                text="",
+                error=f"llama.cpp server error: {str(e)}",
+                model=self.model_name
+            )
+        except Exception as e:
             return LLMResponse(
-                text=data["content"].strip(),
-                tokens_used=data.get("tokens_evaluated"),
+                text="",
+                error=f"Unexpected error: {str(e)}",
                 model=self.model_name
             )
 
-        except requests.RequestException as e:
+    async def agenerate(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        json_mode: bool = False,
+        **kwargs
+    ) -> LLMResponse:
+        """Generate text using llama.cpp server over the shared async client."""
+        try:
+            slot = self._slot_for(kwargs.get("task"))
+            payload = self._build_payload(
+                prompt, system_prompt, max_tokens, temperature, json_mode, slot=slot, json_schema=kwargs.get("json_schema"),
+                grammar=kwargs.get("grammar")
+            )
+
+            response = await get_http_client().post(self.completion_url, json=payload, timeout=self.timeout)
+            response.raise_for_status()
+
+            return self._parse_response(response.json(), slot)
+
+        except httpx.HTTPError as e:
             return LLMResponse(
                 text="",
                 error=f"llama.cpp server error: {str(e)}",
@@ -93,6 +250,59 @@ class LlamaCppProvider(BaseLLMProvider):
                 model=self.model_name
             )
 
+    async def astream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        json_mode: bool = False,
+        **kwargs
+    ) -> AsyncIterator[LLMResponse]:
+        """Stream tokens from llama.cpp /completion (server-sent events)."""
+        try:
+            slot = self._slot_for(kwargs.get("task"))
+            payload = self._build_payload(
+                prompt, system_prompt, max_tokens, temperature, json_mode, stream=True, slot=slot,
+                json_schema=kwargs.get("json_schema"), grammar=kwargs.get("grammar")
+            )
+
+            async with get_http_client().stream("POST", self.completion_url, json=payload, timeout=self.timeout) as response:
+                response.raise_for_status()
+
+                async for line in response.aiter_lines():
+                    # Each event is a single "data: {...}" line
+                    if not line.startswith("data:"):
+                        continue
+                    data = json.loads(line[len("data:"):])
+
+                    if data.get("content"):
+                        yield LLMResponse(text=data["content"], model=self.model_name)
+
+                    if data.get("stop"):
+                        metadata = self._prompt_stats(data, slot)
+                        self._record_slot_stats(metadata["slot"], metadata)
+                        yield LLMResponse(
+                            text="",
+                            tokens_used=data.get("tokens_evaluated"),
+                            model=self.model_name,
+                            metadata=metadata
+                        )
+                        break
+
+        except httpx.HTTPError as e:
+            yield LLMResponse(
+                text="",
+                error=f"llama.cpp server error: {str(e)}",
+                model=self.model_name
+            )
+        except Exception as e:
+            yield LLMResponse(
+                text="",
+                error=f"Unexpected error: {str(e)}",
+                model=self.model_name
+            )
+
     def health_check(self) -> bool:
         """Check if llama.cpp server is available."""
         try:
@@ -100,3 +310,123 @@ class LlamaCppProvider(BaseLLMProvider):
             return response.status_code == 200
         except:
             return False
+
+    async def ahealth_check(self) -> bool:
+        """Check if llama.cpp server is available without blocking."""
+        try:
+            response = await get_http_client().get(self.health_url, timeout=5)
+            return response.status_code == 200
+        except Exception:
+            return False
+
+    async def acount_tokens(self, text: str) -> Optional[int]:
+        """Count tokens using the server's /tokenize endpoint."""
+        try:
+            response = await get_http_client().post(self.tokenize_url, json={"content": text}, timeout=5)
+            response.raise_for_status()
+            return len(response.json()["tokens"])
+        except Exception:
+            return None
+
+    async def warm_start(self, prefixes: Dict[str, Tuple[str, str]]) -> Dict[str, str]:
+        """
+        Warm each slot's prompt cache with its task's prompt prefix.
+
+        The slot's KV cache is restored from the file an earlier run saved
+        (needs the server's --slot-save-path). Without one the prefix is
+        evaluated once and the slot saved for the next start. Files are
+        named after a hash of model and prompt, so changed prompts never
+        restore stale state.
+
+        Args:
+            prefixes: Task type -> (system_prompt, prompt), most frequent
+                first; a slot shared by several tasks gets the first one
+
+        Returns:
+            Task type -> "restored", "prewarmed", "shared" or "failed"
+        """
+        results = {}
+        warmed = set()
+
+        for task, (system_prompt, prompt) in prefixes.items():
+            slot = self._slot_for(task)
+            if slot in warmed:
+                results[task] = "shared"
+                continue
+            warmed.add(slot)
+
+            digest = hashlib.sha256(
+                f"{self.model_name}\n{self.format_prompt(prompt, system_prompt)}".encode("utf-8")
+            ).hexdigest()[:12]
+            filename = f"jarvis-slot{slot}-{digest}.bin"
+
+            # Unpinned requests can land on any slot; only prewarm those
+            if slot is not None and await self._slot_action(slot, "restore", filename):
+                results[task] = "restored"
+                continue
+
+            response = await self.agenerate(
+                prompt=prompt,
+                system_prompt=system_prompt,
+                max_tokens=1,
+                task=task
+            )
+            if response.error:
+                results[task] = "failed"
+                continue
+
+            results[task] = "prewarmed"
+            if slot is not None:
+                await self._slot_action(slot, "save", filename)
+
+        return results
+
+    async def _slot_action(self, slot: int, action: str, filename: str) -> bool:
+        """Save or restore a slot's KV cache; False if the server can't."""
+        try:
+            response = await get_http_client().post(
+                f"{self.base_url}/slots/{slot}",
+                params={"action": action},
+                json={"filename": filename},
+                timeout=self.timeout
+            )
+            return response.status_code == 200 and "error" not in response.json()
+        except Exception:
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        """Get prompt cache reuse per server slot."""
+        if not self._slot_stats:
+            return {}
+
+        slots = {}
+        for slot, totals in sorted(self._slot_stats.items()):
+            prompt_tokens = totals["prompt_tokens"]
+            slots[slot] = dict(
+                totals,
+                reuse_ratio=round(totals["prompt_reused"] / prompt_tokens, 3) if prompt_tokens else 0.0
+            )
+
+        return {"slots": slots}
+
+
+def parse_slot_map(value: str) -> Dict[str, int]:
+    """
+    Parse a slot assignment like "classification:0,answer:1".
+
+    Args:
+        value: Comma-separated task:slot pairs (empty = no slot pinning)
+
+    Returns:
+        Mapping of task type to slot id
+
+    Raises:
+        ValueError: If an entry is malformed
+    """
+    slots = {}
+    for entry in value.split(","):
+        if not entry.strip():
+            continue
+        task, _, slot = entry.partition(":")
+        slots[task.strip()] = int(slot)
+    return slots
@@ -5,9 +5,12 @@ Uses Ollama API for local LLM inference.
 Suitable for development environments.
 """
 
+import json
+import httpx
 import requests
-from typing import Optional
+from typing import Optional, Dict, Any, Tuple, AsyncIterator
 from .base import BaseLLMProvider, LLMResponse
+from .http_client import get_http_client
 
 
 class OllamaProvider(BaseLLMProvider):
@@ -22,7 +25,8 @@ class OllamaProvider(BaseLLMProvider):
         model_name: str = "qwen:1.5b-chat-v1.5-q4_0",
         base_url: str = "http://localhost:11434",
         max_tokens: int = 256,
-        temperature: float = 0.1
+        temperature: float = 0.1,
+        timeout: float = 30
     ):
         """
         Initialize Ollama provider.
@@ -32,72 +36,114 @@ class OllamaProvider(BaseLLMProvider):
             base_url: Ollama API base URL
             max_tokens: Maximum tokens to generate
             temperature: Sampling temperature
+            timeout: Seconds to wait for a completion (a request deadline
+                ends it earlier)
         """
         super().__init__(model_name, max_tokens, temperature)
+        self.timeout = timeout
         self.base_url = base_url.rstrip("/")
         self.generate_url = f"{self.base_url}/api/generate"
         self.chat_url = f"{self.base_url}/api/chat"
 
+    def _build_request(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        max_tokens: Optional[int],
+        temperature: Optional[float],
+        json_mode: bool,
+        stream: bool = False,
+        json_schema: Optional[Dict[str, Any]] = None
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Build the request URL and body.
+
+        Uses the chat endpoint if a system prompt is provided, otherwise
+        the generate endpoint for simple prompts.
+        """
+        options = {
+            "num_predict": max_tokens or self.max_tokens,
+            "temperature": temperature if temperature is not None else self.temperature,
+        }
+
+        if system_prompt:
+            url = self.chat_url
+            payload = {
+                "model": self.model_name,
+                "messages": [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": prompt}
+                ],
+                "stream": stream,
+                "options": options
+            }
+        else:
+            url = self.generate_url
+            payload = {
+                "model": self.model_name,
+                "prompt": prompt,
+                "stream": stream,
+                "options": options
+            }
+
+        if json_schema:
+            # Structured outputs: Ollama constrains decoding to the schema
+            payload["format"] = json_schema
+        elif json_mode:
+            payload["format"] = "json"
+
+        return url, payload
+
+    @staticmethod
+    def _prompt_stats(data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Extract prompt evaluation statistics from a final response.
+
+        Ollama reports how many prompt tokens it evaluated, but not how
+        many it reused from its cache. Durations are in nanoseconds.
+        """
+        return {
+            "prompt_evaluated": data.get("prompt_eval_count"),
+            "completion_tokens": data.get("eval_count"),
+            "prompt_eval_seconds": data["prompt_eval_duration"] / 1e9 if "prompt_eval_duration" in data else None,
+            "decode_seconds": data["eval_duration"] / 1e9 if "eval_duration" in data else None,
+            "timings": {
+                key: data[key]
+                for key in ("prompt_eval_count", "prompt_eval_duration", "eval_count", "eval_duration", "total_duration")
+                if key in data
+            },
+        }
+
+    def _parse_response(self, data: Dict[str, Any]) -> LLMResponse:
+        """Convert a chat or generate response body into an LLMResponse."""
+        text = data["message"]["content"] if "message" in data else data["response"]
+
+        return LLMResponse(
+            text=text,
+            tokens_used=data.get("eval_count"),
+            model=self.model_name,
+            metadata=self._prompt_stats(data)
+        )
+
     def generate(
         self,
         prompt: str,
         system_prompt: Optional[str] = None,
         max_tokens: Optional[int] = None,
         temperature: Optional[float] = None,
-        json_mode: bool = False
+        json_mode: bool = False,
+        **kwargs
     ) -> LLMResponse:
         """Generate text using Ollama API."""
         try:
-            # Use chat endpoint if system prompt provided
-            if system_prompt:
-                messages = [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": prompt}
-                ]
-                payload = {
-                    "model": self.model_name,
-                    "messages": messages,
-                    "stream": False,
-                    "options": {
-                        "num_predict": max_tokens or self.max_tokens,
-                        "temperature": temperature if temperature is not None else self.temperature,
-                    }
-                }
-                if json_mode:
-                    payload["format"] = "json"
-
-                response = requests.post(self.chat_url, json=payload, timeout=30)
-                response.raise_for_status()
-                data = response.json()
-
-                return LLMResponse(
-                    text=data["message"]["content"],
-                    tokens_used=data.get("eval_count"),
-                    model=self.model_name
-                )
-            else:
-                # Use generate endpoint for simple prompts
-                payload = {
-                    "model": self.model_name,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "num_predict": max_tokens or self.max_tokens,
-                        "temperature": temperature if temperature is not None else self.temperature,
-                    }
-                }
-                if json_mode:
-                    payload["format"] = "json"
-
-                response = requests.post(self.generate_url, json=payload, timeout=30)
-                response.raise_for_status()
-                data = response.json()
+            url, payload = self._build_request(
+                prompt, system_prompt, max_tokens, temperature, json_mode, json_schema=kwargs.get("json_schema")
+            )
 
-                return LLMResponse(
-                    text=data["response"],
-                    tokens_used=data.get("eval_count"),
-                    model=self.model_name
-                )
+            response = requests.post(url, json=payload, timeout=self.timeout)
+            response.raise_for_status()
+
+            return self._parse_response(response.json())
 
         except requests.RequestException as e:
             return LLMResponse(
@@ -112,6 +158,97 @@ class OllamaProvider(BaseLLMProvider):
                 model=self.model_name
             )
 
+    async def agenerate(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        json_mode: bool = False,
+        **kwargs
+    ) -> LLMResponse:
+        """Generate text using Ollama API over the shared async client."""
+        try:
+            url, payload = self._build_request(
+                prompt, system_prompt, max_tokens, temperature, json_mode, json_schema=kwargs.get("json_schema")
+            )
+
+            response = await get_http_client().post(url, json=payload, timeout=self.timeout)
+            response.raise_for_status()
+
+            return self._parse_response(response.json())
+
+        except httpx.HTTPError as e:
+            return LLMResponse(
+                text="",
+                error=f"Ollama API error: {str(e)}",
+                model=self.model_name
+            )
+        except Exception as e:
+            return LLMResponse(
+                text="",
+                error=f"Unexpected error: {str(e)}",
+                model=self.model_name
+            )
+
+    async def astream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        json_mode: bool = False,
+        **kwargs
+    ) -> AsyncIterator[LLMResponse]:
+        """Stream tokens from the Ollama API (newline-delimited JSON)."""
+        try:
+            url, payload = self._build_request(
+                prompt, system_prompt, max_tokens, temperature, json_mode, stream=True,
+                json_schema=kwargs.get("json_schema")
+            )
+
+            async with get_http_client().stream("POST", url, json=payload, timeout=self.timeout) as response:
+                response.raise_for_status()
+
+                async for line in response.aiter_lines():
+                    if not line.strip():
+                        continue
+                    data = json.loads(line)
+
+                    if data.get("error"):
+                        yield LLMResponse(
+                            text="",
+                            error=f"Ollama API error: {data['error']}",
+                            model=self.model_name
+                        )
+                        break
+
+                    text = data["message"]["content"] if "message" in data else data.get("response", "")
+                    if text:
+                        yield LLMResponse(text=text, model=self.model_name)
+
+                    if data.get("done"):
+                        yield LLMResponse(
+                            text="",
+                            tokens_used=data.get("eval_count"),
+                            model=self.model_name,
+                            metadata=self._prompt_stats(data)
+                        )
+                        break
+
+        except httpx.HTTPError as e:
+            yield LLMResponse(
+                text="",
+                error=f"Ollama API error: {str(e)}",
+                model=self.model_name
+            )
+        except Exception as e:
+            yield LLMResponse(
+                text="",
+                error=f"Unexpected error: {str(e)}",
+                model=self.model_name
+            )
+
     def health_check(self) -> bool:
         """Check if Ollama is available."""
         try:
@@ -119,3 +256,11 @@ class OllamaProvider(BaseLLMProvider):
             return response.status_code == 200
         except:
             return False
+
+    async def ahealth_check(self) -> bool:
+        """Check if Ollama is available without blocking."""
+        try:
+            response = await get_http_client().get(f"{self.base_url}/api/tags", timeout=5)
+            return response.status_code == 200
+        except Exception:
+            return False
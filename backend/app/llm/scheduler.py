@@ -0,0 +1,196 @@
+"""
+LLM Admission Scheduler
+
+Bounded-concurrency priority queue in front of the LLM backend.
+
+The llama.cpp server on a Pi effectively decodes one sequence at a time.
+Without admission control concurrent chat requests pile up until they all
+hit the HTTP timeout. The scheduler lets a fixed number of requests run,
+queues a bounded number of others (short structured jobs first), and
+rejects the rest immediately so the API can answer 503 + Retry-After.
+"""
+
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Any, AsyncIterator, List, Tuple
+
+from .base import ProviderWrapper, BaseLLMProvider, LLMResponse, LLMTask
+
+
+# Lower value = served first
+TASK_PRIORITIES = {
+    LLMTask.CLASSIFICATION: 0,
+    LLMTask.CALCULATION: 0,
+    LLMTask.ANSWER: 1,
+    LLMTask.JOINT: 1,
+}
+DEFAULT_PRIORITY = 1
+
+
+class LLMOverloadedError(Exception):
+    """Raised when the LLM queue is full and a request is rejected."""
+
+    def __init__(self, retry_after: int):
+        """
+        Args:
+            retry_after: Suggested seconds before retrying
+        """
+        super().__init__(f"LLM backend is busy, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class AdmissionScheduler:
+    """
+    Priority admission queue with a concurrency limit.
+
+    Requests acquire a slot before talking to the LLM. When all slots are
+    busy they wait in a priority queue (FIFO within a priority); when the
+    queue is full they are rejected with LLMOverloadedError.
+    """
+
+    def __init__(self, max_concurrency: int = 1, max_queue: int = 8):
+        """
+        Initialize scheduler.
+
+        Args:
+            max_concurrency: Requests allowed to run at once
+            max_queue: Requests allowed to wait; more are rejected
+        """
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.active = 0
+        self.admitted = 0
+        self.rejected = 0
+        self._queue: List[Tuple[int, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+        # Moving average of how long a slot is held, for Retry-After
+        self._avg_service_time = 5.0
+
+    @property
+    def queued(self) -> int:
+        """Number of requests waiting for a slot."""
+        return sum(1 for _, _, waiter in self._queue if not waiter.done())
+
+    def retry_after(self) -> int:
+        """Estimate seconds until a new request would be admitted."""
+        backlog = self.queued + self.active
+        rounds = backlog / max(self.max_concurrency, 1)
+        return max(1, math.ceil(rounds * self._avg_service_time))
+
+    async def acquire(self, priority: int = DEFAULT_PRIORITY) -> None:
+        """
+        Wait for a slot.
+
+        Args:
+            priority: Lower values are served first
+
+        Raises:
+            LLMOverloadedError: If the queue is full
+        """
+        if self.active < self.max_concurrency and not self.queued:
+            self.active += 1
+            self.admitted += 1
+            return
+
+        if self.queued >= self.max_queue:
+            self.rejected += 1
+            raise LLMOverloadedError(self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._counter), waiter))
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Slot was handed over just as we gave up; pass it on
+                self.release()
+            else:
+                waiter.cancel()
+            raise
+
+        self.admitted += 1
+
+    def release(self) -> None:
+        """Release a slot, handing it to the next waiter if there is one."""
+        while self._queue:
+            _, _, waiter = heapq.heappop(self._queue)
+            if not waiter.done():
+                # Slot passes directly to the waiter; active count unchanged
+                waiter.set_result(None)
+                return
+
+        self.active -= 1
+
+    @asynccontextmanager
+    async def slot(self, priority: int = DEFAULT_PRIORITY) -> AsyncIterator[None]:
+        """Hold a slot for the duration of the block."""
+        await self.acquire(priority)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started
+            self._avg_service_time = 0.8 * self._avg_service_time + 0.2 * elapsed
+            self.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get queue statistics."""
+        return {
+            "active": self.active,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "avg_service_time": round(self._avg_service_time, 3),
+        }
+
+
+class ScheduledProvider(ProviderWrapper):
+    """
+    Provider layer that runs every request through an AdmissionScheduler.
+
+    The priority comes from the task= request hint (see LLMTask).
+    """
+
+    def __init__(self, provider: BaseLLMProvider, scheduler: AdmissionScheduler):
+        """
+        Initialize scheduling layer.
+
+        Args:
+            provider: Provider to wrap
+            scheduler: Admission scheduler to use
+        """
+        super().__init__(provider)
+        self.scheduler = scheduler
+
+    @staticmethod
+    def _priority(task: Optional[str]) -> int:
+        try:
+            return TASK_PRIORITIES.get(LLMTask(task), DEFAULT_PRIORITY)
+        except ValueError:
+            return DEFAULT_PRIORITY
+
+    async def agenerate(self, prompt: str, **kwargs) -> LLMResponse:
+        async with self.scheduler.slot(self._priority(kwargs.get("task"))):
+            return await self.provider.agenerate(prompt, **kwargs)
+
+    async def astream(self, prompt: str, **kwargs) -> AsyncIterator[LLMResponse]:
+        # The slot is held until the stream is exhausted or closed
+        async with self.scheduler.slot(self._priority(kwargs.get("task"))):
+            stream = self.provider.astream(prompt, **kwargs)
+            try:
+                async for chunk in stream:
+                    yield chunk
+            finally:
+                await stream.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = dict(self.provider.stats())
+        stats["scheduler"] = self.scheduler.stats()
+        return stats
@@ -0,0 +1,167 @@
+"""
+Single-Flight Request Coalescing
+
+If an identical generation is already running, later callers share its
+result instead of queuing a second copy on the LLM server. Browser speech
+recognition and double-clicks often send the same message twice within a
+second; on a Pi that can barely decode one sequence at a time, the second
+copy would double the wait for both.
+"""
+
+import asyncio
+from typing import Optional, Dict, Any, AsyncIterator, List
+
+from .base import ProviderWrapper, BaseLLMProvider, LLMResponse
+from .cache import ResponseCache
+
+
+class _SharedStream:
+    """
+    One upstream token stream fanned out to several subscribers.
+
+    A background task reads the upstream stream into a buffer; each
+    subscriber replays the buffer from the start and then follows along.
+    If the upstream stream raises, every subscriber raises the same
+    exception after the buffered chunks. When the last subscriber leaves
+    early, the upstream stream is cancelled so the server stops decoding.
+    """
+
+    def __init__(self, source: AsyncIterator[LLMResponse]):
+        self.chunks: List[LLMResponse] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+        self._source = source
+        self._changed = asyncio.Event()
+        self.task = asyncio.ensure_future(self._pump())
+
+    async def _pump(self) -> None:
+        try:
+            async for chunk in self._source:
+                self.chunks.append(chunk)
+                self._notify()
+        except Exception as e:
+            # Raised in the subscribers (e.g. LLMOverloadedError)
+            self.error = e
+        finally:
+            self.done = True
+            self._notify()
+            await self._source.aclose()
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def subscribe(self) -> AsyncIterator[LLMResponse]:
+        self.subscribers += 1
+        try:
+            index = 0
+            while True:
+                if index < len(self.chunks):
+                    yield self.chunks[index]
+                    index += 1
+                elif self.done:
+                    if self.error is not None:
+                        raise self.error
+                    return
+                else:
+                    await self._changed.wait()
+        finally:
+            self.subscribers -= 1
+            if self.subscribers == 0 and not self.done:
+                self.task.cancel()
+
+
+class SingleFlightProvider(ProviderWrapper):
+    """
+    Provider layer that coalesces concurrent identical requests.
+
+    Requests are identical when model, prompts and all generation options
+    match. Only requests that overlap in time are shared; finished results
+    are not kept (that is the response cache's job).
+    """
+
+    def __init__(self, provider: BaseLLMProvider):
+        """
+        Initialize single-flight layer.
+
+        Args:
+            provider: Provider to wrap
+        """
+        super().__init__(provider)
+        self.coalesced = 0
+        self._inflight: Dict[str, "asyncio.Future[LLMResponse]"] = {}
+        self._waiters: Dict["asyncio.Future[LLMResponse]", int] = {}  # Callers per in-flight request
+        self._inflight_streams: Dict[str, _SharedStream] = {}
+
+    def _request_key(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        json_mode: bool = False,
+        **kwargs
+    ) -> str:
+        """Build a key identifying the generation request."""
+        return ResponseCache.make_key(
+            self.provider.model_name,
+            system_prompt,
+            prompt,
+            temperature if temperature is not None else self.provider.temperature,
+            max_tokens or self.provider.max_tokens,
+            json_mode,
+            kwargs
+        )
+
+    async def agenerate(self, prompt: str, **kwargs) -> LLMResponse:
+        key = self._request_key(prompt, **kwargs)
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(self.provider.agenerate(prompt, **kwargs))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        # Shield so one caller giving up doesn't cancel the others' request;
+        # the request is cancelled when the last caller gives up
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+                task.cancel()
+
+    async def astream(self, prompt: str, **kwargs) -> AsyncIterator[LLMResponse]:
+        key = self._request_key(prompt, **kwargs)
+
+        shared = self._inflight_streams.get(key)
+        if shared is not None and not shared.done:
+            self.coalesced += 1
+        else:
+            shared = _SharedStream(self.provider.astream(prompt, **kwargs))
+            self._inflight_streams[key] = shared
+            shared.task.add_done_callback(lambda _: self._forget_stream(key, shared))
+
+        subscription = shared.subscribe()
+        try:
+            async for chunk in subscription:
+                yield chunk
+        finally:
+            await subscription.aclose()
+
+    def _forget_stream(self, key: str, shared: _SharedStream) -> None:
+        if self._inflight_streams.get(key) is shared:
+            del self._inflight_streams[key]
+
+    def stats(self) -> Dict[str, Any]:
+        stats = dict(self.provider.stats())
+        stats["singleflight"] = {
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight) + len(self._inflight_streams),
+        }
+        return stats
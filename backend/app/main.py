@@ -4,13 +4,40 @@ JARVIS Assistant - Main Application
 Local, self-hosted AI assistant optimized for Raspberry Pi 4.
 """
 
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from .config import get_settings
+from .dependencies import AppServices
+from .llm import BaseLLMProvider
+from .llm.http_client import close_http_client
 from .routers import chat_router
+from .routers.metrics import router as metrics_router
+from .routers.timers import router as timers_router
 from .routers.tools import router as tools_router
+from .services.prompts import warm_prefixes
+
+
+# Seconds to wait for the LLM server (model loading) before warming its cache
+WARM_START_WAIT = 120
+
+
+async def warm_start_llm(llm: BaseLLMProvider) -> None:
+    """Warm the LLM prompt cache once the server is up."""
+    for _ in range(WARM_START_WAIT // 2):
+        if await llm.ahealth_check():
+            break
+        await asyncio.sleep(2)
+    else:
+        print("⚠️  LLM server not reachable, skipping prompt cache warm start")
+        return
+
+    results = await llm.warm_start(warm_prefixes())
+    if results:
+        summary = ", ".join(f"{getattr(task, 'value', task)}: {outcome}" for task, outcome in results.items())
+        print(f"🔥 Prompt cache warm start: {summary}")
 
 
 # Application lifespan for startup/shutdown events
@@ -23,9 +50,28 @@ async def lifespan(app: FastAPI):
     print(f"🤖 Model: {settings.llm_model_name or 'default'}")
     print(f"🌐 Server: http://{settings.host}:{settings.port}")
 
+    # Shared by all requests; injected into endpoints as dependencies
+    services = AppServices.create(settings)
+    app.state.services = services
+
+    # Fires pending timers and reminders, including any from before a restart
+    await services.start()
+    pending = len(services.timer_scheduler.pending())
+    if pending:
+        print(f"⏰ {pending} pending timers and reminders")
+
+    # Runs in the background so the API is up while the model still loads
+    warm_task = None
+    if settings.llamacpp_warm_start:
+        warm_task = asyncio.create_task(warm_start_llm(services.llm_provider))
+
     yield
 
     print("👋 Shutting down JARVIS Assistant")
+    if warm_task is not None:
+        warm_task.cancel()
+    await services.aclose()
+    await close_http_client()
 
 
 # Create FastAPI app
@@ -53,6 +99,8 @@ app.add_middleware(
 # Include routers
 app.include_router(chat_router)
 app.include_router(tools_router)
+app.include_router(timers_router)
+app.include_router(metrics_router)
 
 
 # Root endpoint
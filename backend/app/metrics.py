@@ -0,0 +1,334 @@
+"""
+Metrics
+
+Latency histograms and counters for the chat pipeline, kept in memory and
+exposed in the Prometheus text format on /metrics (no client library
+needed).
+
+Each chat request also gets a RequestTimings: the stages, tools and LLM
+calls of the request record their durations into it (it is found through
+a context variable, so the layers in between don't have to pass it on).
+When the request finishes, the stage durations go into the histograms,
+labelled by intent; the same numbers can be returned with the response.
+"""
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from operator import itemgetter
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+# Histogram bucket bounds in seconds: sub-millisecond fast path answers
+# up to generations that take most of a minute on a Pi
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the text format."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """Format a label set ({a="x",b="y"}; empty without labels)."""
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value (integers without a fraction)."""
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric(ABC):
+    """Base class for metrics with a fixed set of label names."""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        """
+        Initialize metric.
+
+        Args:
+            name: Metric name
+            documentation: Help text
+            labelnames: Names of the labels every observation has
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()  # Tools and sync providers record from threads
+        # Label values in labelnames order, always as a tuple
+        if len(self.labelnames) == 1:
+            name = self.labelnames[0]
+            self._label_values = lambda labels: (labels[name],)
+        elif self.labelnames:
+            self._label_values = itemgetter(*self.labelnames)
+        else:
+            self._label_values = lambda labels: ()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        """Label values in labelnames order."""
+        try:
+            if len(labels) == len(self.labelnames):
+                return tuple(map(str, self._label_values(labels)))
+        except KeyError:
+            pass
+        raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+
+    def render(self) -> List[str]:
+        """Lines of the text format for this metric."""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        with self._lock:
+            lines.extend(self._samples())
+        return lines
+
+    @abstractmethod
+    def _samples(self) -> List[str]:
+        """Sample lines of the text format (called with the lock held)."""
+        pass
+
+
+class Counter(_Metric):
+    """Value that only goes up (requests, tokens, ...)."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        """Add to the counter of a label set."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: Any) -> float:
+        """Current value of a label set."""
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(self._values.items())
+        ]
+
+
+class Histogram(_Metric):
+    """Distribution of observed values (durations) in cumulative buckets."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        """
+        Initialize histogram.
+
+        Args:
+            name: Metric name
+            documentation: Help text
+            labelnames: Names of the labels every observation has
+            buckets: Upper bounds of the buckets, ascending (+Inf is added)
+        """
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # Label values -> [count per bucket (not cumulative) + overflow, sum, count]
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        """Record a value for a label set."""
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)  # First bucket with value <= bound
+
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, **labels: Any) -> int:
+        """Number of observations of a label set."""
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return series[2] if series else 0
+
+    def _samples(self) -> List[str]:
+        lines = []
+        names = self.labelnames + ("le",)
+        for key, (counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(names, key + (le,))} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Metrics rendered together on /metrics."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Create and register a counter."""
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """Create and register a histogram."""
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text format (version 0.0.4)."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    "jarvis_request_duration_seconds", "Chat request processing time", ["endpoint", "intent"]
+)
+STAGE_SECONDS = REGISTRY.histogram(
+    "jarvis_stage_duration_seconds", "Time spent in each chat pipeline stage", ["stage", "intent"]
+)
+TOOL_SECONDS = REGISTRY.histogram(
+    "jarvis_tool_duration_seconds", "Tool execution time (outcome: ok, error, timeout, cancelled)", ["tool", "outcome"]
+)
+LLM_SECONDS = REGISTRY.histogram(
+    "jarvis_llm_request_duration_seconds", "LLM backend request time", ["provider", "task"]
+)
+LLM_PROMPT_EVAL_SECONDS = REGISTRY.histogram(
+    "jarvis_llm_prompt_eval_seconds", "Prompt evaluation time reported by the LLM backend", ["provider", "task"]
+)
+LLM_DECODE_SECONDS = REGISTRY.histogram(
+    "jarvis_llm_decode_seconds", "Token generation time reported by the LLM backend", ["provider", "task"]
+)
+LLM_REQUESTS = REGISTRY.counter(
+    "jarvis_llm_requests_total", "LLM backend requests (outcome: ok, error, cancelled)", ["provider", "task", "outcome"]
+)
+LLM_TOKENS = REGISTRY.counter(
+    "jarvis_llm_tokens_total",
+    "Tokens processed by the LLM backend (kind: prompt_evaluated, prompt_reused, completion)",
+    ["provider", "task", "kind"]
+)
+DEADLINE_CUTS = REGISTRY.counter(
+    "jarvis_deadline_cuts_total", "Pipeline stages cut short by the request deadline", ["stage"]
+)
+
+
+# LLM usage fields kept per request, from the backend's final response
+_USAGE_FIELDS = ("prompt_evaluated", "prompt_reused", "completion_tokens", "prompt_eval_seconds", "decode_seconds")
+
+
+class RequestTimings:
+    """Stage, tool and LLM timings of one chat request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}  # Stage -> seconds (summed if entered again)
+        self.tools: Dict[str, float] = {}  # Tool -> seconds
+        self.llm: Dict[str, Dict[str, float]] = {}  # Task -> usage fields (summed over calls)
+        self.total: Optional[float] = None
+
+    def add(self, stage: str, seconds: float) -> None:
+        """Add time spent in a stage."""
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def add_tool(self, tool: str, seconds: float) -> None:
+        """Record the time a tool took."""
+        self.tools[tool] = seconds
+
+    def add_llm(self, task: str, usage: Dict[str, Any]) -> None:
+        """Add the usage an LLM backend reported for a request."""
+        totals = self.llm.setdefault(task, {})
+        for field in _USAGE_FIELDS:
+            if usage.get(field) is not None:
+                totals[field] = totals.get(field, 0) + usage[field]
+
+    def finish(self, endpoint: str, intent: Any) -> None:
+        """Stop the clock and record the request in the histograms."""
+        self.total = time.perf_counter() - self.started
+        intent = str(getattr(intent, "value", intent))
+        REQUEST_SECONDS.observe(self.total, endpoint=endpoint, intent=intent)
+        for stage, seconds in self.stages.items():
+            STAGE_SECONDS.observe(seconds, stage=stage, intent=intent)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Timings in milliseconds, for the response metadata."""
+        total = self.total if self.total is not None else time.perf_counter() - self.started
+
+        def ms(seconds: float) -> float:
+            return round(seconds * 1000, 2)
+
+        llm = {}
+        for task, usage in self.llm.items():
+            llm[task] = {
+                field.replace("_seconds", "_ms"): ms(value) if field.endswith("_seconds") else value
+                for field, value in usage.items()
+            }
+
+        return {
+            "total_ms": ms(total),
+            "stages_ms": {stage: ms(seconds) for stage, seconds in self.stages.items()},
+            "tools_ms": {tool: ms(seconds) for tool, seconds in self.tools.items()},
+            "llm": llm,
+        }
+
+
+# Timings of the chat request being processed (None outside of one);
+# asyncio tasks started by the request inherit it
+current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("current_timings", default=None)
+
+
+class timed:
+    """
+    Context manager adding the time spent in its block to a stage of the
+    current request (a class: the fast path enters several per request,
+    and a generator-based context manager costs a few microseconds each).
+    """
+
+    __slots__ = ("stage", "started")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.started = 0.0
+
+    def __enter__(self) -> None:
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        timings = current_timings.get()
+        if timings is not None:
+            timings.add(self.stage, time.perf_counter() - self.started)
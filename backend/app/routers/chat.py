@@ -4,13 +4,28 @@ Chat API Router
 Handles chat requests and returns responses from JARVIS.
 """
 
+import asyncio
+import json
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, NamedTuple, Tuple, AsyncIterator
 
 from ..config import get_settings, Settings
-from ..llm import get_llm_provider, BaseLLMProvider
-from ..services import IntentClassifier, CommandRouter
+from ..dependencies import (
+    get_llm_provider_instance,
+    get_context_packer_instance,
+    get_intent_classifier_instance,
+    get_command_router_instance,
+    get_tool_manager_instance,
+    get_timer_scheduler_instance,
+)
+from ..llm import BaseLLMProvider, LLMOverloadedError, LLMTask, Deadline, DEADLINE_EXCEEDED
+from ..metrics import DEADLINE_CUTS, RequestTimings, current_timings, timed
+from ..services import IntentClassifier, CommandRouter, SentenceSegmenter, ContextPacker
+from ..services.command_router import DEADLINE_REPLY, LLM_ANSWERED_INTENTS
+from ..services.prompts import PROMPT_LAYOUTS
+from ..services.timer_scheduler import TimerScheduler
 from ..tools.manager import ToolManager
 
 
@@ -32,31 +47,341 @@ class ChatResponse(BaseModel):
     metadata: Optional[Dict[str, Any]] = Field(default=None, description="Additional metadata")
 
 
-# Dependency to get LLM provider (singleton pattern)
-_llm_provider_instance: Optional[BaseLLMProvider] = None
+class _MessageAnalysis(NamedTuple):
+    """Classification and tool results for a message."""
+    intent: str
+    entities: Dict[str, Any]
+    confidence: Optional[float]
+    joint_stream: Optional[AsyncIterator[str]]  # Joint mode: answer already being generated
+    detected_tools: List[str]
+    tool_context: Dict[str, str]  # Tool name -> text, for tools that returned something
+    timed_out_tools: List[str]
+    cancelled_tools: List[str]  # Not needed for the intent, stopped before they finished
+    skipped_stages: List[str]  # Pipeline stages the message did not need (STAGES)
 
 
-def get_llm_provider_instance(settings: Settings = Depends(get_settings)) -> BaseLLMProvider:
-    """Get or create LLM provider instance."""
-    global _llm_provider_instance
+# Pipeline stages a message may skip, in order
+STAGES = ("tool_detection", "tools", "llm_classification", "llm_answer")
 
-    if _llm_provider_instance is None:
-        _llm_provider_instance = get_llm_provider(
-            provider_type=settings.llm_provider,
-            model_name=settings.llm_model_name,
-            base_url=settings.llm_base_url,
-            max_tokens=settings.llm_max_tokens,
-            temperature=settings.llm_temperature
+
+def _start_tools(
+    user_message: str,
+    tool_manager: ToolManager,
+    deadline: Optional[Deadline] = None
+) -> Tuple[List[str], Optional[asyncio.Task]]:
+    """
+    Detect the tools that might help answer the message and start them.
+
+    The tools run concurrently, each with its own deadline (never past the
+    request deadline); results that arrive late are dropped.
+
+    Returns:
+        Detected tool names and the task executing them (None if no tool
+        was detected)
+    """
+    with timed("tool_detection"):
+        detected_tools = tool_manager.detect_tool(user_message)
+    if not detected_tools:
+        return detected_tools, None
+    return detected_tools, asyncio.create_task(tool_manager.aexecute_tools(detected_tools, user_message, deadline))
+
+
+async def _tool_results(tools_task: Optional[asyncio.Task]) -> Tuple[Dict[str, str], List[str]]:
+    """Wait for the tools; returns (tool context, tools that timed out)."""
+    if tools_task is None:
+        return {}, []
+
+    run = await tools_task
+    tool_context = {
+        tool_name: result.context
+        for tool_name, result in run.results.items()
+        if result.success and result.context
+    }
+    return tool_context, run.timed_out
+
+
+def _uses_tool_context(intent: str, settings: Settings) -> bool:
+    """Check whether the answer for an intent is generated with tool context."""
+    return not settings.enable_command_routing or intent in LLM_ANSWERED_INTENTS
+
+
+def _answers_with_llm(
+    intent: str,
+    user_message: str,
+    settings: Settings,
+    router_service: CommandRouter,
+    joint: bool = False
+) -> bool:
+    """Check whether the LLM generates the answer (calculations the calculator solves don't)."""
+    if not settings.enable_command_routing:
+        return True
+    return router_service.answers_with_llm(intent, user_message, joint)
+
+
+def _skipped_stages(
+    tool_detection: bool,
+    tools: bool,
+    llm_classification: bool,
+    llm_answer: bool
+) -> List[str]:
+    """List the stages that did not run (the flags say which ones did)."""
+    ran = {
+        "tool_detection": tool_detection,
+        "tools": tools,
+        "llm_classification": llm_classification,
+        "llm_answer": llm_answer,
+    }
+    return [stage for stage in STAGES if not ran[stage]]
+
+
+async def _analyze_message(
+    user_message: str,
+    settings: Settings,
+    classifier: IntentClassifier,
+    router_service: CommandRouter,
+    tool_manager: ToolManager,
+    deadline: Optional[Deadline] = None
+) -> _MessageAnalysis:
+    """
+    Classify the message and run the tools its answer needs.
+
+    Fast path: messages the classifier resolves without the LLM (patterns,
+    cache, local model) to an intent that doesn't use tool context
+    (greetings, time, timers, ...) are answered without tool detection,
+    tools or the LLM.
+
+    Otherwise the LLM classification and tool execution overlap, since
+    they don't depend on each other. Once the intent is known, tools it
+    has no use for are cancelled; otherwise their results are awaited. In
+    joint mode, messages that need the LLM to classify wait for the tools,
+    since the same generation writes the answer.
+
+    Every stage gets the time left before the request deadline; stages it
+    cuts short are recorded on it (deadline.cut). Stage durations go to
+    the request's timings (app/metrics.py).
+
+    Returns:
+        Message analysis
+    """
+    with timed("classification"):
+        classification = _classify_fast(user_message, settings, classifier)
+    if classification is not None:
+        intent, entities, confidence = classification
+        if not _uses_tool_context(intent, settings):
+            skipped = _skipped_stages(
+                tool_detection=False, tools=False, llm_classification=False,
+                llm_answer=_answers_with_llm(intent, user_message, settings, router_service)
+            )
+            return _MessageAnalysis(intent, entities, confidence, None, [], {}, [], [], skipped)
+
+        detected_tools, tools_task = _start_tools(user_message, tool_manager, deadline)
+        tool_context, timed_out_tools = await _tool_results(tools_task)
+        skipped = _skipped_stages(
+            tool_detection=True, tools=tools_task is not None, llm_classification=False,
+            llm_answer=_answers_with_llm(intent, user_message, settings, router_service)
+        )
+        return _MessageAnalysis(
+            intent, entities, confidence, None,
+            detected_tools, tool_context, timed_out_tools, [], skipped
         )
 
-    return _llm_provider_instance
+    detected_tools, tools_task = _start_tools(user_message, tool_manager, deadline)
+
+    try:
+        joint_stream = None
+        if _joint_mode(settings):
+            intent, joint_stream = await _classify_joint(
+                user_message, tools_task, classifier, router_service, deadline
+            )
+            entities, confidence = {}, None
+        else:
+            with timed("classification"):
+                intent, entities, confidence = await _classify_llm(user_message, classifier, deadline)
+
+        cancelled_tools: List[str] = []
+        if _uses_tool_context(intent, settings):
+            tool_context, timed_out_tools = await _tool_results(tools_task)
+        else:
+            tool_context, timed_out_tools = {}, []
+            if tools_task is not None and not tools_task.done():
+                cancelled_tools = detected_tools
+    finally:
+        # Queued tools never start; running ones finish unobserved
+        if tools_task is not None:
+            tools_task.cancel()
+
+    skipped = _skipped_stages(
+        tool_detection=True, tools=tools_task is not None, llm_classification=True,
+        llm_answer=_answers_with_llm(intent, user_message, settings, router_service, joint=joint_stream is not None)
+    )
+    return _MessageAnalysis(
+        intent, entities, confidence, joint_stream,
+        detected_tools, tool_context, timed_out_tools, cancelled_tools, skipped
+    )
+
+
+def _classify_fast(
+    user_message: str,
+    settings: Settings,
+    classifier: IntentClassifier
+) -> Optional[Tuple[str, Dict[str, Any], float]]:
+    """
+    Classify the message intent without the LLM.
+
+    Returns:
+        Intent, entities and confidence (a general query if classification
+        is disabled), or None if the LLM is needed
+    """
+    if not settings.enable_intent_classification:
+        # Skip classification, treat as general query
+        return "general", {}, 1.0
+
+    classification = classifier.classify_fast(user_message)
+    if classification is None:
+        return None
+
+    return (
+        classification["intent"],
+        classification.get("entities", {}),
+        classification.get("confidence", 0.0)
+    )
+
+
+async def _classify_llm(
+    user_message: str,
+    classifier: IntentClassifier,
+    deadline: Optional[Deadline] = None
+) -> Tuple[str, Dict[str, Any], float]:
+    """
+    Classify the message intent with the LLM.
+
+    Returns:
+        Intent, entities and confidence; classification errors fall back
+        to a general query (a classification cut short by the deadline is
+        used if the intent was decoded)
+    """
+    classification = await classifier.classify_llm(user_message, deadline)
+
+    # Check for errors in classification
+    if "error" in classification:
+        # Fallback: treat as general query
+        return "general", {}, 0.0
+
+    return (
+        classification["intent"],
+        classification.get("entities", {}),
+        classification.get("confidence", 0.0)
+    )
+
+
+def _joint_mode(settings: Settings) -> bool:
+    """Check whether classification and answer share one LLM generation."""
+    return (
+        settings.pipeline_mode == "joint"
+        and settings.enable_intent_classification
+        and settings.enable_command_routing
+    )
+
+
+async def _classify_joint(
+    user_message: str,
+    tools_task: Optional[asyncio.Task],
+    classifier: IntentClassifier,
+    router_service: CommandRouter,
+    deadline: Optional[Deadline] = None
+) -> Tuple[str, Optional[AsyncIterator[str]]]:
+    """
+    Classify and answer the message in one LLM generation (joint mode).
+
+    Waits for the tools first, since their context goes into the prompt.
+
+    Returns:
+        Intent and the response text stream of the joint generation
+    """
+    tool_context, _ = await _tool_results(tools_task)
+    with timed("classification"):
+        # Up to the intent label; the rest of the generation is the answer
+        intent, text_stream = await router_service.route_joint(user_message, tool_context, deadline)
+    classifier.record_joint(user_message, intent)
+    return intent, text_stream
+
+
+async def _direct_prompt(
+    user_message: str,
+    tool_context: Dict[str, str],
+    context_packer: ContextPacker
+) -> Tuple[str, str]:
+    """Prompt used when command routing is disabled: (system_prompt, prompt)."""
+    layout = PROMPT_LAYOUTS[LLMTask.ANSWER]
+    context = await context_packer.pack(tool_context, user_message, fixed_text=layout.fixed_text(user_message))
+    return layout.build(user_message, context)
+
+
+async def _stream_direct(
+    llm_provider: BaseLLMProvider,
+    user_message: str,
+    tool_context: Dict[str, str],
+    context_packer: ContextPacker,
+    settings: Settings,
+    deadline: Optional[Deadline] = None
+) -> AsyncIterator[str]:
+    """
+    Stream a direct LLM response (command routing disabled).
+
+    An answer cut short by the deadline ends with the text generated so
+    far (DEADLINE_REPLY if there is none).
+    """
+    system_prompt, prompt = await _direct_prompt(user_message, tool_context, context_packer)
+    streamed = False
+
+    async for chunk in llm_provider.astream(
+        prompt=prompt,
+        system_prompt=system_prompt,
+        max_tokens=settings.llm_max_tokens,
+        task=LLMTask.ANSWER,
+        deadline=deadline
+    ):
+        if chunk.error == DEADLINE_EXCEEDED:
+            if not streamed:
+                yield DEADLINE_REPLY
+            return
+        if chunk.error:
+            raise RuntimeError(chunk.error)
+        if chunk.text:
+            streamed = True
+            yield chunk.text
+
+
+def _overloaded(error: LLMOverloadedError) -> HTTPException:
+    """Map a rejected LLM request to 503 Service Unavailable."""
+    return HTTPException(
+        status_code=503,
+        detail=str(error),
+        headers={"Retry-After": str(error.retry_after)}
+    )
+
+
+def _finish_request(timings: RequestTimings, deadline: Deadline, endpoint: str, intent: Any) -> None:
+    """Record a finished request's timings and deadline cuts in the metrics."""
+    timings.finish(endpoint, intent)
+    for stage in deadline.cut:
+        DEADLINE_CUTS.inc(stage=stage)
+
+
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format a single server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
 
 @router.post("/chat", response_model=ChatResponse)
 async def chat(
     request: ChatRequest,
     settings: Settings = Depends(get_settings),
-    llm_provider: BaseLLMProvider = Depends(get_llm_provider_instance)
+    llm_provider: BaseLLMProvider = Depends(get_llm_provider_instance),
+    context_packer: ContextPacker = Depends(get_context_packer_instance),
+    classifier: IntentClassifier = Depends(get_intent_classifier_instance),
+    router_service: CommandRouter = Depends(get_command_router_instance),
+    tool_manager: ToolManager = Depends(get_tool_manager_instance)
 ) -> ChatResponse:
     """
     Process chat message and return response.
@@ -65,106 +390,232 @@ async def chat(
         request: Chat request with user message
         settings: Application settings
         llm_provider: LLM provider instance
+        context_packer: Fits tool context into the prompt budget
+        classifier: Intent classifier
+        router_service: Command router
+        tool_manager: Tool manager
 
     Returns:
-        Chat response with JARVIS reply
+        Chat response with JARVIS reply (metadata includes per-stage
+        timings if RESPONSE_TIMINGS is set)
 
     Raises:
-        HTTPException: If processing fails
+        HTTPException: If processing fails (503 with Retry-After if the
+            LLM queue is full)
     """
+    # Budget for the whole request; each stage gets what is left
+    deadline = Deadline(settings.request_timeout)
+
+    # Stages, tools and LLM calls record into it (each request runs in its
+    # own task, so the context variable is not shared)
+    timings = RequestTimings()
+    current_timings.set(timings)
+    intent = "unknown"
+
     try:
         user_message = request.message.strip()
 
-        # Initialize tool manager for this request
-        tool_manager = ToolManager()
-
-        # Step 0: Auto-detect tools that might be helpful
-        detected_tools = tool_manager.detect_tool(user_message)
-        tool_context = ""
-
-        if detected_tools:
-            # Execute detected tools and collect context
-            for tool_name in detected_tools:
-                result = tool_manager.execute_tool(tool_name, user_message)
-                if result.success and result.context:
-                    tool_context += f"\n## {tool_name.replace('_', ' ').title()}\n{result.context}"
-
-        # Step 1: Classify intent (if enabled)
-        if settings.enable_intent_classification:
-            classifier = IntentClassifier(llm_provider)
-            classification = classifier.classify(user_message)
-
-            intent = classification["intent"]
-            entities = classification.get("entities", {})
-            confidence = classification.get("confidence", 0.0)
-
-            # Check for errors in classification
-            if "error" in classification:
-                # Fallback: treat as general query
-                intent = "general"
-                entities = {}
-                confidence = 0.0
-        else:
-            # Skip classification, treat as general query
-            intent = "general"
-            entities = {}
-            confidence = 1.0
+        # Step 1: Classify intent (if enabled) while helpful tools run; in
+        # joint mode the LLM may answer in the same generation
+        analysis = await _analyze_message(
+            user_message, settings, classifier, router_service, tool_manager, deadline
+        )
+        intent, entities, confidence = analysis.intent, analysis.entities, analysis.confidence
+        joint_stream, tool_context = analysis.joint_stream, analysis.tool_context
 
         # Step 2: Route to command handler (if enabled)
-        if settings.enable_command_routing:
-            router_service = CommandRouter(llm_provider)
-            response_text = router_service.route(intent, entities, user_message, tool_context)
-        else:
-            # Direct LLM response without routing
-            system_prompt = "You are JARVIS, a helpful personal AI assistant. Answer briefly and helpfully."
-            
-            # Include tool context if available
-            if tool_context:
-                system_prompt += f"\n\nYou have access to current information:\n{tool_context}"
-
-            llm_response = llm_provider.generate(
-                prompt=user_message,
-                system_prompt=system_prompt,
-                max_tokens=settings.llm_max_tokens
-            )
-
-            if llm_response.error:
-                raise HTTPException(status_code=500, detail=llm_response.error)
-
-            response_text = llm_response.text.strip()
+        with timed("answer"):
+            if joint_stream is not None:
+                response_text = "".join([text async for text in joint_stream]).strip()
+            elif settings.enable_command_routing:
+                response_text = await router_service.route(intent, entities, user_message, tool_context, deadline)
+            else:
+                # Direct LLM response without routing (streamed internally,
+                # so an answer cut short by the deadline keeps its text)
+                text_stream = _stream_direct(
+                    llm_provider, user_message, tool_context, context_packer, settings, deadline
+                )
+                response_text = "".join([text async for text in text_stream]).strip()
 
         # Step 3: Return response
+        _finish_request(timings, deadline, "chat", intent)
+        metadata = {
+            "entities": entities,
+            "model": settings.llm_model_name or "default",
+            "tools_used": analysis.detected_tools,
+            "tools_timed_out": analysis.timed_out_tools,
+            "tools_cancelled": analysis.cancelled_tools,
+            "skipped_stages": analysis.skipped_stages,
+            "deadline_cut": deadline.cut
+        }
+        if settings.response_timings:
+            metadata["timings"] = timings.to_dict()
+
         return ChatResponse(
             response=response_text,
             intent=str(intent),
             confidence=confidence,
-            metadata={
-                "entities": entities,
-                "model": settings.llm_model_name or "default",
-                "tools_used": detected_tools
-            }
+            metadata=metadata
         )
 
     except HTTPException:
         raise
+    except LLMOverloadedError as e:
+        raise _overloaded(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
+    finally:
+        if timings.total is None:
+            # Failed requests are recorded too
+            _finish_request(timings, deadline, "chat", intent)
+
+
+@router.post("/chat/stream")
+async def chat_stream(
+    request: ChatRequest,
+    settings: Settings = Depends(get_settings),
+    llm_provider: BaseLLMProvider = Depends(get_llm_provider_instance),
+    context_packer: ContextPacker = Depends(get_context_packer_instance),
+    classifier: IntentClassifier = Depends(get_intent_classifier_instance),
+    router_service: CommandRouter = Depends(get_command_router_instance),
+    tool_manager: ToolManager = Depends(get_tool_manager_instance)
+) -> StreamingResponse:
+    """
+    Process chat message and stream the response as server-sent events.
+
+    Events, in order:
+        meta: intent, confidence, entities, model, tools_used,
+            tools_timed_out, tools_cancelled and skipped_stages
+        token: {"text": ...} for each generated text delta
+        sentence: {"text": ...} for each complete sentence, as soon as it
+            is finished (for early text-to-speech playback)
+        done: {"response": ...} with the full response text, and
+            deadline_cut: the stages stopped by the request deadline
+            (plus timings if RESPONSE_TIMINGS is set)
+        error: {"detail": ...} if processing fails (ends the stream);
+            includes retry_after if the LLM queue was full
+
+    Args:
+        request: Chat request with user message
+        settings: Application settings
+        llm_provider: LLM provider instance
+        context_packer: Fits tool context into the prompt budget
+        classifier: Intent classifier
+        router_service: Command router
+        tool_manager: Tool manager
+
+    Returns:
+        text/event-stream response
+
+    Raises:
+        HTTPException: 503 with Retry-After if the LLM queue is full
+            before streaming starts
+    """
+    user_message = request.message.strip()
+
+    # Budget for the whole request, streaming included
+    deadline = Deadline(settings.request_timeout)
+    timings = RequestTimings()
+    current_timings.set(timings)
+
+    # Tools and classification run before the stream starts, so an
+    # overloaded LLM queue can still be reported as a plain 503 (in joint
+    # mode the generation is started and read up to the intent label)
+    try:
+        analysis = await _analyze_message(
+            user_message, settings, classifier, router_service, tool_manager, deadline
+        )
+        intent, entities, confidence = analysis.intent, analysis.entities, analysis.confidence
+        joint_stream, tool_context = analysis.joint_stream, analysis.tool_context
+    except LLMOverloadedError as e:
+        _finish_request(timings, deadline, "chat_stream", "unknown")
+        raise _overloaded(e)
+    except Exception as e:
+        _finish_request(timings, deadline, "chat_stream", "unknown")
+        raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
+
+    async def event_stream() -> AsyncIterator[str]:
+        # The response is streamed from another task
+        current_timings.set(timings)
+        try:
+            yield _sse_event("meta", {
+                "intent": str(intent),
+                "confidence": confidence,
+                "entities": entities,
+                "model": settings.llm_model_name or "default",
+                "tools_used": analysis.detected_tools,
+                "tools_timed_out": analysis.timed_out_tools,
+                "tools_cancelled": analysis.cancelled_tools,
+                "skipped_stages": analysis.skipped_stages
+            })
+
+            response_text = ""
+            segmenter = SentenceSegmenter()
+
+            if joint_stream is not None:
+                text_stream = joint_stream
+            elif settings.enable_command_routing:
+                text_stream = router_service.route_stream(intent, entities, user_message, tool_context, deadline)
+            else:
+                text_stream = _stream_direct(
+                    llm_provider, user_message, tool_context, context_packer, settings, deadline
+                )
+
+            with timed("answer"):
+                async for text in text_stream:
+                    response_text += text
+                    yield _sse_event("token", {"text": text})
+                    for sentence in segmenter.feed(text):
+                        yield _sse_event("sentence", {"text": sentence})
+
+            last_sentence = segmenter.flush()
+            if last_sentence:
+                yield _sse_event("sentence", {"text": last_sentence})
+
+            _finish_request(timings, deadline, "chat_stream", intent)
+            done = {"response": response_text.strip(), "deadline_cut": deadline.cut}
+            if settings.response_timings:
+                done["timings"] = timings.to_dict()
+            yield _sse_event("done", done)
+
+        except LLMOverloadedError as e:
+            yield _sse_event("error", {"detail": str(e), "retry_after": e.retry_after})
+        except Exception as e:
+            yield _sse_event("error", {"detail": f"Error processing request: {str(e)}"})
+        finally:
+            if timings.total is None:
+                # Failed, or the client went away
+                _finish_request(timings, deadline, "chat_stream", intent)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        # Disable proxy buffering so tokens reach the browser immediately
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @router.get("/health")
 async def health_check(
-    llm_provider: BaseLLMProvider = Depends(get_llm_provider_instance)
+    llm_provider: BaseLLMProvider = Depends(get_llm_provider_instance),
+    classifier: IntentClassifier = Depends(get_intent_classifier_instance),
+    timer_scheduler: TimerScheduler = Depends(get_timer_scheduler_instance)
 ) -> Dict[str, Any]:
     """
     Health check endpoint.
 
     Returns:
-        Health status including LLM availability
+        Health status including LLM availability and statistics
+        (e.g. response cache hits and misses, intent classifier tier
+        hit rates, pending timers)
     """
-    llm_healthy = llm_provider.health_check()
+    llm_healthy = await llm_provider.ahealth_check()
 
     return {
         "status": "healthy" if llm_healthy else "degraded",
         "llm_available": llm_healthy,
+        "llm_stats": llm_provider.stats(),
+        "intent_stats": classifier.stats(),
+        "timer_stats": timer_scheduler.stats(),
         "service": "JARVIS Assistant"
     }
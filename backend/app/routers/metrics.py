@@ -0,0 +1,31 @@
+"""
+Metrics router for JARVIS
+
+Serves the pipeline metrics (app/metrics.py) in the Prometheus text
+format for scraping.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from ..config import get_settings, Settings
+from ..metrics import REGISTRY
+
+
+router = APIRouter(tags=["metrics"])
+
+# Content type of the Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics(settings: Settings = Depends(get_settings)) -> PlainTextResponse:
+    """
+    Get latency histograms and counters of the chat pipeline.
+
+    Raises:
+        HTTPException: 404 if metrics are disabled (METRICS_ENABLED)
+    """
+    if not settings.metrics_enabled:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,92 @@
+"""
+Timers router for JARVIS
+
+API endpoints for pending timers and reminders, and the push channel
+that delivers them when they fire.
+"""
+
+import asyncio
+import json
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import StreamingResponse
+from typing import Optional, Dict, Any, AsyncIterator
+
+from ..dependencies import get_timer_scheduler_instance
+from ..services.timer_scheduler import ScheduledEvent, TimerScheduler
+
+
+router = APIRouter(prefix="/api", tags=["timers"])
+
+# Seconds between keepalive comments on an idle event stream (keeps
+# proxies from closing it)
+KEEPALIVE_INTERVAL = 15
+
+
+def _sse_event(event: ScheduledEvent) -> str:
+    """Format a fired timer or reminder as a server-sent event."""
+    return f"id: {event.id}\nevent: {event.kind}\ndata: {json.dumps(event.to_dict())}\n\n"
+
+
+@router.get("/timers")
+async def list_timers(scheduler: TimerScheduler = Depends(get_timer_scheduler_instance)) -> Dict[str, Any]:
+    """Get pending timers and reminders, earliest first."""
+    pending = scheduler.pending()
+    return {
+        "pending": [event.to_dict() for event in pending],
+        "count": len(pending)
+    }
+
+
+@router.delete("/timers/{event_id}")
+async def cancel_timer(
+    event_id: str,
+    scheduler: TimerScheduler = Depends(get_timer_scheduler_instance)
+) -> Dict[str, Any]:
+    """
+    Cancel a pending timer or reminder.
+
+    Raises:
+        HTTPException: 404 if no such event is pending
+    """
+    if not scheduler.cancel(event_id):
+        raise HTTPException(status_code=404, detail=f"No pending timer or reminder '{event_id}'")
+    return {"cancelled": event_id}
+
+
+@router.get("/events")
+async def events(
+    last_event_id: Optional[str] = Header(default=None),
+    scheduler: TimerScheduler = Depends(get_timer_scheduler_instance)
+) -> StreamingResponse:
+    """
+    Stream timers and reminders as they fire (Server-Sent Events).
+
+    Each event is named after its kind ("timer" or "reminder") and
+    carries the event as JSON. A client reconnecting with Last-Event-ID
+    first gets the recently fired events it missed.
+
+    Returns:
+        text/event-stream response
+    """
+    queue = scheduler.subscribe()
+    missed = scheduler.recent(after=last_event_id) if last_event_id else []
+
+    async def event_stream() -> AsyncIterator[str]:
+        try:
+            for event in missed:
+                yield _sse_event(event)
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield _sse_event(event)
+        finally:
+            scheduler.unsubscribe(queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -4,16 +4,14 @@ Tools router for JARVIS
 API endpoints for tool management and execution.
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
+from app.dependencies import get_tool_manager_instance
 from app.tools.manager import ToolManager
 
 router = APIRouter(prefix="/api/tools", tags=["tools"])
 
-# Initialize tool manager
-tool_manager = ToolManager()
-
 
 class ToolRequest(BaseModel):
     """Request to execute a tool."""
@@ -35,7 +33,7 @@ class ToolResponse(BaseModel):
 
 
 @router.get("/available")
-async def get_available_tools():
+async def get_available_tools(tool_manager: ToolManager = Depends(get_tool_manager_instance)):
     """Get list of available tools."""
     tools = tool_manager.get_available_tools()
     return {
@@ -45,7 +43,7 @@ async def get_available_tools():
 
 
 @router.post("/execute")
-async def execute_tool(request: dict):
+async def execute_tool(request: dict, tool_manager: ToolManager = Depends(get_tool_manager_instance)):
     """
     Execute a specific tool.
     
@@ -81,7 +79,7 @@ async def execute_tool(request: dict):
 
 
 @router.post("/auto")
-async def execute_auto(request: dict):
+async def execute_auto(request: dict, tool_manager: ToolManager = Depends(get_tool_manager_instance)):
     """
     Auto-detect and execute relevant tools.
     
@@ -95,13 +93,13 @@ async def execute_auto(request: dict):
     if not query:
         raise HTTPException(status_code=400, detail="Missing required field: 'query'")
 
-    results = tool_manager.execute_auto(query)
+    results = await tool_manager.aexecute_auto(query)
 
     return results
 
 
 @router.get("/detect/{query}")
-async def detect_tools(query: str):
+async def detect_tools(query: str, tool_manager: ToolManager = Depends(get_tool_manager_instance)):
     """Detect which tools are relevant for a query."""
     detected = tool_manager.detect_tool(query)
 
@@ -2,5 +2,27 @@
 
 from .intent_classifier import IntentClassifier, IntentType
 from .command_router import CommandRouter
+from .sentence_segmenter import SentenceSegmenter
+from .context_packer import ContextPacker, TokenCounter, format_tool_context
+from .local_classifier import NaiveBayesIntentModel
+from .partial_json import StreamingJSONParser, parse_partial_json
+from .calculator import CalculationError, ExpressionParseError, calculate
+from .entity_extractor import extract_entities, parse_duration
 
-__all__ = ["IntentClassifier", "IntentType", "CommandRouter"]
+__all__ = [
+    "IntentClassifier",
+    "IntentType",
+    "CommandRouter",
+    "SentenceSegmenter",
+    "ContextPacker",
+    "TokenCounter",
+    "format_tool_context",
+    "NaiveBayesIntentModel",
+    "StreamingJSONParser",
+    "parse_partial_json",
+    "CalculationError",
+    "ExpressionParseError",
+    "calculate",
+    "extract_entities",
+    "parse_duration",
+]
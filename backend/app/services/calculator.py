@@ -0,0 +1,442 @@
+"""
+Calculator Service
+
+Deterministic evaluation of spoken and written arithmetic.
+
+Calculations used to be a full LLM generation, which is slow on the Pi and
+often wrong for a 1.5B model. Messages like "twelve percent of 340",
+"sqrt 2 times pi" or "what's (3 + 4) ^ 2" are rewritten into a Python
+expression (number words, operator words and implicit multiplication are
+resolved), parsed with ast and evaluated over a whitelist of node types,
+operators, functions and constants. Exponents, integer sizes, expression
+size and evaluation time are bounded, so no input can make it hang.
+Nothing is ever passed to eval().
+"""
+
+import ast
+import math
+import operator
+import re
+import time
+from decimal import Context, Decimal
+from typing import Callable, Dict, List, Union
+
+
+Number = Union[int, float]
+
+# Limits
+MAX_EXPRESSION_LENGTH = 256
+MAX_NODES = 100
+MAX_EXPONENT = 1024
+MAX_INT_BITS = 4096
+MAX_FACTORIAL = 170  # Largest factorial that still fits in a float
+MAX_EVAL_SECONDS = 0.01
+
+# Results are spoken with 10 significant digits
+_SIGNIFICANT_DIGITS = Context(prec=10)
+
+
+class CalculationError(ValueError):
+    """Raised when an expression can't be evaluated (e.g. division by zero)."""
+
+
+class ExpressionParseError(CalculationError):
+    """Raised when a message can't be read as an arithmetic expression."""
+
+
+CONSTANTS: Dict[str, float] = {"pi": math.pi, "e": math.e, "tau": math.tau}
+
+
+def _cbrt(x: float) -> float:
+    return math.copysign(abs(x) ** (1 / 3), x)
+
+
+def _factorial(x: Number) -> int:
+    if x != int(x) or not 0 <= x <= MAX_FACTORIAL:
+        raise CalculationError(f"factorial needs a whole number from 0 to {MAX_FACTORIAL}")
+    return math.factorial(int(x))
+
+
+FUNCTIONS: Dict[str, Callable[..., Number]] = {
+    "sqrt": math.sqrt,
+    "cbrt": _cbrt,
+    "abs": abs,
+    "round": round,
+    "floor": math.floor,
+    "ceil": math.ceil,
+    "exp": math.exp,
+    "ln": math.log,
+    "log": math.log10,
+    "sin": math.sin,
+    "cos": math.cos,
+    "tan": math.tan,
+    "factorial": _factorial,
+}
+
+_BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+
+_UNARY_OPERATORS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+# Number words
+_UNITS = {
+    word: value for value, word in enumerate(
+        "zero one two three four five six seven eight nine ten eleven twelve thirteen "
+        "fourteen fifteen sixteen seventeen eighteen nineteen".split()
+    )
+}
+_TENS = {
+    word: value * 10 for value, word in enumerate(
+        "twenty thirty forty fifty sixty seventy eighty ninety".split(), start=2
+    )
+}
+_SCALES = {"hundred": 100, "thousand": 10 ** 3, "million": 10 ** 6, "billion": 10 ** 9}
+
+# Operator phrases -> expression tokens, matched longest first
+_PHRASES = {
+    ("raised", "to", "the", "power", "of"): ["**"],
+    ("to", "the", "power", "of"): ["**"],
+    ("raised", "to"): ["**"],
+    ("multiplied", "by"): ["*"],
+    ("divided", "by"): ["/"],
+    ("square", "root", "of"): ["sqrt"],
+    ("square", "root"): ["sqrt"],
+    ("cube", "root", "of"): ["cbrt"],
+    ("cube", "root"): ["cbrt"],
+    ("natural", "log", "of"): ["ln"],
+    ("per", "cent", "of"): ["/", "100", "*"],
+    ("percent", "of"): ["/", "100", "*"],
+    ("%", "of"): ["/", "100", "*"],
+    ("per", "cent"): ["/", "100"],
+    ("percent",): ["/", "100"],
+    ("half", "of"): ["0.5", "*"],
+    ("twice",): ["2", "*"],
+    ("double",): ["2", "*"],
+    ("squared",): ["**", "2"],
+    ("cubed",): ["**", "3"],
+    ("plus",): ["+"],
+    ("minus",): ["-"],
+    ("negative",): ["-"],
+    ("times",): ["*"],
+    ("over",): ["/"],
+    ("mod",): ["%"],
+    ("modulo",): ["%"],
+    ("^",): ["**"],
+    ("×",): ["*"],
+    ("÷",): ["/"],
+    ("−",): ["-"],
+}
+_MAX_PHRASE = max(len(phrase) for phrase in _PHRASES)
+
+# Words around the math that carry no meaning ("what's", "calculate", ...)
+_LEAD_WORDS = {
+    "what", "what's", "whats", "is", "calculate", "compute", "evaluate", "solve", "how", "much",
+    "work", "out", "tell", "me", "please", "jarvis", "hey", "can", "could", "you", "the",
+    "result", "answer", "of", "to", "does", "do", "give", "equal", "equals",
+}
+_TRAIL_WORDS = {"equal", "equals", "is", "please", "jarvis", "be", "make"}
+
+_TOKEN = re.compile(r"\d+(?:\.\d+)?(?:e[+-]?\d+)?|\.\d+|[a-z']+|\*\*|//|\S")
+_IGNORED = set("?!,=")
+
+
+def _is_number(token: str) -> bool:
+    return bool(token) and (token[0].isdigit() or token[0] == ".")
+
+
+def words_to_numbers(tokens: List[str]) -> List[str]:
+    """
+    Replace runs of number words with digits.
+
+    "three hundred and five point two" becomes "305.2"; "five thirty"
+    stays two numbers ("5", "30"), as in clock times.
+
+    Args:
+        tokens: Lowercase word and number tokens
+
+    Returns:
+        Tokens with every number-word run replaced by one number token
+    """
+    result: List[str] = []
+    index = 0
+    while index < len(tokens):
+        token = tokens[index]
+        following = tokens[index + 1] if index + 1 < len(tokens) else ""
+        is_start = (
+            token in _UNITS or token in _TENS
+            or ((token == "a" or _is_number(token)) and following in _SCALES)
+        )
+        if not is_start:
+            result.append(token)
+            index += 1
+            continue
+
+        total, current = 0, 0
+        started = False
+        while index < len(tokens):
+            token = tokens[index]
+            if token in _TENS and (not started or current % 100 == 0):
+                current += _TENS[token]
+            elif token in _UNITS and (not started or (current % 100 == 0 or (current % 10 == 0 and current % 100 >= 20))):
+                current += _UNITS[token]
+            elif (token == "a" or _is_number(token)) and not started:
+                # Only at the start of a run: "a hundred", "3 million"
+                current = 1 if token == "a" else int(token) if token.isdigit() else float(token)
+            elif token in _SCALES and started:
+                if _SCALES[token] == 100:
+                    current = (current or 1) * 100
+                else:
+                    total += (current or 1) * _SCALES[token]
+                    current = 0
+            elif token == "and" and started and index + 1 < len(tokens) and (
+                tokens[index + 1] in _UNITS or tokens[index + 1] in _TENS
+            ):
+                pass
+            else:
+                break
+            started = True
+            index += 1
+
+        value = total + current
+        # Decimal part, spoken digit by digit
+        if index + 1 < len(tokens) and tokens[index] == "point" and tokens[index + 1] in _UNITS:
+            digits = ""
+            index += 1
+            while index < len(tokens) and tokens[index] in _UNITS and _UNITS[tokens[index]] < 10:
+                digits += str(_UNITS[tokens[index]])
+                index += 1
+            value = float(f"{value}.{digits}")
+
+        result.append(str(value))
+    return result
+
+
+def _phrases(tokens: List[str]) -> List[str]:
+    """Replace operator phrases with expression tokens."""
+    result: List[str] = []
+    index = 0
+    while index < len(tokens):
+        for length in range(min(_MAX_PHRASE, len(tokens) - index), 0, -1):
+            replacement = _PHRASES.get(tuple(tokens[index:index + length]))
+            if replacement is not None:
+                result.extend(replacement)
+                index += length
+                break
+        else:
+            token = tokens[index]
+            following = tokens[index + 1] if index + 1 < len(tokens) else ""
+            if token == "%" and not (following and (_is_number(following) or following == "(")):
+                # "12%" is a percentage, "10 % 3" a remainder
+                result.extend(["/", "100"])
+            elif token == "x" and result and (_is_number(result[-1]) or result[-1] == ")"):
+                result.append("*")
+            elif token == "of" and result and result[-1] in FUNCTIONS:
+                pass  # "log of 5"
+            else:
+                result.append(token)
+            index += 1
+    return result
+
+
+def _is_atom(token: str) -> bool:
+    return _is_number(token) or token in CONSTANTS
+
+
+def _implicit_syntax(tokens: List[str]) -> List[str]:
+    """Add calls for functions without parentheses and implicit multiplication."""
+    result: List[str] = []
+    index = 0
+    while index < len(tokens):
+        token = tokens[index]
+        previous = result[-1] if result else ""
+
+        # "2 pi", "3 (4 + 5)", "2 sqrt 2"
+        if (previous == ")" or _is_atom(previous)) and (token == "(" or _is_atom(token) or token in FUNCTIONS):
+            if not (_is_number(previous) and _is_number(token)):
+                result.append("*")
+
+        # "sqrt 2" -> "sqrt(2)", "sqrt -4" -> "sqrt(-4)"
+        if token in FUNCTIONS and index + 1 < len(tokens) and tokens[index + 1] != "(":
+            sign: List[str] = []
+            argument_index = index + 1
+            if tokens[argument_index] == "-" and argument_index + 1 < len(tokens):
+                sign, argument_index = ["-"], argument_index + 1
+            if argument_index < len(tokens) and _is_atom(tokens[argument_index]):
+                result.extend([token, "(", *sign, tokens[argument_index], ")"])
+                index = argument_index + 1
+                continue
+
+        result.append(token)
+        index += 1
+    return result
+
+
+def to_expression(text: str) -> str:
+    """
+    Rewrite a spoken or written calculation as a Python expression.
+
+    Args:
+        text: User message, e.g. "what's twelve percent of 340?"
+
+    Returns:
+        Expression text, e.g. "12 / 100 * 340"
+
+    Raises:
+        ExpressionParseError: If the message contains no math
+    """
+    text = text.lower().replace("’", "'")
+    # Thousands separators: "1,000,000"
+    text = re.sub(r"(?<=\d),(?=\d{3}\b)", "", text)
+
+    tokens = [token for token in _TOKEN.findall(text) if token not in _IGNORED]
+    while tokens and tokens[0] in _LEAD_WORDS:
+        tokens.pop(0)
+    while tokens and tokens[-1] in _TRAIL_WORDS:
+        tokens.pop()
+    # Drop a trailing "." (end of sentence, not a decimal point)
+    while tokens and tokens[-1] == ".":
+        tokens.pop()
+
+    tokens = _implicit_syntax(_phrases(words_to_numbers(tokens)))
+    if not any(_is_atom(token) for token in tokens):
+        raise ExpressionParseError("No numbers in message")
+
+    return " ".join(tokens)
+
+
+def _check_limits(node: ast.BinOp, left: Number, right: Number) -> None:
+    """Refuse powers whose result would be too large to compute quickly."""
+    if not isinstance(node.op, ast.Pow):
+        return
+    if abs(right) > MAX_EXPONENT:
+        raise CalculationError("exponent too large")
+    if isinstance(left, int) and isinstance(right, int) and right > 0:
+        if left.bit_length() * right > MAX_INT_BITS:
+            raise CalculationError("result too large")
+
+
+def _evaluate(node: ast.AST, deadline: float) -> Number:
+    """Evaluate a whitelisted expression node."""
+    if time.perf_counter() > deadline:
+        raise CalculationError("calculation took too long")
+
+    if isinstance(node, ast.Expression):
+        return _evaluate(node.body, deadline)
+
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        if not math.isfinite(node.value):
+            raise CalculationError("number too large")
+        return node.value
+
+    if isinstance(node, ast.Name) and node.id in CONSTANTS:
+        return CONSTANTS[node.id]
+
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPERATORS:
+        return _UNARY_OPERATORS[type(node.op)](_evaluate(node.operand, deadline))
+
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPERATORS:
+        left = _evaluate(node.left, deadline)
+        right = _evaluate(node.right, deadline)
+        _check_limits(node, left, right)
+        result = _BINARY_OPERATORS[type(node.op)](left, right)
+        if isinstance(result, complex):
+            raise CalculationError("result is not a real number")
+        if isinstance(result, int) and result.bit_length() > MAX_INT_BITS:
+            raise CalculationError("result too large")
+        if isinstance(result, float) and not math.isfinite(result):
+            raise CalculationError("result too large")
+        return result
+
+    if (
+        isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+        and node.func.id in FUNCTIONS and not node.keywords
+    ):
+        arguments = [_evaluate(argument, deadline) for argument in node.args]
+        return FUNCTIONS[node.func.id](*arguments)
+
+    raise ExpressionParseError(f"Unsupported expression element: {type(node).__name__}")
+
+
+def evaluate_expression(expression: str) -> Number:
+    """
+    Evaluate an arithmetic expression safely.
+
+    Args:
+        expression: Python-syntax arithmetic (see to_expression)
+
+    Returns:
+        Result
+
+    Raises:
+        ExpressionParseError: If the expression is not valid, whitelisted
+            arithmetic
+        CalculationError: If evaluation fails or exceeds a limit
+    """
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise ExpressionParseError("Expression too long")
+
+    try:
+        tree = ast.parse(expression, mode="eval")
+    except SyntaxError as e:
+        raise ExpressionParseError(f"Invalid expression: {e.msg}") from e
+
+    if sum(1 for _ in ast.walk(tree)) > MAX_NODES:
+        raise ExpressionParseError("Expression too complex")
+
+    try:
+        return _evaluate(tree, time.perf_counter() + MAX_EVAL_SECONDS)
+    except ZeroDivisionError as e:
+        raise CalculationError("division by zero") from e
+    except OverflowError as e:
+        raise CalculationError("result too large") from e
+    except CalculationError:
+        raise
+    except TypeError as e:
+        # Wrong number of function arguments
+        raise ExpressionParseError(str(e)) from e
+    except ValueError as e:
+        raise CalculationError("undefined for that input") from e
+
+
+def calculate(text: str) -> Number:
+    """
+    Evaluate a spoken or written calculation.
+
+    Args:
+        text: User message
+
+    Returns:
+        Result
+
+    Raises:
+        ExpressionParseError: If the message can't be read as arithmetic
+        CalculationError: If evaluation fails or exceeds a limit
+    """
+    return evaluate_expression(to_expression(text))
+
+
+def format_number(value: Number) -> str:
+    """
+    Format a result for a spoken reply.
+
+    Whole numbers below 1e15 are written out in full (floats lose their
+    ".0"); others keep 10 significant digits.
+    """
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    if isinstance(value, int):
+        if abs(value) < 10 ** 15:
+            return str(value)
+        # Through Decimal: ints can be too large for a float
+        return f"{Decimal(value).normalize(_SIGNIFICANT_DIGITS):.10g}"
+    return f"{value:.10g}"
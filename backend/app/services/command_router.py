@@ -5,10 +5,88 @@ Routes classified intents to appropriate handlers.
 Provides deterministic responses for common commands.
 """
 
+import re
+import time
 from datetime import datetime
-from typing import Dict, Any
-from .intent_classifier import IntentType
-from ..llm import BaseLLMProvider, LLMResponse
+from functools import lru_cache
+from typing import Dict, Any, AsyncIterator, Optional, Tuple
+from .intent_classifier import RULE_ENTITY_INTENTS, IntentType
+from .calculator import CalculationError, ExpressionParseError, calculate, format_number
+from .entity_extractor import extract_entities, format_duration, parse_duration
+from .context_packer import ContextPacker, format_tool_context
+from .timer_scheduler import TimerScheduler
+from .prompts import PROMPT_LAYOUTS, build_prompt
+from ..llm import BaseLLMProvider, LLMResponse, LLMTask, Deadline, DEADLINE_EXCEEDED
+
+
+# Intents answered by the LLM; all others have a deterministic handler
+LLM_ANSWERED_INTENTS = {IntentType.COMMAND, IntentType.QUESTION, IntentType.GENERAL}
+
+# Joint generations: the intent label on the first line, then free text
+JOINT_GRAMMAR = "\n".join([
+    'root ::= intent "\\n" answer',
+    "intent ::= " + " | ".join(f'"{intent.value}"' for intent in IntentType if intent != IntentType.UNKNOWN),
+    "answer ::= [^\\x00]*",
+])
+
+# Answer budget plus the intent line
+JOINT_MAX_TOKENS = 256 + 8
+
+# Without a grammar (Ollama) the model may skip the label line; a first
+# line longer than this is treated as the start of the answer
+JOINT_LABEL_MAX_CHARS = 24
+
+_LABEL_NOISE = re.compile(r"^\W*(intent\W*)?|\W+$")
+
+# Reply when the LLM fails before any answer text
+TROUBLE_REPLY = "I'm having trouble processing that request right now."
+
+# Reply when the request deadline passes before any answer text
+DEADLINE_REPLY = "Sorry, I ran out of time to answer that."
+
+
+def _duration_seconds(duration: Any) -> Optional[int]:
+    """Duration entity in seconds (the LLM may give text like "5 minutes")."""
+    if isinstance(duration, (int, float)):
+        return int(duration)
+    if isinstance(duration, str):
+        return parse_duration(duration)
+    return None
+
+
+def _parse_intent_label(line: str) -> Optional[IntentType]:
+    """Read the intent label line of a joint generation ("Intent: time" etc.)."""
+    label = _LABEL_NOISE.sub("", line.strip().lower())
+    try:
+        return IntentType(label)
+    except ValueError:
+        return None
+
+
+def _error_reply(error: str) -> str:
+    """Reply for an LLM error that left no answer text."""
+    return DEADLINE_REPLY if error == DEADLINE_EXCEEDED else TROUBLE_REPLY
+
+
+@lru_cache(maxsize=64)
+def _calculator_reply(user_input: str) -> Optional[str]:
+    """
+    Reply from the calculator; None if the message isn't plain arithmetic.
+
+    Cached: the chat pipeline asks whether the LLM is needed before the
+    handler answers, and both would evaluate the same message.
+    """
+    try:
+        return f"The result is: {format_number(calculate(user_input))}"
+    except ExpressionParseError:
+        return None  # Let the LLM interpret it
+    except CalculationError as e:
+        return f"I couldn't perform that calculation: {e}."
+
+
+async def _reply_stream(text: str) -> AsyncIterator[str]:
+    """Stream a fixed reply."""
+    yield text
 
 
 class CommandRouter:
@@ -19,16 +97,56 @@ class CommandRouter:
     For open-ended queries, uses LLM to generate responses.
     """
 
-    def __init__(self, llm_provider: BaseLLMProvider):
+    def __init__(
+        self,
+        llm_provider: BaseLLMProvider,
+        context_packer: Optional[ContextPacker] = None,
+        scheduler: Optional[TimerScheduler] = None
+    ):
         """
         Initialize command router.
 
         Args:
             llm_provider: LLM provider instance
+            context_packer: Fits tool context into the prompt budget
+                (tool context is used unbounded if not given)
+            scheduler: Schedules timers and reminders (they are only
+                acknowledged if not given)
         """
         self.llm = llm_provider
+        self.context_packer = context_packer
+        self.scheduler = scheduler
+
+    def answers_with_llm(self, intent: str, user_input: str, joint: bool = False) -> bool:
+        """
+        Check whether routing a message generates its answer with the LLM.
+
+        Calculations only do when the calculator can't parse the message.
+
+        Args:
+            intent: Classified intent type
+            user_input: Original user input
+            joint: The intent was decoded by route_joint (UNKNOWN keeps
+                the joint generation going)
 
-    def route(self, intent: str, entities: Dict[str, Any], user_input: str, tool_context: str = "") -> str:
+        Returns:
+            True if the LLM writes the answer
+        """
+        intent_type = IntentType(intent) if isinstance(intent, str) else intent
+        if intent_type in LLM_ANSWERED_INTENTS or (joint and intent_type == IntentType.UNKNOWN):
+            return True
+        if intent_type == IntentType.CALCULATION:
+            return _calculator_reply(user_input) is None
+        return False
+
+    async def route(
+        self,
+        intent: str,
+        entities: Dict[str, Any],
+        user_input: str,
+        tool_context: Optional[Dict[str, str]] = None,
+        deadline: Optional[Deadline] = None
+    ) -> str:
         """
         Route intent to appropriate handler.
 
@@ -36,7 +154,9 @@ class CommandRouter:
             intent: Classified intent type
             entities: Extracted entities
             user_input: Original user input
-            tool_context: Context from executed tools
+            tool_context: Context from executed tools (tool name -> text)
+            deadline: Request deadline for LLM answers (an answer cut
+                short by it is the text generated so far)
 
         Returns:
             Response text
@@ -54,7 +174,7 @@ class CommandRouter:
             return self._handle_weather(entities)
 
         elif intent_type == IntentType.CALCULATION:
-            return self._handle_calculation(user_input)
+            return await self._handle_calculation(user_input, deadline)
 
         elif intent_type == IntentType.TIMER:
             return self._handle_timer(entities)
@@ -63,14 +183,134 @@ class CommandRouter:
             return self._handle_reminder(entities)
 
         elif intent_type == IntentType.COMMAND:
-            return self._handle_general_query(user_input, tool_context)
+            return await self._handle_general_query(user_input, tool_context, deadline)
 
         elif intent_type in [IntentType.QUESTION, IntentType.GENERAL]:
-            return self._handle_general_query(user_input, tool_context)
+            return await self._handle_general_query(user_input, tool_context, deadline)
 
         else:
             return "I'm not sure how to help with that. Could you rephrase?"
 
+    async def route_stream(
+        self,
+        intent: str,
+        entities: Dict[str, Any],
+        user_input: str,
+        tool_context: Optional[Dict[str, str]] = None,
+        deadline: Optional[Deadline] = None
+    ) -> AsyncIterator[str]:
+        """
+        Route intent to a handler and stream the response text.
+
+        General queries are streamed token by token from the LLM;
+        deterministic handlers yield their full response at once.
+
+        Args:
+            intent: Classified intent type
+            entities: Extracted entities
+            user_input: Original user input
+            tool_context: Context from executed tools (tool name -> text)
+            deadline: Request deadline for LLM answers (the stream ends
+                when it passes)
+
+        Yields:
+            Response text deltas
+        """
+        intent_type = IntentType(intent) if isinstance(intent, str) else intent
+
+        if intent_type in LLM_ANSWERED_INTENTS:
+            async for text in self._stream_general_query(user_input, tool_context, deadline):
+                yield text
+        else:
+            yield await self.route(intent_type, entities, user_input, tool_context, deadline)
+
+    async def route_joint(
+        self,
+        user_input: str,
+        tool_context: Optional[Dict[str, str]] = None,
+        deadline: Optional[Deadline] = None
+    ) -> Tuple[IntentType, AsyncIterator[str]]:
+        """
+        Classify and answer a message in a single LLM generation.
+
+        The model writes the intent label on the first line, then the
+        answer. Once the label is decoded, intents with a deterministic
+        handler cancel the generation and are routed as usual (only timers
+        and reminders get entities, from the rule-based extractor);
+        open-ended intents keep streaming the answer from the
+        same decode.
+
+        Args:
+            user_input: Original user input
+            tool_context: Context from executed tools (tool name -> text)
+            deadline: Request deadline
+
+        Returns:
+            (intent, stream of response text deltas); if the LLM fails or
+            the deadline passes before the label is decoded, the intent is
+            UNKNOWN and the reply says so
+        """
+        system_prompt, prompt = await self._general_prompt(user_input, tool_context, task=LLMTask.JOINT)
+        stream = self.llm.astream(
+            prompt=prompt,
+            system_prompt=system_prompt,
+            max_tokens=JOINT_MAX_TOKENS,
+            temperature=0.3,
+            grammar=JOINT_GRAMMAR,
+            task=LLMTask.JOINT,
+            deadline=deadline
+        )
+
+        head = ""
+        try:
+            async for chunk in stream:
+                if chunk.error:
+                    await stream.aclose()
+                    return IntentType.UNKNOWN, _reply_stream(_error_reply(chunk.error))
+                head += chunk.text
+                if "\n" in head or len(head) > JOINT_LABEL_MAX_CHARS:
+                    break
+        except BaseException:
+            await stream.aclose()
+            raise
+
+        label, newline, rest = head.partition("\n")
+        intent = _parse_intent_label(label) if newline or len(head) <= JOINT_LABEL_MAX_CHARS else None
+        if intent is None:
+            # No label line: everything decoded so far is answer text
+            intent, rest = IntentType.GENERAL, head
+
+        if intent in LLM_ANSWERED_INTENTS or intent == IntentType.UNKNOWN:
+            return intent, self._continue_joint(stream, rest)
+
+        # Closing the stream cancels the rest of the generation
+        await stream.aclose()
+        entities = extract_entities(user_input) if intent in RULE_ENTITY_INTENTS else {}
+        return intent, self.route_stream(intent, entities, user_input, tool_context, deadline)
+
+    async def _continue_joint(self, stream: AsyncIterator[LLMResponse], head: str) -> AsyncIterator[str]:
+        """Stream the answer part of a joint generation."""
+        streamed = False
+        try:
+            head = head.lstrip()
+            if head:
+                streamed = True
+                yield head
+
+            async for chunk in stream:
+                if chunk.error:
+                    if not streamed:
+                        yield _error_reply(chunk.error)
+                    return
+
+                if chunk.text:
+                    text = chunk.text if streamed else chunk.text.lstrip()
+                    if text:
+                        streamed = True
+                        yield text
+        finally:
+            await stream.aclose()
+
     def _handle_greeting(self) -> str:
         """Handle greeting intent."""
         hour = datetime.now().hour
@@ -99,65 +339,135 @@ class CommandRouter:
         location = entities.get("location", "your location")
         return f"I don't have access to weather data yet. Weather integration for {location} is coming soon."
 
-    def _handle_calculation(self, user_input: str) -> str:
+    async def _handle_calculation(self, user_input: str, deadline: Optional[Deadline] = None) -> str:
         """
         Handle calculation request.
 
-        Note: For safety, use the LLM to interpret the calculation
-        rather than using eval() on user input.
+        Arithmetic is evaluated by the safe calculator (no eval() on user
+        input); the LLM only interprets messages it can't parse.
         """
-        prompt = f"Calculate and respond with just the result: {user_input}"
-        response = self.llm.generate(
+        reply = _calculator_reply(user_input)
+        if reply is not None:
+            return reply
+
+        system_prompt, prompt = build_prompt(LLMTask.CALCULATION, user_input)
+        response = await self.llm.agenerate(
             prompt=prompt,
-            system_prompt="You are a calculator. Respond only with the numerical result.",
+            system_prompt=system_prompt,
             max_tokens=64,
-            temperature=0.0
+            temperature=0.0,
+            task=LLMTask.CALCULATION,
+            deadline=deadline
         )
 
+        if response.error == DEADLINE_EXCEEDED:
+            return DEADLINE_REPLY
         if response.error:
             return "I couldn't perform that calculation."
 
         return f"The result is: {response.text.strip()}"
 
     def _handle_timer(self, entities: Dict[str, Any]) -> str:
-        """
-        Handle timer request.
+        """Handle timer request."""
+        duration = _duration_seconds(entities.get("duration"))
+        if duration is None:
+            return "How long should the timer run?"
+        if self.scheduler is None:
+            return f"Timer functionality is not available. Timer for {format_duration(duration)} requested."
 
-        Note: This is a placeholder. Timer functionality requires
-        persistent state or background tasks.
-        """
-        duration = entities.get("duration", "the specified time")
-        return f"Timer functionality is not yet implemented. Timer for {duration} requested."
+        self.scheduler.schedule("timer", time.time() + duration, entities.get("message") or "")
+        return f"Timer set for {format_duration(duration)}."
 
     def _handle_reminder(self, entities: Dict[str, Any]) -> str:
+        """Handle reminder request."""
+        try:
+            due = datetime.fromisoformat(entities["due"])
+        except (KeyError, TypeError, ValueError):
+            return "When should I remind you?"
+        if due <= datetime.now(due.tzinfo):
+            return "When should I remind you?"
+        if self.scheduler is None:
+            return "Reminder functionality is not available."
+
+        message = entities.get("message") or ""
+        self.scheduler.schedule("reminder", due.timestamp(), message)
+
+        what = f" to {message}" if message else ""
+        if due.date() == datetime.now().date():
+            return f"I'll remind you{what} at {due.strftime('%H:%M')}."
+        return f"I'll remind you{what} on {due.strftime('%A %d %B')} at {due.strftime('%H:%M')}."
+
+    async def _general_prompt(
+        self,
+        user_input: str,
+        tool_context: Optional[Dict[str, str]] = None,
+        task: LLMTask = LLMTask.ANSWER
+    ) -> Tuple[str, str]:
         """
-        Handle reminder request.
+        Build the prompt for general queries, within the token budget.
+
+        Tool context goes after the fixed system prompt, in the user turn.
+
+        Args:
+            user_input: Original user input
+            tool_context: Context from executed tools (tool name -> text)
+            task: Prompt layout (ANSWER, or JOINT for joint generations)
 
-        Note: This is a placeholder. Reminder functionality requires
-        persistent state or a task queue.
+        Returns:
+            (system_prompt, prompt)
         """
-        return "Reminder functionality is not yet implemented."
+        context = ""
 
-    def _handle_general_query(self, user_input: str, tool_context: str = "") -> str:
+        if tool_context:
+            if self.context_packer:
+                fixed_text = PROMPT_LAYOUTS[task].fixed_text(user_input)
+                context = await self.context_packer.pack(tool_context, user_input, fixed_text=fixed_text)
+            else:
+                context = format_tool_context(tool_context)
+
+        return build_prompt(task, user_input, context)
+
+    async def _handle_general_query(
+        self,
+        user_input: str,
+        tool_context: Optional[Dict[str, str]] = None,
+        deadline: Optional[Deadline] = None
+    ) -> str:
         """
         Handle general questions using LLM.
 
-        Keep prompts simple for small models.
+        Keep prompts simple for small models. Streamed internally, so an
+        answer cut short by the deadline keeps the text generated so far.
         """
-        system_prompt = "You are JARVIS, a helpful assistant. Answer briefly and directly."
-        
-        # Include tool context if available
-        if tool_context:
-            system_prompt += f"\n\nYou have access to current information:\n{tool_context}"
-
-        response = self.llm.generate(
-            prompt=user_input,
+        parts = [text async for text in self._stream_general_query(user_input, tool_context, deadline)]
+        return "".join(parts).strip()
+
+    async def _stream_general_query(
+        self,
+        user_input: str,
+        tool_context: Optional[Dict[str, str]] = None,
+        deadline: Optional[Deadline] = None
+    ) -> AsyncIterator[str]:
+        """Stream the answer to a general question from the LLM."""
+        system_prompt, prompt = await self._general_prompt(user_input, tool_context)
+        streamed = False
+
+        async for chunk in self.llm.astream(
+            prompt=prompt,
             system_prompt=system_prompt,
             max_tokens=256,
-            temperature=0.3
-        )
-
-        if response.error:
-            return "I'm having trouble processing that request right now."
-
-        return response.text.strip()
+            temperature=0.3,
+            task=LLMTask.ANSWER,
+            deadline=deadline
+        ):
+            if chunk.error:
+                if not streamed:
+                    yield _error_reply(chunk.error)
+                return
+
+            if chunk.text:
+                # Drop leading whitespace like the non-streaming path does
+                text = chunk.text if streamed else chunk.text.lstrip()
+                if text:
+                    streamed = True
+                    yield text
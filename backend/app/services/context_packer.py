@@ -0,0 +1,235 @@
+"""
+Context Packer Service
+
+Fits tool context into the prompt token budget.
+
+Tool results (web search, file search, notes, ...) can easily exceed the
+2048-token window llama.cpp runs with on the Pi. The packer counts tokens,
+gives every tool section a fair share of the budget and trims oversized
+sections down to their most relevant snippets, so the final prompt always
+fits and prompt evaluation time stays predictable.
+"""
+
+import math
+import re
+from typing import Dict, List
+
+from ..llm import BaseLLMProvider
+from ..llm.cache import TTLCache
+
+
+# Token overhead of the chat template around system and user turns
+TEMPLATE_OVERHEAD_TOKENS = 16
+
+_WORD = re.compile(r"\w+")
+
+
+def format_tool_context(sections: Dict[str, str]) -> str:
+    """
+    Format tool sections for the prompt.
+
+    Args:
+        sections: Tool name -> context text
+
+    Returns:
+        Sections joined under "## Tool Name" headings
+    """
+    return "".join(
+        f"\n## {name.replace('_', ' ').title()}\n{text}"
+        for name, text in sections.items()
+        if text
+    )
+
+
+class TokenCounter:
+    """
+    Counts tokens with the model tokenizer, falling back to an estimate.
+
+    Exact counts come from the provider (llama.cpp /tokenize) and are
+    cached. Every exact count also calibrates the characters-per-token
+    ratio used for estimates, so estimates track the real tokenizer.
+    """
+
+    def __init__(self, llm_provider: BaseLLMProvider, cache_size: int = 512, chars_per_token: float = 3.5):
+        """
+        Initialize token counter.
+
+        Args:
+            llm_provider: Provider used for exact tokenization
+            cache_size: Number of exact counts to cache
+            chars_per_token: Initial estimate ratio (conservative for Qwen)
+        """
+        self.llm = llm_provider
+        self.chars_per_token = chars_per_token
+        self._cache = TTLCache(max_entries=cache_size, ttl=float("inf"))
+
+    def estimate(self, text: str) -> int:
+        """Estimate tokens from text length using the calibrated ratio."""
+        return math.ceil(len(text) / self.chars_per_token)
+
+    async def count(self, text: str) -> int:
+        """
+        Count tokens in text.
+
+        Returns:
+            Exact count if the provider can tokenize, otherwise an estimate
+        """
+        if not text:
+            return 0
+
+        cached = self._cache.get(text)
+        if cached is not None:
+            return cached
+
+        exact = await self.llm.acount_tokens(text)
+        if exact is None:
+            return self.estimate(text)
+
+        if exact > 0 and len(text) >= 64:
+            # Calibrate on reasonably long samples only
+            self.chars_per_token = 0.8 * self.chars_per_token + 0.2 * (len(text) / exact)
+
+        self._cache.set(text, exact)
+        return exact
+
+
+class ContextPacker:
+    """
+    Packs tool sections into a fixed prompt token budget.
+
+    The budget is split fairly: small sections keep all their text and
+    leave the rest for larger ones. Sections over their share are cut down
+    to the snippets that best match the user's message, in original order.
+    """
+
+    def __init__(self, counter: TokenCounter, max_context_length: int = 1500):
+        """
+        Initialize context packer.
+
+        Args:
+            counter: Token counter
+            max_context_length: Token budget for the whole prompt
+        """
+        self.counter = counter
+        self.max_context_length = max_context_length
+
+    async def pack(self, sections: Dict[str, str], query: str, fixed_text: str = "") -> str:
+        """
+        Fit tool sections into the prompt budget.
+
+        Args:
+            sections: Tool name -> context text
+            query: User message (used to rank snippets)
+            fixed_text: Prompt text that is always sent (system prompt,
+                user message) and counts against the budget
+
+        Returns:
+            Formatted tool context that fits the remaining budget
+        """
+        sections = {name: text for name, text in sections.items() if text}
+        if not sections:
+            return ""
+
+        fixed_tokens = await self.counter.count(fixed_text) + TEMPLATE_OVERHEAD_TOKENS
+        budget = self.max_context_length - fixed_tokens
+
+        # Estimates can be off; verify with the real count and tighten
+        for _ in range(3):
+            if budget <= 0:
+                return ""
+
+            packed = self._pack_sections(sections, query, budget)
+            context = format_tool_context(packed)
+            used = await self.counter.count(context)
+            if used + fixed_tokens <= self.max_context_length:
+                return context
+
+            budget = int(budget * (self.max_context_length - fixed_tokens) / (used + fixed_tokens) * 0.95)
+
+        return ""
+
+    def _pack_sections(self, sections: Dict[str, str], query: str, budget: int) -> Dict[str, str]:
+        """Allocate a fair share of the budget to each section and trim."""
+        # Heading tokens per section ("## Web Search")
+        heading_tokens = 4
+        sizes = {name: self.counter.estimate(text) + heading_tokens for name, text in sections.items()}
+
+        packed: Dict[str, str] = {}
+        remaining = budget
+        pending = sorted(sections, key=lambda name: sizes[name])
+
+        # Smallest first: leftovers from small sections go to larger ones
+        while pending:
+            name = pending.pop(0)
+            share = remaining // (len(pending) + 1)
+
+            if sizes[name] <= share:
+                packed[name] = sections[name]
+                remaining -= sizes[name]
+            else:
+                trimmed = self._trim(sections[name], query, share - heading_tokens)
+                if trimmed:
+                    packed[name] = trimmed
+                    remaining -= self.counter.estimate(trimmed) + heading_tokens
+
+        # Keep the original tool order
+        return {name: packed[name] for name in sections if name in packed}
+
+    def _trim(self, text: str, query: str, budget: int) -> str:
+        """
+        Reduce text to its most relevant snippets within budget.
+
+        The first line (the tool's own heading, e.g. "Web search results
+        for ...") is kept; the rest is split into paragraph snippets,
+        ranked by word overlap with the query.
+        """
+        if budget <= 0:
+            return ""
+
+        lines = text.strip().split("\n", 1)
+        header = lines[0]
+        body = lines[1] if len(lines) > 1 else ""
+
+        header_tokens = self.counter.estimate(header) + 1
+        if header_tokens >= budget:
+            return self._truncate(header, budget)
+
+        snippets = self._split_snippets(body)
+        query_words = {word.lower() for word in _WORD.findall(query) if len(word) > 2}
+
+        def score(index: int) -> tuple:
+            words = {word.lower() for word in _WORD.findall(snippets[index])}
+            # More matching words first, earlier snippets break ties
+            return (-len(words & query_words), index)
+
+        remaining = budget - header_tokens
+        chosen: List[int] = []
+        for index in sorted(range(len(snippets)), key=score):
+            cost = self.counter.estimate(snippets[index]) + 1
+            if cost <= remaining:
+                chosen.append(index)
+                remaining -= cost
+
+        if not chosen and snippets:
+            # Nothing fits whole; keep the best snippet, truncated
+            best = min(range(len(snippets)), key=score)
+            return f"{header}\n{self._truncate(snippets[best], remaining)}"
+
+        return "\n".join([header] + [snippets[index] for index in sorted(chosen)])
+
+    @staticmethod
+    def _split_snippets(body: str) -> List[str]:
+        """Split on blank lines, or on lines if there are no paragraphs."""
+        snippets = [part.strip("\n") for part in re.split(r"\n\s*\n", body) if part.strip()]
+        if len(snippets) <= 1:
+            snippets = [line for line in body.split("\n") if line.strip()]
+        return snippets
+
+    def _truncate(self, text: str, budget: int) -> str:
+        """Cut text to roughly budget tokens."""
+        max_chars = int(budget * self.counter.chars_per_token)
+        if max_chars <= 0:
+            return ""
+        if len(text) <= max_chars:
+            return text
+        return text[:max(max_chars - 1, 0)].rstrip() + "…"
@@ -0,0 +1,455 @@
+"""
+Entity Extractor
+
+Rule-based extraction of durations, dates and clock times.
+
+Timer and reminder handlers need a duration or a due time, which the LLM
+classification rarely provides in a usable form (and decoding entities
+costs generation time on the Pi). This module reads them deterministically
+from messages like "set a timer for an hour and a half", "remind me to
+call mom tomorrow at five thirty pm" or "wake me up on friday at 7", in a
+few tens of microseconds.
+
+Extracted entities (all JSON-serializable):
+- duration: seconds (int), for "5 minutes", "half an hour", "1h30m"
+- date: ISO date, for "today", "tomorrow", "next monday", "12 march"
+- time: "HH:MM" (24 hour), for "5pm", "17:30", "half past four", "noon"
+- due: ISO datetime the timer or reminder fires at
+- message: what to be reminded of
+"""
+
+import re
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from .calculator import words_to_numbers
+
+
+UNIT_SECONDS = {
+    "second": 1, "seconds": 1, "sec": 1, "secs": 1, "s": 1,
+    "minute": 60, "minutes": 60, "min": 60, "mins": 60, "m": 60,
+    "hour": 3600, "hours": 3600, "hr": 3600, "hrs": 3600, "h": 3600,
+    "day": 86400, "days": 86400, "d": 86400,
+    "week": 604800, "weeks": 604800, "w": 604800,
+}
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+MONTHS = {
+    name: number
+    for number, names in enumerate([
+        ("january", "jan"), ("february", "feb"), ("march", "mar"), ("april", "apr"),
+        ("may",), ("june", "jun"), ("july", "jul"), ("august", "aug"),
+        ("september", "sep", "sept"), ("october", "oct"), ("november", "nov"), ("december", "dec"),
+    ], start=1)
+    for name in names
+}
+
+ORDINALS = {
+    word: number
+    for number, word in enumerate(
+        "first second third fourth fifth sixth seventh eighth ninth tenth eleventh twelfth thirteenth "
+        "fourteenth fifteenth sixteenth seventeenth eighteenth nineteenth twentieth".split(),
+        start=1,
+    )
+}
+ORDINALS["thirtieth"] = 30
+
+# Reminders with a date but no time fire at this hour, or at the hour of
+# the part of the day they name ("tonight", "tomorrow afternoon")
+DEFAULT_REMINDER_HOUR = 9
+PART_OF_DAY_HOURS = {"morning": 9, "afternoon": 15, "evening": 20, "night": 20, "tonight": 20}
+
+_ORDINAL_SUFFIXES = {"st", "nd", "rd", "th"}
+_PM_WORDS = {"afternoon", "evening", "night", "tonight"}
+
+_TOKEN = re.compile(r"\d{1,2}:\d{2}|\d+(?:\.\d+)?|[a-z]+(?:'[a-z]+)?")
+_ISO_DATE = re.compile(r"\b(\d{4})-(\d{2})-(\d{2})\b")
+_MERIDIEM_DOTS = re.compile(r"\b([ap])\.m\.?")
+
+_NUMBER_WORDS = (
+    "one|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve|fifteen|twenty|thirty|forty|fifty"
+)
+# Month names that are never ordinary words ("may", "march" are)
+_BARE_MONTHS = [name for name in MONTHS if len(name) > 3 and name not in ("march", "sept")]
+_DAY_WORDS = "|".join(WEEKDAYS + list(MONTHS) + list(ORDINALS))
+_REMINDER_MESSAGE = re.compile(
+    r"\b(?:remind\s+me|reminder|don'?t\s+let\s+me\s+forget)\b.*?\b(?:to|about|that|of)\s+(.+)",
+    re.IGNORECASE,
+)
+# Where the time phrases after a reminder message start
+_MESSAGE_END = re.compile(
+    r"[\s,]+(?:"
+    rf"(?:in|after)\s+(?:an?\s+)?(?:\d|(?:half|few|couple|minute|hour|day|week|{_NUMBER_WORDS})\b"
+    r"|the\s+(?:morning|afternoon|evening)\b)"
+    rf"|(?:at|by|until)\s+(?:\d|(?:noon|midnight|midday|half|quarter|{_NUMBER_WORDS})\b)"
+    rf"|(?:on|next|this|every)\s+(?:the\s+)?(?:\d|(?:{_DAY_WORDS}|week|month|morning|afternoon|evening)\b)"
+    rf"|(?:tomorrow|today|tonight|{'|'.join(WEEKDAYS + _BARE_MONTHS)})\b"
+    r").*$",
+    re.IGNORECASE | re.DOTALL,
+)
+# Words that can't make up a reminder message on their own
+_TIME_WORDS = {"am", "pm", "o'clock", "oclock", "noon", "midnight", "half", "quarter", "past"}
+
+
+def _is_number(token: Optional[str]) -> bool:
+    return bool(token) and token[0].isdigit() and ":" not in token
+
+
+def _tokenize(text: str) -> List[str]:
+    """Lowercase word and number tokens, with number words as digits."""
+    text = _MERIDIEM_DOTS.sub(r"\1m", text.lower().replace("’", "'"))
+    return words_to_numbers(_TOKEN.findall(text))
+
+
+def _quantity(tokens: List[str], index: int) -> Optional[Tuple[float, int]]:
+    """Read an amount ("5", "an", "half an", "2 and a half") at index."""
+    token = tokens[index]
+    following = tokens[index + 1:index + 4]
+
+    if _is_number(token):
+        if following == ["and", "a", "half"]:
+            return float(token) + 0.5, index + 4
+        return float(token), index + 1
+
+    if token in ("a", "an"):
+        if following[:1] in (["half"], ["quarter"]):
+            return _quantity(tokens, index + 1)
+        return 1.0, index + 1
+
+    if token in ("half", "quarter"):
+        index += 1
+        # "half an hour", "quarter of an hour"
+        while index < len(tokens) and tokens[index] in ("of", "a", "an"):
+            index += 1
+        return (0.5 if token == "half" else 0.25), index
+
+    return None
+
+
+def _duration_at(tokens: List[Optional[str]], index: int) -> Optional[Tuple[float, int]]:
+    """Read one or more duration components ("1 hour and 20 minutes") at index."""
+    total = 0.0
+    found = False
+
+    while index < len(tokens) and tokens[index] is not None:
+        quantity = _quantity(tokens, index)
+        if quantity is None:
+            break
+        amount, after = quantity
+        unit = tokens[after] if after < len(tokens) else None
+        if unit not in UNIT_SECONDS:
+            break
+
+        seconds = UNIT_SECONDS[unit]
+        total += amount * seconds
+        found = True
+        index = after + 1
+
+        # "an hour and a half"
+        if tokens[index:index + 3] in (["and", "a", "half"], ["and", "a", "quarter"]):
+            total += (0.5 if tokens[index + 2] == "half" else 0.25) * seconds
+            index += 3
+
+        # Components may be joined by "and"
+        if index < len(tokens) and tokens[index] == "and":
+            index += 1
+
+    return (total, index) if found else None
+
+
+def parse_duration(text: str) -> Optional[int]:
+    """
+    Find the first duration in a message.
+
+    Args:
+        text: User message
+
+    Returns:
+        Duration in seconds, or None if there is none
+    """
+    return _find_duration(_tokenize(text))
+
+
+def _find_duration(tokens: List[Optional[str]]) -> Optional[int]:
+    for index in range(len(tokens)):
+        if tokens[index] is None:
+            continue
+        duration = _duration_at(tokens, index)
+        if duration is not None:
+            return round(duration[0])
+    return None
+
+
+def _find_time(tokens: List[str]) -> Optional[Tuple[int, int, Optional[str], int, int]]:
+    """
+    Find a clock time.
+
+    Returns:
+        (hour, minute, meridiem or None, start, end) with the token span,
+        or None
+    """
+    for index, token in enumerate(tokens):
+        previous = tokens[index - 1] if index else ""
+        following = tokens[index + 1] if index + 1 < len(tokens) else ""
+
+        if token in ("noon", "midday"):
+            return 12, 0, "pm", index, index + 1
+        if token == "midnight":
+            return 0, 0, "am", index, index + 1
+
+        # "half past 4", "quarter to 6", "10 past 4", "20 minutes to 6"
+        if token in ("half", "quarter") or _is_number(token):
+            offset = 1 if following not in ("minutes", "minute", "mins") else 2
+            relation = tokens[index + offset] if index + offset < len(tokens) else ""
+            hour_token = tokens[index + offset + 1] if index + offset + 1 < len(tokens) else ""
+            if relation in ("past", "to") and _is_number(hour_token) and 1 <= float(hour_token) <= 12:
+                minutes = {"half": 30, "quarter": 15}.get(token) or int(float(token))
+                hour = int(hour_token)
+                if relation == "to":
+                    hour, minutes = (hour - 1) % 12 or 12, 60 - minutes
+                if 0 <= minutes < 60:
+                    return hour, minutes, None, index, index + offset + 2
+
+        if ":" in token:
+            hour, minute = (int(part) for part in token.split(":"))
+            end = index + 1
+        elif _is_number(token) and (following in ("am", "pm", "o'clock", "oclock") or previous == "at"):
+            if not token.isdigit():
+                continue
+            hour, minute = int(token), 0
+            end = index + 1
+            # "at 5 30", "5 30 pm"
+            if _is_number(following) and following.isdigit() and len(following) == 2:
+                minute = int(following)
+                end += 1
+        else:
+            continue
+
+        if not (0 <= hour <= 23 and 0 <= minute <= 59):
+            continue
+
+        meridiem = tokens[end] if end < len(tokens) and tokens[end] in ("am", "pm") else None
+        if end < len(tokens) and tokens[end] in ("am", "pm", "o'clock", "oclock"):
+            end += 1
+        return hour, minute, meridiem, index, end
+
+    return None
+
+
+def _find_date(tokens: List[str], today: date) -> Optional[Tuple[date, bool, int, int]]:
+    """
+    Find a date.
+
+    Returns:
+        (date, from_weekday, start, end) with the token span, or None
+    """
+    for index, token in enumerate(tokens):
+        previous = tokens[index - 1] if index else ""
+
+        if tokens[index:index + 3] == ["day", "after", "tomorrow"]:
+            return today + timedelta(days=2), False, index, index + 3
+        if token == "tomorrow":
+            return today + timedelta(days=1), False, index, index + 1
+        if token in ("today", "tonight"):
+            return today, False, index, index + 1
+
+        if token in WEEKDAYS:
+            days_ahead = (WEEKDAYS.index(token) - today.weekday()) % 7
+            if previous == "next" and days_ahead == 0:
+                days_ahead = 7
+            start = index - 1 if previous in ("next", "this", "on") else index
+            return today + timedelta(days=days_ahead), True, start, index + 1
+
+        # "12 march", "12th of march", "march 12", "march 12th 2027"
+        if token in MONTHS:
+            day, start, end = None, index, index + 1
+            back = index - 1
+            if back >= 0 and tokens[back] == "of":
+                back -= 1
+            if back >= 0 and tokens[back] in _ORDINAL_SUFFIXES:
+                back -= 1
+            if back >= 0 and (tokens[back].isdigit() or tokens[back] in ORDINALS):
+                # "20 first" ("twenty first")
+                if tokens[back] in ORDINALS and back > 0 and tokens[back - 1] in ("20", "30"):
+                    back -= 1
+                day, start = _day_number(tokens, back), back
+            elif end < len(tokens) and (tokens[end].isdigit() or tokens[end] in ORDINALS):
+                day = _day_number(tokens, end)
+                end += 1
+                if end < len(tokens) and tokens[end] in _ORDINAL_SUFFIXES:
+                    end += 1
+            if day is None:
+                continue
+
+            year = today.year
+            if end < len(tokens) and tokens[end].isdigit() and len(tokens[end]) == 4:
+                year = int(tokens[end])
+                end += 1
+            try:
+                value = date(year, MONTHS[token], day)
+            except ValueError:
+                continue
+            if value < today and year == today.year and not (end and tokens[end - 1].isdigit() and len(tokens[end - 1]) == 4):
+                value = value.replace(year=year + 1)
+            return value, False, start, end
+
+    return None
+
+
+def _day_number(tokens: List[str], index: int) -> Optional[int]:
+    """Day of month from "12" or "twelfth"; "20 first" style ordinals included."""
+    token = tokens[index]
+    if token in ORDINALS:
+        return ORDINALS[token]
+    day = int(token)
+    if day in (20, 30) and index + 1 < len(tokens) and tokens[index + 1] in ORDINALS:
+        day += ORDINALS[tokens[index + 1]]
+    return day if 1 <= day <= 31 else None
+
+
+def _resolve_hour(hour: int, meridiem: Optional[str], tokens: List[str], target: date, now: datetime, minute: int) -> int:
+    """Turn a 12-hour clock reading into a 24-hour one."""
+    if meridiem == "pm" and hour < 12:
+        return hour + 12
+    if meridiem == "am" and hour == 12:
+        return 0
+    if meridiem or hour > 12 or hour == 0:
+        return hour
+
+    if any(token in _PM_WORDS for token in tokens):
+        return hour % 12 + 12
+    if "morning" in tokens or "wake" in tokens:
+        return hour % 12
+
+    if target == now.date():
+        # The next time the clock shows this reading
+        for candidate in (hour % 12, hour % 12 + 12):
+            if datetime.combine(target, time(candidate, minute)) > now:
+                return candidate
+        return hour % 12
+    # Another day: 1-6 o'clock most likely means the afternoon
+    return hour + 12 if hour < 7 else hour
+
+
+def extract_entities(text: str, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Extract durations, dates, clock times and a reminder message.
+
+    Args:
+        text: User message
+        now: Reference time for relative expressions (default: now)
+
+    Returns:
+        Entities (see module docstring); empty if there are none
+    """
+    now = now or datetime.now()
+    today = now.date()
+    tokens = _tokenize(text)
+    entities: Dict[str, Any] = {}
+
+    # Spans used by dates and times don't count as durations
+    masked: List[Optional[str]] = list(tokens)
+
+    iso_date = _ISO_DATE.search(text)
+    found_date = None
+    if iso_date:
+        try:
+            found_date = (date(*(int(part) for part in iso_date.groups())), False, 0, 0)
+        except ValueError:
+            pass
+    found_date = found_date or _find_date(tokens, today)
+    if found_date:
+        masked[found_date[2]:found_date[3]] = [None] * (found_date[3] - found_date[2])
+
+    found_time = _find_time(tokens)
+    if found_time:
+        masked[found_time[3]:found_time[4]] = [None] * (found_time[4] - found_time[3])
+
+    duration = _find_duration(masked)
+    if duration:
+        entities["duration"] = duration
+
+    due = None
+    if found_date or found_time:
+        if found_date:
+            target = found_date[0]
+        elif duration and duration >= UNIT_SECONDS["day"]:
+            # "in 2 days at 5pm"
+            target = (now + timedelta(seconds=duration)).date()
+        else:
+            target = today
+
+        if found_time:
+            hour, minute, meridiem = found_time[:3]
+            hour = _resolve_hour(hour, meridiem, tokens, target, now, minute)
+            due = datetime.combine(target, time(hour, minute))
+            if due <= now and not found_date:
+                due += timedelta(days=1)
+            elif due <= now and found_date[1]:
+                due += timedelta(days=7)
+        else:
+            hour = next(
+                (PART_OF_DAY_HOURS[token] for token in tokens if token in PART_OF_DAY_HOURS),
+                DEFAULT_REMINDER_HOUR
+            )
+            due = datetime.combine(target, time(hour))
+            if due <= now:
+                # "call the bank today" in the afternoon: the time is unknown
+                due = None
+
+        entities["date"] = (due.date() if due else target).isoformat()
+        if found_time:
+            entities["time"] = due.strftime("%H:%M")
+    elif duration:
+        due = now + timedelta(seconds=duration)
+
+    if due is not None:
+        entities["due"] = due.replace(microsecond=0).isoformat()
+
+    message = _REMINDER_MESSAGE.search(text)
+    if message:
+        reminder = _MESSAGE_END.sub("", " " + message.group(1)).strip(" .,!?")
+        # "remind me at quarter to six" has no message
+        if any(not _is_number(token) and token not in _TIME_WORDS for token in _tokenize(reminder)):
+            entities["message"] = reminder
+
+    return entities
+
+
+def entities_for(intent: str, text: str, now: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+    """
+    Extract the entities a timer or reminder handler needs.
+
+    Args:
+        intent: "timer" or "reminder"
+        text: User message
+        now: Reference time (default: now)
+
+    Returns:
+        Entities if the required ones were found (timer: duration or due
+        time, reminder: due time) and the due time is in the future, None
+        otherwise
+    """
+    now = now or datetime.now()
+    entities = extract_entities(text, now)
+
+    if "due" not in entities or datetime.fromisoformat(entities["due"]) <= now:
+        return None
+
+    if intent == "timer" and "duration" not in entities:
+        # "set a timer until 5pm"
+        due = datetime.fromisoformat(entities["due"])
+        entities["duration"] = max(0, round((due - now).total_seconds()))
+
+    return entities
+
+
+def format_duration(seconds: int) -> str:
+    """Format a duration for a spoken reply ("1 hour 30 minutes")."""
+    parts = []
+    for name, size in (("day", 86400), ("hour", 3600), ("minute", 60), ("second", 1)):
+        count, seconds = divmod(seconds, size)
+        if count:
+            parts.append(f"{count} {name}{'s' if count != 1 else ''}")
+    return " ".join(parts) or "0 seconds"
@@ -5,10 +5,17 @@ Uses LLM to classify user intents and extract entities.
 Designed for small, quantized models with limited context.
 """
 
-import json
+import re
+from collections import Counter
 from typing import Dict, Any, Optional
 from enum import Enum
-from ..llm import BaseLLMProvider, LLMResponse
+from ..llm import BaseLLMProvider, LLMTask, Deadline
+from ..llm.cache import TTLCache
+from .local_classifier import NaiveBayesIntentModel
+from .keyword_matcher import keyword_matcher
+from .entity_extractor import entities_for, extract_entities
+from .partial_json import StreamingJSONParser
+from .prompts import build_prompt
 
 
 class IntentType(str, Enum):
@@ -25,13 +32,134 @@ class IntentType(str, Enum):
     UNKNOWN = "unknown"
 
 
-# Minimal system prompt optimized for small models
-INTENT_CLASSIFICATION_PROMPT = """You are a JSON-only assistant. Classify the user's intent and extract entities.
+# Entity keys the classifier may extract
+ENTITY_KEYS = ("location", "duration", "time", "date", "message", "expression", "query")
 
-Intents: greeting, question, command, weather, time, timer, reminder, calculation, general, unknown
+# Output schema for LLM classification. Providers turn it into a decoding
+# constraint (GBNF grammar / Ollama structured output), so the model can
+# only pick a valid intent, a few short entities and a numeric confidence.
+CLASSIFICATION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "intent": {"enum": [intent.value for intent in IntentType]},
+        "confidence": {"type": "number", "minimum": 0, "maximum": 1},
+        # Last, so classification can stop before it when it's not needed
+        "entities": {
+            "type": "object",
+            "properties": {key: {"type": "string", "maxLength": 32} for key in ENTITY_KEYS},
+            "maxProperties": 2,
+        },
+    },
+    "required": ["intent", "confidence", "entities"],
+}
 
-Output JSON only:
-{"intent": "intent_type", "entities": {}, "confidence": 0.0-1.0}"""
+# Intents whose entities only the LLM extracts; for all others the
+# classification stream is cancelled once intent and confidence are decoded
+ENTITY_INTENTS = {IntentType.WEATHER.value}
+
+# Intents whose entities (durations, dates, times) the rule-based extractor
+# reads; when it finds them, the LLM is not needed at all
+RULE_ENTITY_INTENTS = {IntentType.TIMER.value, IntentType.REMINDER.value}
+
+# Typical outputs use ~20 tokens. Two long entity values can run past the
+# limit; the output is then truncated inside "entities" (intent and
+# confidence come first) and the partial parser repairs the object, keeping
+# the cut value as far as it was decoded
+CLASSIFICATION_MAX_TOKENS = 48
+
+
+# Keyword patterns that classify without a model, checked in this order.
+# Greetings only count at the start of the message; timers and reminders
+# only when the message asks to create one and their entities can be
+# extracted.
+INTENT_KEYWORDS = {
+    IntentType.REMINDER.value: ["remind me", "reminder", "don't let me forget", "wake me", "alarm"],
+    IntentType.TIMER.value: ["timer", "countdown"],
+    IntentType.GREETING.value: ["hello", "hi", "hey", "good morning", "good afternoon", "good evening"],
+    IntentType.TIME.value: ["what time", "current time", "what's the time"],
+    IntentType.WEATHER.value: ["weather", "temperature", "forecast"],
+}
+keyword_matcher.register("intent", INTENT_KEYWORDS)
+
+# Calendar-like words that make a message with a date or time a reminder
+CALENDAR_KEYWORDS = {
+    IntentType.REMINDER.value: ["schedule", "appointment", "meeting", "calendar", "event"],
+}
+keyword_matcher.register("calendar", CALENDAR_KEYWORDS)
+
+# Timers and reminders are only created without the LLM when the message
+# asks for one; questions about them ("do I have a reminder tomorrow") and
+# cancel or status requests ("delete the timer for 5 minutes") mention the
+# same words and times, and go to the LLM or the calendar tool
+_CREATE_REQUESTS = {
+    IntentType.REMINDER.value: re.compile(
+        r"\b(?:remind\s+me|don'?t\s+let\s+me\s+forget|wake\s+me"
+        r"|(?:set|add|create|make)\s+(?:me\s+)?(?:an?\s+)?(?:new\s+)?(?:reminder|alarm)s?)\b"
+    ),
+    IntentType.TIMER.value: re.compile(
+        r"\b(?:set|start|create|make)\s+(?:me\s+)?(?:an?\s+)?(?:new\s+)?(?:[\w.-]+\s+){0,2}?(?:timer|countdown)\b"
+    ),
+    "calendar": re.compile(
+        r"\b(?:(?:add|put)\b.*\b(?:on|to|in|into)\s+(?:my\s+|the\s+)?(?:calendar|schedule|agenda)\b"
+        r"|(?:schedule|book)\s+(?:an?|my)\b"
+        r"|(?:add|create|make|set\s+up)\s+(?:an?\s+)?(?:new\s+)?(?:meeting|appointment|event)\b)"
+    ),
+}
+# Questions ("did I set a reminder for tomorrow") don't create anything
+_QUESTION_START = re.compile(r"^\W*(?:do|does|did|is|are|was|were|have|has|what|when|which|how|why|where)\b")
+
+# Classification tiers, cheapest first ("joint" = label of a joint
+# classify-and-answer generation)
+TIERS = ("pattern", "cache", "local", "llm", "joint")
+
+# Words that don't change what a spoken command means
+FILLER_WORDS = {"please", "pls", "jarvis", "um", "uh", "erm", "hmm", "ok", "okay", "kindly", "just"}
+FILLER_PREFIXES = ("can you ", "could you ", "would you ", "will you ")
+
+_NON_WORD = re.compile(r"[^\w\s]+")
+
+
+def is_create_request(kind: str, text: str) -> bool:
+    """
+    Check whether a message asks to create a timer, reminder or calendar entry.
+
+    Args:
+        kind: "timer", "reminder" or "calendar"
+        text: User message
+
+    Returns:
+        True if an explicit create phrase is found ("remind me", "set a
+        timer", "add ... to my calendar", "schedule a ...") and the
+        message is not a question
+    """
+    text = text.lower().replace("’", "'")
+    return not _QUESTION_START.match(text) and bool(_CREATE_REQUESTS[kind].search(text))
+
+
+def normalize_message(text: str) -> str:
+    """
+    Fold a message to the form used as intent cache key.
+
+    Case, punctuation and whitespace are folded and filler words dropped,
+    so "Jarvis, what's on my todo list?" and "whats on my todo list"
+    share a key.
+
+    Args:
+        text: User message
+
+    Returns:
+        Normalized message
+    """
+    text = _NON_WORD.sub("", text.lower().replace("’", "'"))
+    words = [word for word in text.split() if word not in FILLER_WORDS]
+    text = " ".join(words)
+
+    for prefix in FILLER_PREFIXES:
+        if text.startswith(prefix):
+            text = text[len(prefix):]
+            break
+
+    return text
 
 
 class IntentClassifier:
@@ -42,23 +170,46 @@ class IntentClassifier:
     - Short, structured prompts
     - JSON output format
     - Minimal examples
+
+    Cheaper tiers run first: fixed patterns, previous LLM answers for the
+    same normalized message, then the local naive Bayes model; the LLM is
+    only asked when none of them has an answer. Confident LLM
+    classifications are fed back into the local model.
     """
 
-    def __init__(self, llm_provider: BaseLLMProvider):
+    def __init__(
+        self,
+        llm_provider: BaseLLMProvider,
+        local_model: Optional[NaiveBayesIntentModel] = None,
+        local_threshold: float = 0.8,
+        learn_threshold: float = 0.7,
+        intent_cache: Optional[TTLCache] = None
+    ):
         """
         Initialize intent classifier.
 
         Args:
             llm_provider: LLM provider instance
+            local_model: Local intent model (None = patterns and LLM only)
+            local_threshold: Minimum local model confidence to skip the LLM
+            learn_threshold: Minimum LLM confidence to learn from its answer
+            intent_cache: Cache of LLM classifications by normalized
+                message (None = no caching)
         """
         self.llm = llm_provider
+        self.local_model = local_model
+        self.local_threshold = local_threshold
+        self.learn_threshold = learn_threshold
+        self.intent_cache = intent_cache
+        self.tier_hits: Counter = Counter()
 
-    def classify(self, user_input: str) -> Dict[str, Any]:
+    async def classify(self, user_input: str, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
         """
         Classify user intent.
 
         Args:
             user_input: User's text input
+            deadline: Request deadline for the LLM tier
 
         Returns:
             Dictionary with:
@@ -67,57 +218,235 @@ class IntentClassifier:
                 - confidence: Float between 0-1
                 - raw_response: Optional raw LLM response
         """
-        # Fallback for obvious patterns (avoid LLM call when possible)
-        simple_intent = self._check_simple_patterns(user_input)
-        if simple_intent:
-            return simple_intent
+        fast_intent = self.classify_fast(user_input)
+        if fast_intent:
+            return fast_intent
 
-        # Use LLM for classification
-        prompt = f'User: "{user_input}"\n\nClassify:'
+        return await self.classify_llm(user_input, deadline)
+
+    async def classify_llm(self, user_input: str, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """
+        Classify with the LLM, skipping the tiers in front of it.
+
+        Args:
+            user_input: User's text input
+            deadline: Request deadline; a classification cut short by it
+                is taken from the JSON streamed so far if the intent was
+                decoded in full
 
-        response: LLMResponse = self.llm.generate(
+        Returns:
+            Classification like classify(); includes "error" if the LLM
+            gave no usable answer
+        """
+        self.tier_hits["llm"] += 1
+        cache_key = normalize_message(user_input) if self.intent_cache is not None else None
+
+        # Use LLM for classification, streamed so it can stop early
+        system_prompt, prompt = build_prompt(LLMTask.CLASSIFICATION, user_input)
+
+        parser = StreamingJSONParser()
+        error = None
+        stream = self.llm.astream(
             prompt=prompt,
-            system_prompt=INTENT_CLASSIFICATION_PROMPT,
-            max_tokens=128,  # Small output for JSON
+            system_prompt=system_prompt,
+            max_tokens=CLASSIFICATION_MAX_TOKENS,
             temperature=0.1,  # Deterministic
-            json_mode=True
+            json_mode=True,
+            json_schema=CLASSIFICATION_SCHEMA,
+            task=LLMTask.CLASSIFICATION,
+            partial_ok=True,
+            deadline=deadline
         )
+        try:
+            async for chunk in stream:
+                if chunk.error:
+                    error = chunk.error
+                    break
+                parser.feed(chunk.text)
+                if self._is_decided(parser):
+                    break
+        finally:
+            # Closing the stream cancels the rest of the generation
+            await stream.aclose()
+
+        # Truncated or partial objects are repaired, not discarded, as long
+        # as the intent label itself was decoded in full ("wea" is no label)
+        result = parser.value() or {}
 
-        if response.error:
+        if "intent" not in parser.completed_keys:
             return {
                 "intent": IntentType.UNKNOWN,
                 "entities": {},
                 "confidence": 0.0,
-                "error": response.error
+                "error": error or "Invalid JSON from LLM",
+                "raw_response": parser.text
             }
 
+        # Validate and normalize intent
         try:
-            # Parse JSON response
-            result = json.loads(response.text)
+            intent = IntentType(str(result["intent"]).lower())
+        except ValueError:
+            intent = IntentType.UNKNOWN
 
-            # Validate and normalize intent
-            intent_str = result.get("intent", "unknown").lower()
-            try:
-                intent = IntentType(intent_str)
-            except ValueError:
-                intent = IntentType.UNKNOWN
+        try:
+            confidence = float(result.get("confidence", 0.5))
+        except (TypeError, ValueError):
+            confidence = 0.5
 
-            return {
-                "intent": intent,
-                "entities": result.get("entities", {}),
-                "confidence": float(result.get("confidence", 0.5)),
-                "raw_response": response.text
-            }
+        entities = result.get("entities")
+        if intent in RULE_ENTITY_INTENTS:
+            entities = {**(entities if isinstance(entities, dict) else {}), **extract_entities(user_input)}
 
-        except json.JSONDecodeError:
-            # LLM didn't return valid JSON
-            return {
-                "intent": IntentType.UNKNOWN,
-                "entities": {},
-                "confidence": 0.0,
-                "error": "Invalid JSON from LLM",
-                "raw_response": response.text
+        classification = {
+            "intent": intent,
+            "entities": entities if isinstance(entities, dict) else {},
+            "confidence": confidence
+        }
+        if not error:
+            # Only complete answers are cached and learned
+            self._remember(user_input, cache_key, classification)
+
+        return dict(classification, entities=dict(classification["entities"]), raw_response=parser.text)
+
+    def classify_fast(self, user_input: str) -> Optional[Dict[str, Any]]:
+        """
+        Classify with the tiers that don't call the LLM.
+
+        Args:
+            user_input: User's text input
+
+        Returns:
+            Classification like classify(), or None if the LLM is needed
+        """
+        # Fallback for obvious patterns (avoid LLM call when possible)
+        simple_intent = self._check_simple_patterns(user_input)
+        if simple_intent:
+            self.tier_hits["pattern"] += 1
+            return simple_intent
+
+        cache_key = normalize_message(user_input) if self.intent_cache is not None else None
+        if cache_key:
+            cached = self.intent_cache.get(cache_key)
+            if cached is not None:
+                self.tier_hits["cache"] += 1
+                entities = dict(cached["entities"])
+                if cached["intent"] in RULE_ENTITY_INTENTS:
+                    # Relative times ("in 5 minutes") depend on when it's said
+                    entities = extract_entities(user_input)
+                return dict(cached, entities=entities, cached=True)
+
+        local_intent = self._check_local_model(user_input)
+        if local_intent:
+            self.tier_hits["local"] += 1
+            return local_intent
+
+        return None
+
+    def record_joint(self, user_input: str, intent: IntentType) -> None:
+        """
+        Record the intent label of a joint classify-and-answer generation.
+
+        It is cached and learned like an LLM classification; the label
+        comes without a confidence, so it counts as certain. Intents whose
+        entities only the LLM classification extracts (weather location)
+        are neither: a later hit would route them without entities.
+
+        Args:
+            user_input: User's text input
+            intent: Intent decoded from the joint generation
+        """
+        self.tier_hits["joint"] += 1
+        if intent.value in ENTITY_INTENTS:
+            return
+        cache_key = normalize_message(user_input) if self.intent_cache is not None else None
+        self._remember(user_input, cache_key, {"intent": intent, "entities": {}, "confidence": 1.0})
+
+    def _remember(self, user_input: str, cache_key: Optional[str], classification: Dict[str, Any]) -> None:
+        """Feed an LLM classification to the local model and the intent cache."""
+        intent = classification["intent"]
+        if intent == IntentType.UNKNOWN:
+            return
+
+        if self.local_model is not None and classification["confidence"] >= self.learn_threshold:
+            self.local_model.learn(user_input, intent.value)
+
+        if cache_key:
+            self.intent_cache.set(cache_key, classification)
+
+    @staticmethod
+    def _is_decided(parser: StreamingJSONParser) -> bool:
+        """Check whether the fields the router needs have been decoded."""
+        if parser.complete:
+            return True
+
+        if not {"intent", "confidence"} <= parser.completed_keys:
+            return False
+
+        intent = (parser.value() or {}).get("intent")
+        return intent not in ENTITY_INTENTS or "entities" in parser.completed_keys
+
+    def _check_local_model(self, user_input: str) -> Optional[Dict[str, Any]]:
+        """
+        Classify with the local model if it is confident.
+
+        Timers and reminders are accepted if the message asks to create one
+        and the rule-based extractor finds their entities; other intents that need entities are left to the
+        LLM, which extracts them.
+
+        Args:
+            user_input: User's text input
+
+        Returns:
+            Intent classification dict if confident, None otherwise
+        """
+        if self.local_model is None:
+            return None
+
+        prediction = self.local_model.predict(user_input)
+        if prediction is None:
+            return None
+
+        label, confidence = prediction
+        if confidence < self.local_threshold or label in ENTITY_INTENTS:
+            return None
+
+        try:
+            intent = IntentType(label)
+        except ValueError:
+            return None
+
+        entities = {}
+        if label in RULE_ENTITY_INTENTS:
+            if not is_create_request(label, user_input):
+                return None
+            entities = entities_for(label, user_input)
+            if entities is None:
+                return None
+
+        return {
+            "intent": intent,
+            "entities": entities,
+            "confidence": round(confidence, 3),
+            "local_model": True
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Get how many messages each tier classified, and its share."""
+        total = sum(self.tier_hits.values())
+        stats: Dict[str, Any] = {
+            "tiers": {
+                tier: {
+                    "hits": self.tier_hits[tier],
+                    "hit_rate": round(self.tier_hits[tier] / total, 3) if total else 0.0,
+                }
+                for tier in TIERS
             }
+        }
+        if self.intent_cache is not None:
+            stats["cache"] = self.intent_cache.stats()
+        if self.local_model is not None:
+            stats["local_examples"] = self.local_model.examples
+        return stats
 
     def _check_simple_patterns(self, user_input: str) -> Optional[Dict[str, Any]]:
         """
@@ -129,34 +458,32 @@ class IntentClassifier:
         Returns:
             Intent classification dict if pattern matched, None otherwise
         """
-        text_lower = user_input.lower().strip()
+        # Reminder, timer, greeting, time and weather keywords, in that priority
+        for label in keyword_matcher.labels(user_input, "intent", at_start=[IntentType.GREETING.value]):
+            entities = {}
+            if label in RULE_ENTITY_INTENTS:
+                if not is_create_request(label, user_input):
+                    continue
+                entities = entities_for(label, user_input)
+                if entities is None:
+                    continue
 
-        # Greetings
-        greetings = ["hello", "hi", "hey", "good morning", "good afternoon", "good evening"]
-        if any(text_lower.startswith(g) for g in greetings):
             return {
-                "intent": IntentType.GREETING,
-                "entities": {},
+                "intent": IntentType(label),
+                "entities": entities,
                 "confidence": 1.0,
                 "pattern_matched": True
             }
 
-        # Time queries
-        if any(phrase in text_lower for phrase in ["what time", "current time", "what's the time"]):
-            return {
-                "intent": IntentType.TIME,
-                "entities": {},
-                "confidence": 1.0,
-                "pattern_matched": True
-            }
-
-        # Weather queries
-        if any(phrase in text_lower for phrase in ["weather", "temperature", "forecast"]):
-            return {
-                "intent": IntentType.WEATHER,
-                "entities": {},
-                "confidence": 1.0,
-                "pattern_matched": True
-            }
+        # "add a meeting with Sam on friday at 3"
+        if keyword_matcher.labels(user_input, "calendar") and is_create_request("calendar", user_input):
+            entities = entities_for(IntentType.REMINDER.value, user_input)
+            if entities is not None:
+                return {
+                    "intent": IntentType.REMINDER,
+                    "entities": entities,
+                    "confidence": 1.0,
+                    "pattern_matched": True
+                }
 
         return None
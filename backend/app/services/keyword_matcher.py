@@ -0,0 +1,177 @@
+"""
+Keyword Matcher
+
+One compiled multi-pattern matcher for every keyword table in the app
+(intent patterns, tool triggers).
+
+Keywords are matched on whole words with an Aho–Corasick automaton over
+the message's word tokens: a single left-to-right pass finds every hit of
+every table, overlapping ones included, in time linear in the message
+length. Matching whole words means "hi" no longer matches "this".
+"""
+
+import re
+import threading
+from collections import OrderedDict, deque
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+
+# Words, keeping apostrophes inside them ("what's")
+_TOKEN = re.compile(r"[\w']+")
+
+
+class KeywordMatch(NamedTuple):
+    """A keyword found in a message."""
+    group: str  # Keyword table, e.g. "intent" or "tool"
+    label: str  # Entry in the table, e.g. "greeting" or "web_search"
+    keyword: str
+    start: int  # Character offsets in the message
+    end: int
+
+
+def _tokenize(text: str) -> List[Tuple[str, int, int]]:
+    """Split text into lowercase word tokens with their offsets."""
+    text = text.replace("’", "'")
+    return [(match.group().lower(), match.start(), match.end()) for match in _TOKEN.finditer(text)]
+
+
+class KeywordMatcher:
+    """
+    Aho–Corasick automaton over word tokens.
+
+    Tables are registered by group; the automaton is compiled on first use
+    after a change. Results for recent messages are cached, so several
+    callers looking at the same message share a single scan.
+    """
+
+    def __init__(self, cache_size: int = 64):
+        """
+        Initialize matcher.
+
+        Args:
+            cache_size: Number of recent messages whose matches are kept
+        """
+        self.cache_size = cache_size
+        self._tables: Dict[str, Dict[str, Sequence[str]]] = {}
+        self._compiled = False
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[str, List[KeywordMatch]]" = OrderedDict()
+        # Automaton: transitions, failure links, outputs per state
+        self._goto: List[Dict[str, int]] = []
+        self._fail: List[int] = []
+        self._out: List[List[Tuple[str, str, str, int]]] = []
+
+    def register(self, group: str, table: Dict[str, Sequence[str]]) -> None:
+        """
+        Add or replace a keyword table.
+
+        Args:
+            group: Table name, reported in every match
+            table: Label -> keywords (single words or phrases)
+        """
+        with self._lock:
+            self._tables[group] = table
+            self._compiled = False
+            self._cache.clear()
+
+    def _compile(self) -> None:
+        """Build the automaton from all registered tables."""
+        goto: List[Dict[str, int]] = [{}]
+        out: List[List[Tuple[str, str, str, int]]] = [[]]
+
+        for group, table in self._tables.items():
+            for label, keywords in table.items():
+                for keyword in keywords:
+                    words = [token for token, _, _ in _tokenize(keyword)]
+                    if not words:
+                        continue
+                    state = 0
+                    for word in words:
+                        if word not in goto[state]:
+                            goto.append({})
+                            out.append([])
+                            goto[state][word] = len(goto) - 1
+                        state = goto[state][word]
+                    out[state].append((group, label, keyword, len(words)))
+
+        # Breadth-first failure links; outputs inherit their fallbacks'
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for word, target in goto[state].items():
+                queue.append(target)
+                fallback = fail[state]
+                while fallback and word not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[target] = goto[fallback].get(word, 0)
+                out[target] = out[target] + out[fail[target]]
+
+        self._goto, self._fail, self._out = goto, fail, out
+        self._compiled = True
+
+    def find(self, text: str) -> List[KeywordMatch]:
+        """
+        Find every keyword of every table in a message.
+
+        Args:
+            text: Message to scan
+
+        Returns:
+            Matches in order of their end position
+        """
+        with self._lock:
+            cached = self._cache.get(text)
+            if cached is not None:
+                self._cache.move_to_end(text)
+                return cached
+
+            if not self._compiled:
+                self._compile()
+            goto, fail, out = self._goto, self._fail, self._out
+
+        tokens = _tokenize(text)
+        matches: List[KeywordMatch] = []
+        state = 0
+        for index, (word, _, end) in enumerate(tokens):
+            while state and word not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(word, 0)
+            for group, label, keyword, length in out[state]:
+                matches.append(KeywordMatch(group, label, keyword, tokens[index - length + 1][1], end))
+
+        with self._lock:
+            self._cache[text] = matches
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        return matches
+
+    def labels(self, text: str, group: str, at_start: Optional[Sequence[str]] = None) -> List[str]:
+        """
+        Get the labels of a group that match a message.
+
+        Args:
+            text: Message to scan
+            group: Table to report
+            at_start: Labels that only count when their keyword starts
+                the message
+
+        Returns:
+            Matching labels in table order
+        """
+        at_start = at_start or ()
+        first_word = _TOKEN.search(text)
+        first_offset = first_word.start() if first_word else 0
+
+        hits = {
+            match.label
+            for match in self.find(text)
+            if match.group == group and (match.label not in at_start or match.start == first_offset)
+        }
+        return [label for label in self._tables.get(group, {}) if label in hits]
+
+
+# Shared by the intent classifier and the tool manager; each registers its
+# table at import time
+keyword_matcher = KeywordMatcher()
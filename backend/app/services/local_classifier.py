@@ -0,0 +1,209 @@
+"""
+Local Intent Classifier
+
+Multinomial naive Bayes over character n-grams and words, in pure Python.
+
+Classifying a message with the LLM costs a full round trip on the Pi; this
+model answers in well under a millisecond. It is trained from a shipped seed dataset
+and keeps learning from the LLM's own classifications, which are appended
+to a JSONL log so the knowledge survives restarts. The intent classifier
+only falls back to the LLM when this model is not confident enough.
+"""
+
+import json
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# Shipped training examples: one {"text": ..., "intent": ...} per line
+SEED_PATH = Path(__file__).parent / "data" / "intent_seed.jsonl"
+
+# Most recent logged examples loaded at startup
+MAX_LOGGED_EXAMPLES = 5000
+
+_WORD = re.compile(r"[a-z0-9']+|[+\-*/^%=]")
+
+
+def extract_features(text: str) -> Counter:
+    """
+    Get the bag of features for a message.
+
+    Words plus character 2- to 4-grams of each padded word, so typos and
+    inflections ("remind", "reminder", "remindme") still share features.
+
+    Args:
+        text: User message
+
+    Returns:
+        Feature -> count
+    """
+    features: Counter = Counter()
+    for word in _WORD.findall(text.lower()):
+        features[f"w:{word}"] += 1
+        padded = f" {word} "
+        for n in (2, 3, 4):
+            for start in range(len(padded) - n + 1):
+                features[padded[start:start + n]] += 1
+    return features
+
+
+class NaiveBayesIntentModel:
+    """
+    Incrementally trainable naive Bayes intent model.
+
+    Confidence is the posterior of the best intent, computed from
+    log-likelihoods averaged per feature and scaled by sharpness: plain
+    naive Bayes posteriors approach 1.0 for any long message and would
+    make a threshold useless.
+    """
+
+    def __init__(self, alpha: float = 0.1, sharpness: float = 5.0, log_path: Optional[str] = None):
+        """
+        Initialize model.
+
+        Args:
+            alpha: Additive smoothing for feature counts
+            sharpness: Scale of the averaged log-likelihood; tuned with
+                leave-one-out on the seed set (threshold 0.8 keeps 43% of
+                the messages at 94% precision, see benchmarks/intent_tiers.py)
+            log_path: JSONL file that learned examples are appended to and
+                loaded from (None = learned examples are not persisted)
+        """
+        self.alpha = alpha
+        self.sharpness = sharpness
+        self.log_path = Path(log_path).expanduser() if log_path else None
+        self.examples = 0
+        self._doc_counts: Counter = Counter()
+        self._feature_counts: Dict[str, Counter] = defaultdict(Counter)
+        self._feature_totals: Counter = Counter()
+        self._vocabulary: set = set()
+        self._learned: set = set()
+        # Log-probability tables, rebuilt lazily after training
+        self._tables: Optional[Dict[str, Tuple[float, Dict[str, float], float]]] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_files(cls, seed_path: Path = SEED_PATH, log_path: Optional[str] = None, **kwargs) -> "NaiveBayesIntentModel":
+        """
+        Create a model trained on the seed dataset and logged examples.
+
+        Args:
+            seed_path: Seed dataset (JSONL)
+            log_path: Log of learned examples (JSONL, may not exist yet)
+            **kwargs: Passed to the constructor
+
+        Returns:
+            Trained model
+        """
+        model = cls(log_path=log_path, **kwargs)
+        model.fit(_read_examples(seed_path))
+        if model.log_path is not None:
+            logged = _read_examples(model.log_path)[-MAX_LOGGED_EXAMPLES:]
+            model.fit(logged)
+            model._learned.update(text.lower() for text, _ in logged)
+        return model
+
+    def fit(self, examples: Iterable[Tuple[str, str]]) -> None:
+        """Add (text, intent) examples to the model."""
+        with self._lock:
+            for text, intent in examples:
+                self._add(text, intent)
+
+    def _add(self, text: str, intent: str) -> None:
+        features = extract_features(text)
+        if not features:
+            return
+
+        self._doc_counts[intent] += 1
+        self._feature_counts[intent].update(features)
+        self._feature_totals[intent] += sum(features.values())
+        self._vocabulary.update(features)
+        self.examples += 1
+        self._tables = None
+
+    def learn(self, text: str, intent: str) -> None:
+        """
+        Learn one example and append it to the log.
+
+        Args:
+            text: User message
+            intent: Intent the message was classified as
+        """
+        with self._lock:
+            # Repeated messages (e.g. served from the response cache) are
+            # learned once
+            if text.lower() in self._learned:
+                return
+            self._learned.add(text.lower())
+            self._add(text, intent)
+
+            if self.log_path is not None:
+                self.log_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"text": text, "intent": intent}) + "\n")
+
+    def predict(self, text: str) -> Optional[Tuple[str, float]]:
+        """
+        Classify a message.
+
+        Args:
+            text: User message
+
+        Returns:
+            (intent, confidence), or None if the model is untrained or the
+            message has no features
+        """
+        features = extract_features(text)
+        if not features or not self._doc_counts:
+            return None
+
+        tables = self._tables or self._build_tables()
+        feature_count = sum(features.values())
+
+        scores: Dict[str, float] = {}
+        for intent, (log_prior, log_probs, unseen) in tables.items():
+            likelihood = sum(count * log_probs.get(feature, unseen) for feature, count in features.items())
+            # Per-feature average keeps posteriors comparable across lengths
+            scores[intent] = log_prior + self.sharpness * likelihood / feature_count
+
+        best = max(scores, key=scores.get)
+        normalizer = sum(math.exp(score - scores[best]) for score in scores.values())
+        return best, 1.0 / normalizer
+
+    def _build_tables(self) -> Dict[str, Tuple[float, Dict[str, float], float]]:
+        """Precompute log prior and smoothed feature log-probabilities per intent."""
+        with self._lock:
+            total_docs = sum(self._doc_counts.values())
+            vocabulary_size = len(self._vocabulary) + 1
+
+            tables = {}
+            for intent, docs in self._doc_counts.items():
+                denominator = math.log(self._feature_totals[intent] + self.alpha * vocabulary_size)
+                log_probs = {
+                    feature: math.log(count + self.alpha) - denominator
+                    for feature, count in self._feature_counts[intent].items()
+                }
+                tables[intent] = (math.log(docs / total_docs), log_probs, math.log(self.alpha) - denominator)
+
+            self._tables = tables
+            return tables
+
+
+def _read_examples(path: Path) -> List[Tuple[str, str]]:
+    """Read (text, intent) pairs from a JSONL file, skipping bad lines."""
+    if not path.exists():
+        return []
+
+    examples = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                examples.append((record["text"], record["intent"]))
+            except (ValueError, KeyError, TypeError):
+                continue
+    return examples
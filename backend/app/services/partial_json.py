@@ -0,0 +1,160 @@
+"""
+Partial JSON Parser
+
+Incremental, tolerant parsing of a JSON object streamed by the LLM.
+
+Structured outputs only matter up to the fields the caller needs. The
+parser is fed text deltas as they are decoded, reports which top-level
+fields are complete (so generation can be cancelled early) and repairs
+truncated or partial objects instead of rejecting them. Text before the
+opening brace and after the closing brace is ignored.
+"""
+
+import json
+from typing import Any, Dict, List, Optional, Set
+
+
+class StreamingJSONParser:
+    """
+    Incremental parser for one JSON object.
+
+    Tracks nesting and string state across feed() calls, so every delta
+    is scanned once.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.complete = False
+        self.completed_keys: Set[str] = set()
+        self._pos = 0
+        self._start: Optional[int] = None
+        # Open containers: [bracket, index after the last complete member]
+        self._stack: List[List[Any]] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._expect_key = False
+        self._key: Optional[str] = None
+
+    def feed(self, text: str) -> None:
+        """
+        Add a text delta and scan it.
+
+        Args:
+            text: Next piece of the LLM output
+        """
+        self.text += text
+
+        while self._pos < len(self.text) and not self.complete:
+            self._scan(self.text[self._pos], self._pos)
+            self._pos += 1
+
+    def _scan(self, char: str, index: int) -> None:
+        """Advance the state machine by one character."""
+        if self._start is None:
+            if char == "{":
+                self._start = index
+                self._stack.append(["{", index + 1])
+                self._expect_key = True
+            return
+
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif char == "\\":
+                self._escape = True
+            elif char == '"':
+                self._in_string = False
+                self._string_done(index)
+            return
+
+        depth = len(self._stack)
+
+        if char == '"':
+            self._in_string = True
+            self._string_start = index
+        elif char in "{[":
+            self._stack.append([char, index + 1])
+        elif char in "}]":
+            self._stack.pop()
+            if not self._stack:
+                self._member_done()
+                self.complete = True
+            elif len(self._stack) == 1:
+                # A nested value of a top-level field just closed
+                self._member_done()
+        elif char == "," and self._stack:
+            self._stack[-1][1] = index
+            if depth == 1:
+                self._member_done()
+                self._expect_key = True
+
+    def _string_done(self, index: int) -> None:
+        """Handle a closed string: a top-level key or value."""
+        if len(self._stack) != 1:
+            return
+
+        if self._expect_key:
+            try:
+                self._key = json.loads(self.text[self._string_start:index + 1])
+            except ValueError:
+                self._key = None
+            self._expect_key = False
+        else:
+            self._member_done()
+
+    def _member_done(self) -> None:
+        """Mark the current top-level field as fully decoded."""
+        if self._key is not None:
+            self.completed_keys.add(self._key)
+
+    def value(self) -> Optional[Dict[str, Any]]:
+        """
+        Get the object decoded so far, repairing truncation.
+
+        Partial members are closed if that yields valid JSON, otherwise
+        dropped; open strings, objects and arrays are closed.
+
+        Returns:
+            Parsed (possibly partial) object, or None if nothing usable
+            has been decoded yet
+        """
+        if self._start is None:
+            return None
+
+        end = self._pos
+        for depth in range(len(self._stack), -1, -1):
+            if depth == len(self._stack):
+                # Keep everything, closing an open string
+                candidate = self.text[self._start:end] + ('"' if self._in_string else "")
+            else:
+                # Drop the partial member of the container at this depth
+                candidate = self.text[self._start:self._stack[depth][1]]
+
+            candidate = candidate.rstrip(" \t\r\n,")
+            closers = "".join("}" if bracket == "{" else "]" for bracket, _ in reversed(self._stack[:depth + 1]))
+
+            try:
+                result = json.loads(candidate + closers)
+            except ValueError:
+                continue
+            if isinstance(result, dict):
+                return result
+
+        return None
+
+
+def parse_partial_json(text: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse a JSON object tolerantly.
+
+    Args:
+        text: LLM output that contains a JSON object, possibly truncated or
+            surrounded by other text
+
+    Returns:
+        Parsed (possibly partial) object, or None if there is none
+    """
+    parser = StreamingJSONParser()
+    parser.feed(text)
+    return parser.value()
@@ -0,0 +1,124 @@
+"""
+Prompt Assembly
+
+Builds the (system_prompt, prompt) pair for each kind of LLM task.
+
+llama.cpp's cache_prompt only skips re-evaluating the part of a prompt
+that is identical to the previous one. Every task type therefore gets a
+fixed system prompt that is byte-identical across requests, and all
+variable material (tool context, the user's message) goes after it in the
+user turn. Never format request data into a system prompt.
+"""
+
+from typing import Dict, Tuple
+
+from ..llm import LLMTask
+
+
+# Minimal system prompt optimized for small models
+INTENT_CLASSIFICATION_PROMPT = """You are a JSON-only assistant. Classify the user's intent and extract entities.
+
+Intents: greeting, question, command, weather, time, timer, reminder, calculation, general, unknown
+Entity keys: location, duration, time, date, message, expression, query
+
+Output JSON only:
+{"intent": "intent_type", "confidence": 0.0-1.0, "entities": {}}"""
+
+CALCULATION_PROMPT = "You are a calculator. Respond only with the numerical result."
+
+ANSWER_PROMPT = (
+    "You are JARVIS, a helpful assistant. Answer briefly and directly. "
+    "If current information is provided with the question, use it."
+)
+
+# Extends ANSWER_PROMPT, so both share a cached prefix in the same slot
+JOINT_PROMPT = ANSWER_PROMPT + (
+    "\nStart your reply with the intent of the message on its own line: greeting, question, "
+    "command, weather, time, timer, reminder, calculation or general. Then answer."
+)
+
+
+class PromptLayout:
+    """
+    Fixed system prefix plus a template for the variable user turn.
+
+    The template may use {user_input} and {context}; context is rendered
+    with context_template only when there is any.
+    """
+
+    def __init__(
+        self,
+        system_prompt: str,
+        user_template: str = "{context}{user_input}",
+        context_template: str = "Current information:\n{context}\n\nQuestion: "
+    ):
+        """
+        Initialize layout.
+
+        Args:
+            system_prompt: Fixed system prompt (must not vary per request)
+            user_template: Template for the user turn
+            context_template: Wrapper for tool context inside the user turn
+        """
+        self.system_prompt = system_prompt
+        self.user_template = user_template
+        self.context_template = context_template
+
+    def build(self, user_input: str, context: str = "") -> Tuple[str, str]:
+        """
+        Render the prompt.
+
+        Args:
+            user_input: User's message
+            context: Formatted tool context (optional)
+
+        Returns:
+            (system_prompt, prompt)
+        """
+        context_block = self.context_template.format(context=context.strip()) if context else ""
+        return self.system_prompt, self.user_template.format(context=context_block, user_input=user_input)
+
+    def fixed_text(self, user_input: str) -> str:
+        """Everything that is sent besides tool context (for token budgets)."""
+        system_prompt, prompt = self.build(user_input)
+        return f"{system_prompt}\n{self.context_template}\n{prompt}"
+
+
+PROMPT_LAYOUTS: Dict[LLMTask, PromptLayout] = {
+    LLMTask.CLASSIFICATION: PromptLayout(
+        INTENT_CLASSIFICATION_PROMPT,
+        user_template='User: "{user_input}"\n\nClassify:'
+    ),
+    LLMTask.CALCULATION: PromptLayout(
+        CALCULATION_PROMPT,
+        user_template="Calculate and respond with just the result: {user_input}"
+    ),
+    LLMTask.ANSWER: PromptLayout(ANSWER_PROMPT),
+    LLMTask.JOINT: PromptLayout(JOINT_PROMPT),
+}
+
+
+def build_prompt(task: LLMTask, user_input: str, context: str = "") -> Tuple[str, str]:
+    """
+    Build the prompt for a task.
+
+    Args:
+        task: Kind of LLM task
+        user_input: User's message
+        context: Formatted tool context (optional)
+
+    Returns:
+        (system_prompt, prompt)
+    """
+    return PROMPT_LAYOUTS[task].build(user_input, context)
+
+
+def warm_prefixes() -> Dict[LLMTask, Tuple[str, str]]:
+    """
+    Get the prompt prefix of every task, for warming the prompt cache.
+
+    Returns:
+        Task -> (system_prompt, prompt) with an empty user message, most
+        frequent task first
+    """
+    return {task: layout.build("") for task, layout in PROMPT_LAYOUTS.items()}
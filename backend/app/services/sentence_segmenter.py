@@ -0,0 +1,200 @@
+"""
+Sentence Segmenter Service
+
+Splits streamed LLM output into complete sentences as soon as they are
+finished, so the client can start speech synthesis on the first sentence
+while the model is still generating the rest.
+"""
+
+import re
+from typing import List, Optional
+
+
+# Abbreviations that never end a sentence (titles, "e.g." style)
+NON_TERMINAL_ABBREVIATIONS = {
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "vs", "mt",
+    "e.g", "i.e", "cf", "approx", "fig", "vol", "ca",
+}
+
+# Abbreviations that end a sentence only if the next word is capitalized
+TERMINAL_ABBREVIATIONS = {
+    "etc", "inc", "ltd", "co", "corp", "a.m", "p.m", "u.s", "u.k",
+    "jan", "feb", "mar", "apr", "jun", "jul", "aug", "sep", "sept",
+    "oct", "nov", "dec",
+}
+
+SENTENCE_END_CHARS = ".!?"
+CLOSING_CHARS = "\"')]}»”’"
+
+_WORD_BEFORE_DOT = re.compile(r"([\w.]+)$")
+_LIST_MARKER = re.compile(r"(?:^|\n)[ \t]*\d+$")
+
+
+class SentenceSegmenter:
+    """
+    Incremental sentence segmenter for streamed text.
+
+    Feed text deltas with feed(); complete sentences are returned as soon
+    as the first character of the following sentence has arrived. Call
+    flush() at the end of the stream to get the remaining text.
+
+    Handles:
+    - Abbreviations ("Dr. Smith", "e.g. this", "5 p.m. Then")
+    - Numbers and numbered lists ("3.14", "1. First item")
+    - Initials ("J. R. R. Tolkien")
+    - Inline `code` spans and ``` fenced blocks (never split inside)
+    - Paragraph breaks (blank lines always end a sentence)
+    """
+
+    def __init__(self):
+        """Initialize segmenter with an empty buffer."""
+        self._buffer = ""
+        self._pos = 0  # Next buffer index to scan
+        self._in_code = False  # Inside inline code or a fenced block
+        self._fence = ""  # Active code delimiter ("`" or "```")
+
+    def feed(self, text: str) -> List[str]:
+        """
+        Add a text delta and return any sentences it completed.
+
+        Args:
+            text: Newly generated text
+
+        Returns:
+            List of complete sentences (may be empty)
+        """
+        self._buffer += text
+        sentences = []
+
+        while True:
+            end = self._find_boundary()
+            if end is None:
+                break
+
+            sentence = self._buffer[:end].strip()
+            self._buffer = self._buffer[end:].lstrip()
+            self._pos = 0
+            if sentence:
+                sentences.append(sentence)
+
+        return sentences
+
+    def flush(self) -> Optional[str]:
+        """
+        Return whatever text is left at the end of the stream.
+
+        Returns:
+            Final sentence, or None if nothing is buffered
+        """
+        sentence = self._buffer.strip()
+        self._buffer = ""
+        self._pos = 0
+        self._in_code = False
+        self._fence = ""
+        return sentence or None
+
+    def _find_boundary(self) -> Optional[int]:
+        """
+        Scan the buffer for the next sentence boundary.
+
+        Returns:
+            Index just past the sentence, or None if more text is needed
+        """
+        buffer = self._buffer
+        i = self._pos
+
+        while i < len(buffer):
+            char = buffer[i]
+
+            # Code spans: ``` fences or single backticks
+            if char == "`":
+                if buffer.startswith("```", i):
+                    delimiter = "```"
+                elif i + 3 > len(buffer) and buffer[i:] == "`" * (len(buffer) - i):
+                    # Might be the start of a fence; wait for more text
+                    self._pos = i
+                    return None
+                else:
+                    delimiter = "`"
+
+                if not self._in_code:
+                    self._in_code, self._fence = True, delimiter
+                elif delimiter == self._fence:
+                    self._in_code, self._fence = False, ""
+                i += len(delimiter)
+                continue
+
+            if self._in_code:
+                i += 1
+                continue
+
+            # Paragraph break always ends a sentence
+            if char == "\n":
+                if i + 1 >= len(buffer):
+                    self._pos = i
+                    return None
+                if buffer[i + 1] == "\n":
+                    return i
+
+            if char in SENTENCE_END_CHARS:
+                end = i + 1
+                # Include repeated terminators and closing quotes/brackets
+                while end < len(buffer) and buffer[end] in SENTENCE_END_CHARS + CLOSING_CHARS:
+                    end += 1
+
+                # Need the whitespace and the next visible character to decide
+                next_char_index = end
+                while next_char_index < len(buffer) and buffer[next_char_index].isspace():
+                    next_char_index += 1
+                if next_char_index >= len(buffer):
+                    self._pos = i
+                    return None
+
+                if next_char_index > end and self._is_sentence_end(buffer, i, buffer[next_char_index]):
+                    return end
+
+                i = end
+                continue
+
+            i += 1
+
+        self._pos = i
+        return None
+
+    def _is_sentence_end(self, buffer: str, index: int, next_char: str) -> bool:
+        """
+        Decide whether the terminator at index ends a sentence.
+
+        Args:
+            buffer: Text buffer
+            index: Index of the terminator character
+            next_char: First non-space character after the terminator
+        """
+        # Sentences start with a capital, digit, quote or markup - not lowercase
+        if next_char.islower():
+            return False
+
+        if buffer[index] != ".":
+            return True
+
+        # Numbered list marker ("1. Item") at the start of a line
+        if _LIST_MARKER.search(buffer[:index]):
+            return False
+
+        match = _WORD_BEFORE_DOT.search(buffer[:index])
+        if not match:
+            return True
+
+        word = match.group(1).lower()
+
+        # Single-letter initials ("J. R. R. Tolkien")
+        if len(word) == 1 and word.isalpha():
+            return False
+
+        if word in NON_TERMINAL_ABBREVIATIONS:
+            return False
+
+        if word in TERMINAL_ABBREVIATIONS:
+            return next_char.isupper()
+
+        return True
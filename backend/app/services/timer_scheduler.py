@@ -0,0 +1,288 @@
+"""
+Timer Scheduler
+
+In-process scheduler for timers and reminders.
+
+Pending events live in a min-heap ordered by due time, and a single
+asyncio task sleeps until the earliest one is due (or until an earlier
+event is added). Scheduling and firing are O(log n) however many events
+are pending; cancelled events are dropped lazily when they reach the top
+of the heap.
+
+Every change is appended to a JSONL journal (add / cancel / fire), so
+pending events survive restarts. The journal is replayed and compacted
+at startup; events that fell due while the server was down fire right
+away. Fired events are pushed to subscribers (the /api/events stream).
+"""
+
+import asyncio
+import heapq
+import itertools
+import json
+import os
+import time
+import uuid
+from collections import deque
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+
+# Fired events kept for clients that reconnect
+RECENT_EVENTS = 50
+
+# Events delivered more than this many seconds after their due time are
+# marked late
+LATE_AFTER = 1.0
+
+# Rewrite the journal when it has this many lines per pending event
+# (and at least COMPACT_MIN_LINES)
+COMPACT_RATIO = 4
+COMPACT_MIN_LINES = 1000
+
+# Per-subscriber queue size; a slow client loses its oldest events
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+@dataclass
+class ScheduledEvent:
+    """A pending or fired timer or reminder."""
+    id: str
+    kind: str  # "timer" or "reminder"
+    due: float  # Unix time
+    message: str = ""
+    created: float = 0.0
+    fired: Optional[float] = None  # Unix time it was delivered
+    late: bool = False  # Delivered well after its due time (e.g. after a restart)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable form."""
+        return asdict(self)
+
+
+class TimerScheduler:
+    """
+    Heap-based scheduler with a single wakeup task and a persistent journal.
+
+    Must be started (start()) inside the running event loop before events
+    fire; events can be scheduled before that and fire once it runs.
+    """
+
+    def __init__(self, journal_path: Optional[str] = None):
+        """
+        Initialize scheduler.
+
+        Args:
+            journal_path: JSONL journal of scheduled, cancelled and fired
+                events (None = events are not persisted)
+        """
+        self.journal_path = Path(journal_path).expanduser() if journal_path else None
+        self.fired_count = 0
+        self._heap: List[Tuple[float, int, str]] = []
+        self._events: Dict[str, ScheduledEvent] = {}
+        self._sequence = itertools.count()
+        self._recent: Deque[ScheduledEvent] = deque(maxlen=RECENT_EVENTS)
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._journal = None
+        self._journal_lines = 0
+
+    async def start(self) -> None:
+        """Load the journal and start the wakeup task."""
+        if self._task is not None:
+            return
+
+        if self.journal_path is not None:
+            self._load_journal()
+            self._compact_journal()
+
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the wakeup task and close the journal."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def schedule(self, kind: str, due: float, message: str = "") -> ScheduledEvent:
+        """
+        Schedule a timer or reminder.
+
+        Args:
+            kind: "timer" or "reminder"
+            due: Unix time it fires at
+            message: Text delivered with it
+
+        Returns:
+            Scheduled event
+        """
+        event = ScheduledEvent(id=uuid.uuid4().hex[:12], kind=kind, due=due, message=message, created=time.time())
+        self._add(event)
+        self._write({"op": "add", **event.to_dict()})
+        return event
+
+    def cancel(self, event_id: str) -> bool:
+        """
+        Cancel a pending event.
+
+        Args:
+            event_id: Event ID
+
+        Returns:
+            True if the event was pending
+        """
+        if self._events.pop(event_id, None) is None:
+            return False
+
+        # The heap entry is skipped when it reaches the top
+        self._write({"op": "cancel", "id": event_id})
+        return True
+
+    def pending(self) -> List[ScheduledEvent]:
+        """Get pending events, earliest first."""
+        return sorted(self._events.values(), key=lambda event: event.due)
+
+    def recent(self, after: Optional[str] = None) -> List[ScheduledEvent]:
+        """
+        Get recently fired events.
+
+        Args:
+            after: Only events fired after the one with this ID (all kept
+                events if unknown)
+
+        Returns:
+            Fired events, oldest first
+        """
+        events = list(self._recent)
+        for index, event in enumerate(events):
+            if event.id == after:
+                return events[index + 1:]
+        return events
+
+    def subscribe(self, maxsize: int = SUBSCRIBER_QUEUE_SIZE) -> asyncio.Queue:
+        """
+        Get a queue that receives every fired event.
+
+        Args:
+            maxsize: Events kept for a slow reader (the oldest are dropped)
+
+        Returns:
+            Event queue
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        """Stop delivering events to a queue."""
+        self._subscribers.discard(queue)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get pending and fired counts."""
+        return {
+            "pending": len(self._events),
+            "fired": self.fired_count,
+            "subscribers": len(self._subscribers),
+        }
+
+    def _add(self, event: ScheduledEvent) -> None:
+        """Push an event on the heap, waking the loop if it is the new earliest."""
+        self._events[event.id] = event
+        earliest = self._heap[0][0] if self._heap else None
+        heapq.heappush(self._heap, (event.due, next(self._sequence), event.id))
+
+        if self._wake is not None and (earliest is None or event.due < earliest):
+            self._wake.set()
+
+    async def _run(self) -> None:
+        """Sleep until the earliest event is due, fire everything due, repeat."""
+        while True:
+            self._wake.clear()
+            now = time.time()
+
+            while self._heap and (self._heap[0][2] not in self._events or self._heap[0][0] <= now):
+                _, _, event_id = heapq.heappop(self._heap)
+                event = self._events.pop(event_id, None)
+                if event is not None:
+                    self._fire(event, now)
+
+            timeout = self._heap[0][0] - now if self._heap else None
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _fire(self, event: ScheduledEvent, now: float) -> None:
+        """Deliver a due event to all subscribers."""
+        event.fired = now
+        event.late = now - event.due > LATE_AFTER
+        self.fired_count += 1
+        self._recent.append(event)
+        self._write({"op": "fire", "id": event.id})
+
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        """Append a record to the journal."""
+        if self.journal_path is None:
+            return
+
+        if self._journal is None:
+            self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+            self._journal = open(self.journal_path, "a", encoding="utf-8")
+
+        self._journal.write(json.dumps(record) + "\n")
+        self._journal.flush()
+        self._journal_lines += 1
+
+        if self._journal_lines > max(COMPACT_MIN_LINES, COMPACT_RATIO * len(self._events)):
+            self._compact_journal()
+
+    def _load_journal(self) -> None:
+        """Replay the journal into the heap."""
+        if not self.journal_path.exists():
+            return
+
+        events: Dict[str, ScheduledEvent] = {}
+        with open(self.journal_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    op = record.pop("op")
+                    if op == "add":
+                        event = ScheduledEvent(**record)
+                        events[event.id] = event
+                    else:
+                        events.pop(record["id"], None)
+                except (ValueError, KeyError, TypeError):
+                    continue
+
+        for event in events.values():
+            self._add(event)
+
+    def _compact_journal(self) -> None:
+        """Rewrite the journal with only the pending events."""
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.journal_path.with_suffix(".tmp")
+        with open(temporary, "w", encoding="utf-8") as f:
+            for event in self._events.values():
+                f.write(json.dumps({"op": "add", **event.to_dict()}) + "\n")
+        os.replace(temporary, self.journal_path)
+        self._journal_lines = len(self._events)
@@ -62,5 +62,9 @@ class BaseTool(ABC):
         """
         pass
 
+    def close(self) -> None:
+        """Release resources held by the tool (called at shutdown)."""
+        pass
+
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}(name={self.name})"
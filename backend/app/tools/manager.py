@@ -13,8 +13,39 @@ from .todo_tool import TodoTool
 from .calendar_tool import CalendarTool
 from .code_tool import CodeTool
 from .cad_tool import CADTool
-from typing import Dict, List, Optional
-import re
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, List, NamedTuple, Optional
+from ..llm.deadline import Deadline
+from ..metrics import TOOL_SECONDS, current_timings, timed
+from ..services.keyword_matcher import keyword_matcher
+
+
+# Tool keywords for detection (whole words; list plurals explicitly)
+TOOL_KEYWORDS = {
+    "web_search": ["search", "google", "web", "find", "look up", "what is", "who is", "when did", "when was"],
+    "file_search": ["file", "files", "document", "documents", "find file", "search file", "find document"],
+    "email": ["email", "emails", "mail", "message", "messages", "inbox", "unread"],
+    "notes": ["note", "notes", "remember", "save", "note that", "write down"],
+    "todo": ["todo", "todos", "task", "tasks", "add task", "remember to", "need to", "must do"],
+    "calendar": ["calendar", "event", "events", "meeting", "meetings", "schedule", "when is", "what time"],
+    "code": ["code", "programming", "debug", "python", "javascript", "refactor", "optimize"],
+    "cad": ["circuit", "pcb", "openscad", "3d", "design", "schematic"],
+}
+keyword_matcher.register("tool", TOOL_KEYWORDS)
+
+# Seconds each tool may take before the answer goes ahead without it
+# (tools not listed get the manager's default timeout)
+TOOL_TIMEOUTS = {
+    "web_search": 4.0,  # Network round trip (also the search's HTTP timeout)
+}
+
+
+class ToolRun(NamedTuple):
+    """Results of tools executed together."""
+    results: Dict[str, ToolResult]  # Tools that finished in time, in request order
+    timed_out: List[str]  # Tools whose deadline passed (their results are dropped)
 
 
 class ToolManager:
@@ -24,10 +55,22 @@ class ToolManager:
     Detects tool usage from natural language queries and executes them.
     """
 
-    def __init__(self):
-        """Initialize tool manager with all available tools."""
+    def __init__(self, max_workers: int = 4, timeout: float = 2.0, timeouts: Optional[Dict[str, float]] = None):
+        """
+        Initialize tool manager with all available tools.
+
+        Args:
+            max_workers: Tools executed at once (threads; the tools are
+                synchronous)
+            timeout: Default deadline per tool in seconds
+            timeouts: Deadlines of specific tools (default: TOOL_TIMEOUTS)
+        """
+        self.timeout = timeout
+        self.timeouts = dict(TOOL_TIMEOUTS if timeouts is None else timeouts)
+
         self.tools: Dict[str, BaseTool] = {
-            "web_search": WebSearchTool(),
+            # A search slower than its deadline is dropped anyway
+            "web_search": WebSearchTool(timeout=self.timeouts.get("web_search", timeout)),
             "file_search": FileSearchTool(),
             "email": EmailTool(),
             "notes": NotesTool(),
@@ -37,17 +80,9 @@ class ToolManager:
             "cad": CADTool(),
         }
 
-        # Tool keywords for detection
-        self.tool_keywords = {
-            "web_search": ["search", "google", "web", "find", "look up", "what is", "who is", "when"],
-            "file_search": ["file", "document", "find file", "search file", "find document"],
-            "email": ["email", "mail", "message", "inbox", "unread"],
-            "notes": ["note", "remember", "save", "note that", "write down"],
-            "todo": ["todo", "task", "add task", "remember to", "need to", "must do"],
-            "calendar": ["calendar", "event", "meeting", "schedule", "when is", "what time"],
-            "code": ["code", "programming", "debug", "python", "javascript", "refactor", "optimize"],
-            "cad": ["circuit", "pcb", "openscad", "3d", "design", "schematic"],
-        }
+        self.tool_keywords = TOOL_KEYWORDS
+        # Threads are started on first use
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
 
     def detect_tool(self, query: str) -> List[str]:
         """
@@ -59,17 +94,8 @@ class ToolManager:
         Returns:
             List of tool names that might be relevant
         """
-        query_lower = query.lower()
-        detected = []
-
-        for tool_name, keywords in self.tool_keywords.items():
-            for keyword in keywords:
-                if keyword in query_lower:
-                    if tool_name not in detected:
-                        detected.append(tool_name)
-                    break
-
-        return detected
+        # One pass over the query; shared with intent pattern matching
+        return keyword_matcher.labels(query, "tool")
 
     def execute_tool(self, tool_name: str, query: str, **kwargs) -> ToolResult:
         """
@@ -101,6 +127,109 @@ class ToolManager:
 
         return tool.execute(query, **kwargs)
 
+    def _safe_execute(self, tool_name: str, query: str, **kwargs) -> ToolResult:
+        """Execute a tool in a worker thread, turning exceptions into failed results."""
+        try:
+            return self.execute_tool(tool_name, query, **kwargs)
+        except Exception as e:
+            return ToolResult(success=False, data=None, error=f"Tool '{tool_name}' failed: {e}")
+
+    @staticmethod
+    def _observe(tool_name: str, outcome: str, seconds: float) -> None:
+        """Record a tool's execution time in the metrics and request timings."""
+        TOOL_SECONDS.observe(seconds, tool=tool_name, outcome=outcome)
+        timings = current_timings.get()
+        if timings is not None:
+            timings.add_tool(tool_name, seconds)
+
+    def execute_tools(self, tool_names: List[str], query: str, **kwargs) -> ToolRun:
+        """
+        Execute several tools concurrently, each with its own deadline.
+
+        Args:
+            tool_names: Tools to execute
+            query: Query string for the tools
+            **kwargs: Additional parameters for the tools
+
+        Returns:
+            Results of the tools that finished in time, and the names of
+            those that did not
+        """
+        started = time.monotonic()
+        futures = {name: self._executor.submit(self._safe_execute, name, query, **kwargs) for name in tool_names}
+
+        run = ToolRun({}, [])
+        for name, future in futures.items():
+            remaining = started + self.timeouts.get(name, self.timeout) - time.monotonic()
+            try:
+                result = run.results[name] = future.result(timeout=max(0.0, remaining))
+                self._observe(name, "ok" if result.success else "error", time.monotonic() - started)
+            except FutureTimeoutError:
+                # Not started yet: never runs; running: finishes unobserved
+                future.cancel()
+                run.timed_out.append(name)
+                self._observe(name, "timeout", time.monotonic() - started)
+        return run
+
+    async def aexecute_tools(
+        self,
+        tool_names: List[str],
+        query: str,
+        deadline: Optional[Deadline] = None,
+        **kwargs
+    ) -> ToolRun:
+        """
+        Async version of execute_tools (the event loop is not blocked).
+
+        Args:
+            tool_names: Tools to execute
+            query: Query string for the tools
+            deadline: Request deadline; no tool waits past it (a tool
+                stopped by it is timed out and recorded as cut "tools")
+            **kwargs: Additional parameters for the tools
+
+        Returns:
+            Results of the tools that finished in time, and the names of
+            those that did not
+        """
+        async def run_one(name: str) -> ToolResult:
+            limit = self.timeouts.get(name, self.timeout)
+            timeout = deadline.timeout(limit) if deadline is not None else limit
+            started = time.perf_counter()
+            outcome = "cancelled"  # Not needed any more
+            future = self._executor.submit(self._safe_execute, name, query, **kwargs)
+            try:
+                result = await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+                outcome = "ok" if result.success else "error"
+                return result
+            except asyncio.TimeoutError:
+                outcome = "timeout"
+                if timeout < limit:
+                    deadline.mark_cut("tools")
+                raise
+            finally:
+                self._observe(name, outcome, time.perf_counter() - started)
+
+        with timed("tools"):
+            outcomes = await asyncio.gather(*(run_one(name) for name in tool_names), return_exceptions=True)
+
+        run = ToolRun({}, [])
+        for name, outcome in zip(tool_names, outcomes):
+            if isinstance(outcome, asyncio.TimeoutError):
+                run.timed_out.append(name)
+            elif isinstance(outcome, BaseException):
+                raise outcome
+            else:
+                run.results[name] = outcome
+        return run
+
+    def close(self) -> None:
+        """Stop the worker threads and release the resources held by all tools."""
+        # Tools still running past their deadline are not waited for
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        for tool in self.tools.values():
+            tool.close()
+
     def get_available_tools(self) -> Dict[str, str]:
         """
         Get list of available tools.
@@ -126,7 +255,17 @@ class ToolManager:
             Dictionary with tool results and combined context
         """
         detected_tools = self.detect_tool(query)
+        run = self.execute_tools(detected_tools, query, **kwargs) if detected_tools else ToolRun({}, [])
+        return self._auto_results(detected_tools, run)
+
+    async def aexecute_auto(self, query: str, **kwargs) -> Dict:
+        """Async version of execute_auto."""
+        detected_tools = self.detect_tool(query)
+        run = await self.aexecute_tools(detected_tools, query, **kwargs) if detected_tools else ToolRun({}, [])
+        return self._auto_results(detected_tools, run)
 
+    def _auto_results(self, detected_tools: List[str], run: ToolRun) -> Dict:
+        """Combine the results of auto-detected tools."""
         if not detected_tools:
             return {
                 "success": False,
@@ -137,13 +276,12 @@ class ToolManager:
         results = {
             "success": True,
             "tools_used": [],
+            "tools_timed_out": run.timed_out,
             "results": {},
             "context": ""
         }
 
-        for tool_name in detected_tools:
-            result = self.execute_tool(tool_name, query, **kwargs)
-
+        for tool_name, result in run.results.items():
             results["tools_used"].append(tool_name)
             results["results"][tool_name] = {
                 "success": result.success,
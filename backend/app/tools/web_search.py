@@ -17,11 +17,12 @@ except ImportError:
 class WebSearchTool(BaseTool):
     """Search the web using DuckDuckGo API."""
 
-    def __init__(self):
+    def __init__(self, timeout: float = 10):
         super().__init__(
             name="web_search",
             description="Search the web for current information"
         )
+        self.timeout = timeout  # Seconds to wait for the search API
 
     def execute(self, query: str, max_results: int = 5, **kwargs) -> ToolResult:
         """
@@ -52,7 +53,7 @@ class WebSearchTool(BaseTool):
                 "t": "jarvis_assistant"
             }
 
-            response = requests.get(url, params=params, timeout=10)
+            response = requests.get(url, params=params, timeout=self.timeout)
             response.raise_for_status()
             data = response.json()
 
@@ -0,0 +1,114 @@
+"""
+App Services Benchmark
+
+Measures the per-request setup cost that app-scoped services remove.
+Each chat request used to build its own ToolManager (eight tools, a
+mkdir for the notes folder and a stat or write of todos.json) and
+CommandRouter; now both are created once at startup and injected.
+
+Reports the cost of building those objects, of resolving them from the
+app state, and the /api/chat latency for a message answered without the
+LLM ("hello") with per-request construction (the old behaviour, via
+dependency overrides) and with the shared services.
+
+Runs against a temporary home directory and needs no LLM server.
+
+Usage (from the backend directory):
+    python -m benchmarks.app_services
+    python -m benchmarks.app_services --requests 500
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Iterator, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Tools and the intent log write below the home directory
+os.environ["HOME"] = tempfile.mkdtemp(prefix="jarvis-bench-")
+os.environ["LLAMACPP_WARM_START"] = "false"
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.dependencies import get_command_router_instance, get_tool_manager_instance  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services import CommandRouter  # noqa: E402
+from app.tools.manager import ToolManager  # noqa: E402
+
+
+def per_call_us(function: Callable[[], object], repeat: int) -> float:
+    """Mean time per call in µs."""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def chat_latencies(client: TestClient, requests: int) -> List[float]:
+    """/api/chat latencies in ms for a pattern-matched message."""
+    latencies = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = client.post("/api/chat", json={"message": "hello"})
+        latencies.append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="Chat requests per mode")
+    args = parser.parse_args()
+
+    with TestClient(app) as client:
+        services = app.state.services
+
+        def router_per_request() -> CommandRouter:
+            return CommandRouter(services.llm_provider, services.context_packer, services.timer_scheduler)
+
+        # No parameters: FastAPI would read ToolManager's as request parameters
+        def tool_manager_per_request() -> Iterator[ToolManager]:
+            tool_manager = ToolManager()
+            try:
+                yield tool_manager
+            finally:
+                tool_manager.close()
+
+        built: List[ToolManager] = []
+
+        def build_tool_manager() -> None:
+            built.append(ToolManager())
+
+        print("setup per request")
+        print(f"  ToolManager()                {per_call_us(build_tool_manager, args.requests):>9.1f}µs")
+        for tool_manager in built:
+            tool_manager.close()
+        print(f"  CommandRouter(...)           {per_call_us(router_per_request, args.requests):>9.1f}µs")
+        print(f"  shared, resolved from state  {per_call_us(lambda: get_tool_manager_instance(services), args.requests):>9.1f}µs")
+
+        modes = (
+            (
+                "per request",
+                {get_tool_manager_instance: tool_manager_per_request, get_command_router_instance: router_per_request}
+            ),
+            ("app-scoped", {}),
+        )
+
+        print(f"\n/api/chat \"hello\" ({args.requests} requests)")
+        print(f"{'':<14}{'mean':>9}{'p50':>9}{'p95':>9}")
+        for name, overrides in modes:
+            app.dependency_overrides = overrides
+            chat_latencies(client, 10)
+            latencies = sorted(chat_latencies(client, args.requests))
+            p95 = latencies[int(len(latencies) * 0.95) - 1]
+            print(f"{name:<14}{statistics.mean(latencies):>7.2f}ms{statistics.median(latencies):>7.2f}ms{p95:>7.2f}ms")
+        app.dependency_overrides = {}
+
+
+if __name__ == "__main__":
+    main()
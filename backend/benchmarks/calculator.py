@@ -0,0 +1,70 @@
+"""
+Calculator Benchmark
+
+Runs spoken and written calculations through the safe calculator that
+answers calculation intents before the LLM is asked: the expression each
+message is read as, its result (or why it falls back to the LLM) and how
+long evaluation takes.
+
+Usage (from the backend directory):
+    python -m benchmarks.calculator
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.calculator import (  # noqa: E402
+    CalculationError,
+    ExpressionParseError,
+    calculate,
+    format_number,
+    to_expression,
+)
+
+MESSAGES = [
+    "what's 25 * 4?",
+    "twelve percent of 340",
+    "sqrt 2 times pi",
+    "what is (3 + 4) ^ 2",
+    "three hundred and forty two divided by six",
+    "two point five times four",
+    "how much is half of 1,250",
+    "what does 7 x 6 equal",
+    "10 to the power of 3",
+    "what is 2 to the power of 100000",
+    "1 / 0",
+    "calculate the area of a circle with radius 3",
+]
+
+
+def main() -> None:
+    print(f"{'message':<46}{'expression':<30}{'result':>16}{'latency':>10}")
+    rounds = 200
+    for message in MESSAGES:
+        try:
+            expression = to_expression(message)
+        except ExpressionParseError:
+            expression = "-"
+
+        try:
+            result = format_number(calculate(message))
+        except ExpressionParseError:
+            result = "LLM fallback"
+        except CalculationError as e:
+            result = f"error: {e}"
+
+        started = time.perf_counter()
+        for _ in range(rounds):
+            try:
+                calculate(message)
+            except CalculationError:
+                pass
+        elapsed = (time.perf_counter() - started) / rounds
+        print(f"{message[:45]:<46}{expression[:29]:<30}{result[:15]:>16}{elapsed * 1e6:>8.0f}µs")
+
+
+if __name__ == "__main__":
+    main()
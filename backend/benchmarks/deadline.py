@@ -0,0 +1,106 @@
+"""
+Request Deadline Benchmark
+
+Runs a question through the chat pipeline (tools, LLM classification,
+answer) with different request budgets. Without a deadline the stages
+take as long as they take; with one, the answer's max_tokens is shrunk
+to what the remaining time allows and work still running at the
+deadline is cut, keeping the partial answer.
+
+The LLM (first token delay, decode speed) and the tools are simulated,
+so the numbers show the pipeline structure, not the hardware.
+
+Usage (from the backend directory):
+    python -m benchmarks.deadline
+"""
+
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from typing import AsyncIterator, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.config import Settings  # noqa: E402
+from app.llm import BaseLLMProvider, Deadline, DeadlineProvider, LLMResponse, LLMTask  # noqa: E402
+from app.routers.chat import _analyze_message  # noqa: E402
+from app.services import CommandRouter, IntentClassifier  # noqa: E402
+from benchmarks.pipeline_overlap import make_tool_manager  # noqa: E402
+
+
+# Simulated time to first token and decode speed
+FIRST_TOKEN_DELAY = 0.4
+TOKENS_PER_SECOND = 60.0
+
+MESSAGE = "who is the author of dune"  # LLM classification; web search is used
+
+# Request budgets in seconds (None = no deadline)
+BUDGETS: List[Optional[float]] = [None, 4.0, 2.5, 1.5, 0.5]
+
+
+class SlowProvider(BaseLLMProvider):
+    """Streams max_tokens words at a fixed speed after a fixed delay."""
+
+    def __init__(self):
+        super().__init__(model_name="simulated")
+        self.answer_max_tokens = None  # max_tokens of the last answer
+
+    def generate(self, prompt: str, **kwargs) -> LLMResponse:
+        raise NotImplementedError
+
+    async def agenerate(self, prompt: str, **kwargs) -> LLMResponse:
+        raise NotImplementedError
+
+    async def astream(self, prompt: str, **kwargs) -> AsyncIterator[LLMResponse]:
+        max_tokens = kwargs.get("max_tokens") or self.max_tokens
+        if kwargs.get("task") == LLMTask.ANSWER:
+            self.answer_max_tokens = max_tokens
+
+        await asyncio.sleep(FIRST_TOKEN_DELAY)
+        if kwargs.get("task") == LLMTask.CLASSIFICATION:
+            yield LLMResponse(text=json.dumps({"intent": "question", "confidence": 0.9, "entities": {}}))
+            return
+
+        for _ in range(max_tokens):
+            yield LLMResponse(text="word ")
+            await asyncio.sleep(1 / TOKENS_PER_SECOND)
+
+    def health_check(self) -> bool:
+        return True
+
+
+async def main() -> None:
+    settings = Settings(pipeline_mode="two_call", enable_command_routing=True, enable_intent_classification=True)
+    slow = SlowProvider()
+    provider = DeadlineProvider(slow)
+    classifier = IntentClassifier(provider)
+    router = CommandRouter(provider)
+    tool_manager = make_tool_manager()
+
+    print(f"{'budget':>8}{'elapsed':>10}{'max_tokens':>12}{'answer words':>14}  cut stages")
+    for budget in BUDGETS:
+        # Fresh estimates, as if each row ran on a restarted server
+        provider.tokens_per_second = TOKENS_PER_SECOND
+        provider.first_token_seconds = FIRST_TOKEN_DELAY
+
+        deadline = Deadline(budget)
+        started = time.perf_counter()
+        analysis = await _analyze_message(MESSAGE, settings, classifier, router, tool_manager, deadline)
+        answer = await router.route(analysis.intent, analysis.entities, MESSAGE, analysis.tool_context, deadline)
+        elapsed = time.perf_counter() - started
+
+        label = "none" if budget is None else f"{budget:.1f}s"
+        words = len(answer.split()) if answer.startswith("word") else 0
+        print(
+            f"{label:>8}{elapsed:>9.2f}s{slow.answer_max_tokens or 0:>12}{words:>14}  "
+            f"{', '.join(deadline.cut) or '-'}"
+        )
+        slow.answer_max_tokens = None
+
+    tool_manager.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
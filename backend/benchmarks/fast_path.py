@@ -0,0 +1,84 @@
+"""
+Fast Path Benchmark
+
+Processing time of messages answered on the deterministic fast path
+(greetings, time, timers, ...): classification without the LLM, no tool
+detection, no tools, a canned handler. Shows the stages each message
+skipped; for comparison the table also lists the tools the message
+would have triggered before the fast path.
+
+Runs the real pipeline with the configured services and needs no LLM
+server (fast path messages never reach it).
+
+Usage (from the backend directory):
+    python -m benchmarks.fast_path
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Tools, timers and the intent log write below the home directory
+os.environ["HOME"] = tempfile.mkdtemp(prefix="jarvis-bench-")
+
+from app.config import Settings  # noqa: E402
+from app.dependencies import AppServices  # noqa: E402
+from app.routers.chat import _analyze_message  # noqa: E402
+
+
+MESSAGES: List[str] = [
+    "hi",
+    "hi, search for a good movie",
+    "what time is it",
+    "what time is my meeting",
+    "set a timer for ten minutes",
+    "remind me to call mom at 5pm",
+    "what's 12 percent of 340",
+]
+
+# Runs per message
+REPEAT = 200
+
+
+async def main() -> None:
+    settings = Settings(pipeline_mode="two_call")
+    services = AppServices.create(settings)
+    await services.start()
+
+    print(f"{'message':<32}{'intent':>13}{'p50':>9}{'p95':>9}  {'skipped':<54}  would have run")
+    try:
+        for message in MESSAGES:
+            latencies = []
+            for _ in range(REPEAT):
+                started = time.perf_counter()
+                analysis = await _analyze_message(
+                    message, settings, services.intent_classifier, services.command_router, services.tool_manager
+                )
+                await services.command_router.route(analysis.intent, analysis.entities, message, analysis.tool_context)
+                latencies.append((time.perf_counter() - started) * 1e6)
+
+            # Timers and reminders scheduled by the runs above
+            for event in services.timer_scheduler.pending():
+                services.timer_scheduler.cancel(event.id)
+
+            latencies.sort()
+            intent = getattr(analysis.intent, "value", analysis.intent)
+            skipped = ", ".join(analysis.skipped_stages) or "-"
+            tools = ", ".join(services.tool_manager.detect_tool(message)) or "-"
+            print(
+                f"{message:<32}{intent:>13}{statistics.median(latencies):>7.0f}µs"
+                f"{latencies[int(len(latencies) * 0.95) - 1]:>7.0f}µs  {skipped:<54}  {tools}"
+            )
+    finally:
+        await services.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,75 @@
+"""
+Intent Tier Benchmark
+
+Measures the local naive Bayes intent model that sits between the fixed
+patterns and the LLM: how many seed messages it would classify without
+the LLM at a given confidence threshold, how often it is right when it
+does (leave-one-out over the seed dataset), and how long a prediction
+takes.
+
+Usage (from the backend directory):
+    python -m benchmarks.intent_tiers
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.entity_extractor import entities_for  # noqa: E402
+from app.services.intent_classifier import ENTITY_INTENTS, RULE_ENTITY_INTENTS  # noqa: E402
+from app.services.local_classifier import SEED_PATH, NaiveBayesIntentModel, _read_examples  # noqa: E402
+
+THRESHOLDS = (0.6, 0.7, 0.8, 0.9)
+
+
+def leave_one_out():
+    """Predict every seed example with a model trained on all the others."""
+    examples = _read_examples(SEED_PATH)
+    results = []
+    for index, (text, intent) in enumerate(examples):
+        model = NaiveBayesIntentModel()
+        model.fit(examples[:index] + examples[index + 1:])
+        predicted, confidence = model.predict(text)
+        results.append((text, intent, predicted, confidence))
+    return results
+
+
+def taken_locally(text: str, predicted: str) -> bool:
+    """Whether the local tier may answer a prediction (given enough confidence)."""
+    # Weather goes to the LLM (it extracts the location); timers and
+    # reminders only stay local if their entities can be extracted
+    if predicted in ENTITY_INTENTS:
+        return False
+    return predicted not in RULE_ENTITY_INTENTS or entities_for(predicted, text) is not None
+
+
+def main() -> None:
+    results = leave_one_out()
+    accuracy = sum(intent == predicted for _, intent, predicted, _ in results) / len(results)
+    print(f"Leave-one-out over {len(results)} seed examples, accuracy {accuracy:.0%}\n")
+
+    print(f"{'threshold':>10}{'local tier':>12}{'precision':>11}")
+    for threshold in THRESHOLDS:
+        taken = [
+            intent == predicted
+            for text, intent, predicted, confidence in results
+            if confidence >= threshold and taken_locally(text, predicted)
+        ]
+        precision = sum(taken) / len(taken) if taken else 0.0
+        print(f"{threshold:>10}{len(taken) / len(results):>12.0%}{precision:>11.0%}")
+
+    model = NaiveBayesIntentModel.from_files()
+    messages = [text for text, _ in _read_examples(SEED_PATH)]
+    rounds = 20
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for message in messages:
+            model.predict(message)
+    elapsed = (time.perf_counter() - started) / (rounds * len(messages))
+    print(f"\nPrediction latency: {elapsed * 1e6:.0f} µs per message")
+
+
+if __name__ == "__main__":
+    main()
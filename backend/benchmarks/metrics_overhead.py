@@ -0,0 +1,81 @@
+"""
+Metrics Overhead Benchmark
+
+Cost of the pipeline instrumentation: one histogram observation, the
+timings of a whole request (stages, tools, LLM usage, histograms) and
+rendering /metrics with a realistic number of label sets. The fast path
+answers in microseconds, so the per-request cost has to stay in that
+range.
+
+Usage (from the backend directory):
+    python -m benchmarks.metrics_overhead
+"""
+
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.metrics import MetricsRegistry, RequestTimings, current_timings, timed  # noqa: E402
+
+
+INTENTS = ["greeting", "time", "question", "general", "calculation", "timer", "reminder", "command"]
+STAGES = ["tool_detection", "tools", "classification", "answer"]
+
+# Runs per measurement
+REPEAT = 20000
+
+
+def measure(fn: Callable[[], None], repeat: int = REPEAT) -> float:
+    """Median time of fn in microseconds (timed in batches of 100)."""
+    batches = []
+    for _ in range(repeat // 100):
+        started = time.perf_counter()
+        for _ in range(100):
+            fn()
+        batches.append((time.perf_counter() - started) / 100 * 1e6)
+    return statistics.median(batches)
+
+
+def request_cycle() -> RequestTimings:
+    """Instrumentation of one LLM-answered request with two tools."""
+    timings = RequestTimings()
+    token = current_timings.set(timings)
+    for stage in STAGES:
+        with timed(stage):
+            pass
+    timings.add_tool("web_search", 0.8)
+    timings.add_tool("notes", 0.01)
+    timings.add_llm("answer", {"prompt_evaluated": 40, "completion_tokens": 120, "prompt_eval_seconds": 0.4,
+                               "decode_seconds": 9.5})
+    timings.finish("chat", "question")
+    current_timings.reset(token)
+    return timings
+
+
+def main() -> None:
+    registry = MetricsRegistry()
+    histogram = registry.histogram("bench_seconds", "Benchmark histogram", ["stage", "intent"])
+    observe = measure(lambda: histogram.observe(0.3, stage="answer", intent="question"))
+    print(f"{'observe (one histogram)':<40}{observe:>8.2f}µs")
+    print(f"{'request timings (4 stages, 2 tools)':<40}{measure(request_cycle):>8.2f}µs")
+    timings = request_cycle()
+    print(f"{'timings block (RESPONSE_TIMINGS)':<40}{measure(timings.to_dict):>8.2f}µs")
+
+    # Every stage and intent seen (the registry used by request_cycle is
+    # the app's, so it only has the "question" series)
+    for stage in STAGES:
+        for intent in INTENTS:
+            histogram.observe(0.1, stage=stage, intent=intent)
+    text = registry.render()
+    print(
+        f"{'render (32 series, ' + str(len(text.splitlines())) + ' lines)':<40}"
+        f"{measure(registry.render, repeat=1000):>8.0f}µs"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Pipeline Mode Benchmark
+
+Compares the two chat pipeline modes (PIPELINE_MODE) on a running LLM
+server: "two_call" classifies with one LLM request and answers with a
+second, "joint" decodes the intent label and the answer in one
+generation. Reports LLM requests, time to the first response text and
+total time per message.
+
+The pattern, cache and local model tiers are left out, so every message
+reaches the LLM in both modes.
+
+Usage (from the backend directory, with the llama.cpp server running):
+    python -m benchmarks.pipeline_modes
+    python -m benchmarks.pipeline_modes --url http://localhost:8080
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import AsyncIterator, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.config import Settings  # noqa: E402
+from app.llm import BaseLLMProvider, LlamaCppProvider, LLMResponse, ProviderWrapper, parse_slot_map  # noqa: E402
+from app.llm.http_client import close_http_client  # noqa: E402
+from app.services import CommandRouter, IntentClassifier  # noqa: E402
+
+
+# Messages the local tiers usually leave to the LLM, deterministic and
+# open-ended ones mixed
+MESSAGES: List[str] = [
+    "what is the capital of australia",
+    "do you know what hour it is",
+    "explain how a rainbow forms",
+    "work out 17 times 23",
+    "who wrote pride and prejudice",
+    "how are you doing today",
+]
+
+
+class CountingProvider(ProviderWrapper):
+    """Counts the requests sent to the wrapped provider."""
+
+    def __init__(self, provider: BaseLLMProvider):
+        super().__init__(provider)
+        self.requests = 0
+
+    async def agenerate(self, prompt: str, **kwargs) -> LLMResponse:
+        self.requests += 1
+        return await self.provider.agenerate(prompt, **kwargs)
+
+    async def astream(self, prompt: str, **kwargs) -> AsyncIterator[LLMResponse]:
+        self.requests += 1
+        stream = self.provider.astream(prompt, **kwargs)
+        try:
+            async for chunk in stream:
+                yield chunk
+        finally:
+            await stream.aclose()
+
+
+async def two_call(classifier: IntentClassifier, router: CommandRouter, message: str) -> Tuple[str, AsyncIterator[str]]:
+    """Classify with one LLM request, then answer with another."""
+    classification = await classifier.classify(message)
+    intent = classification["intent"]
+    return intent, router.route_stream(intent, classification["entities"], message)
+
+
+async def joint(classifier: IntentClassifier, router: CommandRouter, message: str) -> Tuple[str, AsyncIterator[str]]:
+    """Classify and answer in one generation."""
+    return await router.route_joint(message)
+
+
+async def measure(mode, provider: CountingProvider, message: str) -> Tuple[str, int, Optional[float], float]:
+    """Run one message; returns (intent, LLM requests, first text s, total s)."""
+    classifier = IntentClassifier(provider)
+    router = CommandRouter(provider)
+    requests_before = provider.requests
+
+    started = time.perf_counter()
+    first_text = None
+    intent, text_stream = await mode(classifier, router, message)
+    async for text in text_stream:
+        if first_text is None and text.strip():
+            first_text = time.perf_counter() - started
+    total = time.perf_counter() - started
+
+    return getattr(intent, "value", intent), provider.requests - requests_before, first_text, total
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8080", help="llama.cpp server")
+    args = parser.parse_args()
+
+    provider = CountingProvider(LlamaCppProvider(base_url=args.url, slots=parse_slot_map(Settings().llamacpp_slots)))
+    if not await provider.ahealth_check():
+        print(f"llama.cpp server not reachable at {args.url}")
+        return
+
+    try:
+        for name, mode in (("two_call", two_call), ("joint", joint)):
+            print(f"\n{name}")
+            print(f"{'message':<36}{'intent':>13}{'requests':>10}{'first text':>12}{'total':>9}")
+            totals = []
+            for message in MESSAGES:
+                intent, requests, first_text, total = await measure(mode, provider, message)
+                totals.append(total)
+                first = f"{first_text:.2f}s" if first_text is not None else "-"
+                print(f"{message[:35]:<36}{intent:>13}{requests:>10}{first:>12}{total:>8.2f}s")
+            print(f"{'mean':<36}{'':>13}{'':>10}{'':>12}{sum(totals) / len(totals):>8.2f}s")
+    finally:
+        await close_http_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,108 @@
+"""
+Pipeline Overlap Benchmark
+
+Compares the time until a message is classified and its tool context is
+ready when tools run before classification (the old chat pipeline) and
+when both stages overlap, with tools cancelled once the intent shows
+they are not needed.
+
+Tools and the LLM classifier are simulated with fixed delays, so the
+numbers show the pipeline structure, not the hardware.
+
+Usage (from the backend directory):
+    python -m benchmarks.pipeline_overlap
+"""
+
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.config import Settings  # noqa: E402
+from app.llm import BaseLLMProvider, LLMResponse  # noqa: E402
+from app.routers.chat import _analyze_message  # noqa: E402
+from app.services import CommandRouter, IntentClassifier  # noqa: E402
+from app.tools.manager import ToolManager  # noqa: E402
+from benchmarks.tool_execution import DELAYS, SleepTool  # noqa: E402
+
+
+# Simulated LLM classification time in seconds
+CLASSIFY_DELAY = 0.9
+
+# Messages with the intent the simulated LLM returns for them
+MESSAGES: List[Tuple[str, str]] = [
+    ("what time is it", "time"),  # Fast path; "what time" would trigger calendar
+    ("hi, what is new", "greeting"),  # Fast path; "what is" would trigger web search
+    ("who is the author of dune", "question"),  # LLM; web search is used
+    ("search the web for the hour in tokyo", "time"),  # LLM; web search not needed
+]
+
+
+class DelayProvider(BaseLLMProvider):
+    """Answers classification prompts with a fixed intent after a delay."""
+
+    def __init__(self, intents: Dict[str, str]):
+        super().__init__(model_name="simulated")
+        self.intents = intents
+
+    def generate(self, prompt: str, **kwargs) -> LLMResponse:
+        raise NotImplementedError
+
+    async def agenerate(self, prompt: str, **kwargs) -> LLMResponse:
+        raise NotImplementedError
+
+    async def astream(self, prompt: str, **kwargs) -> AsyncIterator[LLMResponse]:
+        await asyncio.sleep(CLASSIFY_DELAY)
+        intent = next((intent for message, intent in self.intents.items() if message in prompt), "general")
+        yield LLMResponse(text=json.dumps({"intent": intent, "confidence": 0.9, "entities": {}}))
+
+    def health_check(self) -> bool:
+        return True
+
+
+def make_tool_manager() -> ToolManager:
+    """Tool manager with simulated tools."""
+    manager = ToolManager(max_workers=4, timeout=2.0, timeouts={})
+    manager.tools = {name: SleepTool(name, delay) for name, delay in DELAYS.items()}
+    return manager
+
+
+async def sequential(message: str, classifier: IntentClassifier, tool_manager: ToolManager) -> str:
+    """Run the tools, then classify."""
+    tools = tool_manager.detect_tool(message)
+    if tools:
+        await tool_manager.aexecute_tools(tools, message)
+    return (await classifier.classify(message))["intent"]
+
+
+async def main() -> None:
+    settings = Settings(pipeline_mode="two_call", enable_command_routing=True, enable_intent_classification=True)
+    provider = DelayProvider(dict(MESSAGES))
+    classifier = IntentClassifier(provider)
+    router = CommandRouter(provider)
+    tool_manager = make_tool_manager()
+
+    print(f"{'message':<38}{'intent':>10}{'sequential':>12}{'overlapped':>12}  tools cancelled / stages skipped")
+    for message, _ in MESSAGES:
+        started = time.perf_counter()
+        await sequential(message, classifier, tool_manager)
+        before = time.perf_counter() - started
+
+        started = time.perf_counter()
+        analysis = await _analyze_message(message, settings, classifier, router, tool_manager)
+        after = time.perf_counter() - started
+
+        intent = getattr(analysis.intent, "value", analysis.intent)
+        cancelled = ", ".join(analysis.cancelled_tools) or "-"
+        skipped = ", ".join(analysis.skipped_stages) or "-"
+        print(f"{message:<38}{intent:>10}{before:>11.2f}s{after:>11.2f}s  {cancelled} / {skipped}")
+
+    tool_manager.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
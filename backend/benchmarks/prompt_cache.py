@@ -0,0 +1,164 @@
+"""
+Prompt Cache Benchmark
+
+Compares how many prompt tokens llama.cpp has to re-evaluate per request
+with the old prompt layout (tool context inside the system prompt) and
+the prefix-stable layout from app.services.prompts, on a single server
+slot and with one slot per task type (LLAMACPP_SLOTS).
+
+By default the llama.cpp prompt cache is simulated: a request reuses the
+longest token prefix it shares with the previous prompt in the same slot,
+which is how cache_prompt behaves. With --live the requests are sent to a
+running llama.cpp server (started with --parallel 2) and the numbers come
+from its timings instead.
+
+Usage (from the backend directory):
+    python -m benchmarks.prompt_cache
+    python -m benchmarks.prompt_cache --live http://localhost:8080
+"""
+
+import argparse
+import asyncio
+import re
+import sys
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.config import Settings  # noqa: E402
+from app.llm import LlamaCppProvider, LLMTask, parse_slot_map  # noqa: E402
+from app.llm.http_client import close_http_client  # noqa: E402
+from app.services.context_packer import format_tool_context  # noqa: E402
+from app.services.prompts import INTENT_CLASSIFICATION_PROMPT, build_prompt  # noqa: E402
+
+
+# Slot per task type when LLAMACPP_SLOTS is not set (server with --parallel 2)
+SLOT_PER_TASK = "classification:0,calculation:0,answer:1,joint:1"
+
+# Rough tokenizer for the simulation: words, punctuation and whitespace runs
+_TOKEN = re.compile(r"\w+|[^\w\s]|\s+")
+
+# (message, tool context) pairs resembling real traffic
+REQUESTS: List[Tuple[str, Dict[str, str]]] = [
+    ("what is python", {"web_search": "Web search results for 'what is python':\n\n1. Python (programming language)\n   Python is a high-level, general-purpose programming language.\n"}),
+    ("check my todo list", {"todo": "Todo list:\n\n1. ○ 🟡 Buy milk\n2. ○ 🔴 Fix the garage door\n"}),
+    ("who is ada lovelace", {"web_search": "Web search results for 'who is ada lovelace':\n\n1. Ada Lovelace\n   English mathematician, known for her work on the Analytical Engine.\n"}),
+    ("tell me a joke", {}),
+    ("find my notes about the garden", {"notes": "Notes results:\n\n📝 garden.md\n   Plant tomatoes in May. Water the herbs twice a week.\n"}),
+    ("explain recursion briefly", {"code": "Code help:\n\nRecursion: a function calling itself with a smaller input until a base case.\n"}),
+]
+
+Layout = Callable[[LLMTask, str, Dict[str, str]], Tuple[str, str]]
+
+
+def legacy_layout(task: LLMTask, message: str, tool_context: Dict[str, str]) -> Tuple[str, str]:
+    """Prompt layout before prefix-stable prompts: context in the system prompt."""
+    if task == LLMTask.CLASSIFICATION:
+        return INTENT_CLASSIFICATION_PROMPT, f'User: "{message}"\n\nClassify:'
+
+    system_prompt = "You are JARVIS, a helpful assistant. Answer briefly and directly."
+    if tool_context:
+        system_prompt += f"\n\nYou have access to current information:\n{format_tool_context(tool_context)}"
+    return system_prompt, message
+
+
+def stable_layout(task: LLMTask, message: str, tool_context: Dict[str, str]) -> Tuple[str, str]:
+    """Current layout from app.services.prompts."""
+    return build_prompt(task, message, format_tool_context(tool_context))
+
+
+# Task sequence per chat request. Pattern-matched or cached classifications
+# skip the classification call, so both shapes occur in practice.
+SCENARIOS: Dict[str, Tuple[LLMTask, ...]] = {
+    "answer only": (LLMTask.ANSWER,),
+    "classify + answer": (LLMTask.CLASSIFICATION, LLMTask.ANSWER),
+}
+
+
+def request_sequence(layout: Layout, tasks: Tuple[LLMTask, ...]) -> List[Tuple[LLMTask, str, str]]:
+    """Render the LLM calls made for REQUESTS, in order."""
+    sequence = []
+    for message, tool_context in REQUESTS:
+        for task in tasks:
+            system_prompt, prompt = layout(task, message, tool_context)
+            sequence.append((task, system_prompt, prompt))
+    return sequence
+
+
+def simulate(provider: LlamaCppProvider, layout: Layout, tasks: Tuple[LLMTask, ...]) -> List[Tuple[str, int, int]]:
+    """Simulate the per-slot prompt cache; returns (task, evaluated, reused)."""
+    results = []
+    previous: Dict[Optional[int], List[str]] = {}
+
+    for task, system_prompt, prompt in request_sequence(layout, tasks):
+        slot = provider._slot_for(task)
+        tokens = _TOKEN.findall(provider.format_prompt(prompt, system_prompt))
+        cached = previous.get(slot, [])
+        reused = 0
+        while reused < min(len(tokens), len(cached)) and tokens[reused] == cached[reused]:
+            reused += 1
+        results.append((task.value, len(tokens) - reused, reused))
+        previous[slot] = tokens
+
+    return results
+
+
+async def measure(
+    provider: LlamaCppProvider,
+    layout: Layout,
+    tasks: Tuple[LLMTask, ...]
+) -> List[Tuple[str, Optional[int], Optional[int]]]:
+    """Send the sequence to a live server; returns (task, evaluated, reused)."""
+    results = []
+
+    for task, system_prompt, prompt in request_sequence(layout, tasks):
+        response = await provider.agenerate(prompt=prompt, system_prompt=system_prompt, max_tokens=1, task=task)
+        if response.error:
+            raise SystemExit(response.error)
+        stats = response.metadata or {}
+        results.append((task.value, stats.get("prompt_evaluated"), stats.get("prompt_reused")))
+
+    return results
+
+
+def report(name: str, results: List[Tuple[str, Optional[int], Optional[int]]]) -> None:
+    print(f"\n{name}")
+    print(f"{'#':>3}  {'task':<15}{'evaluated':>10}{'reused':>10}")
+    for index, (task, evaluated, reused) in enumerate(results, 1):
+        print(f"{index:>3}  {task:<15}{evaluated if evaluated is not None else '-':>10}{reused if reused is not None else '-':>10}")
+
+    evaluated_total = sum(result[1] or 0 for result in results)
+    reused_total = sum(result[2] or 0 for result in results)
+    total = evaluated_total + reused_total
+    share = reused_total / total if total else 0.0
+    print(f"     {'total':<15}{evaluated_total:>10}{reused_total:>10}   ({share:.0%} reused)")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--live", metavar="URL", help="llama.cpp server to measure instead of simulating")
+    args = parser.parse_args()
+
+    base_url = args.live or "http://localhost:8080"
+    providers = [
+        ("single slot", LlamaCppProvider(base_url=base_url)),
+        ("slot per task", LlamaCppProvider(base_url=base_url, slots=parse_slot_map(Settings().llamacpp_slots or SLOT_PER_TASK))),
+    ]
+    layouts = [("legacy layout (context in system prompt)", legacy_layout), ("prefix-stable layout", stable_layout)]
+
+    try:
+        for scenario, tasks in SCENARIOS.items():
+            for slot_name, provider in providers:
+                for name, layout in layouts:
+                    if args.live:
+                        results = await measure(provider, layout, tasks)
+                    else:
+                        results = simulate(provider, layout, tasks)
+                    report(f"{scenario}, {slot_name}: {name}", results)
+    finally:
+        await close_http_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,87 @@
+"""
+Tool Execution Benchmark
+
+Compares running the detected tools one after another (the old chat
+pipeline) with concurrent execution under per-tool deadlines. The tools
+are simulated with fixed delays, including one that hangs well past its
+deadline, so the numbers do not depend on the network or the home
+directory.
+
+Usage (from the backend directory):
+    python -m benchmarks.tool_execution
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.tools.base import BaseTool, ToolResult  # noqa: E402
+from app.tools.manager import ToolManager  # noqa: E402
+
+
+# Simulated tool latencies in seconds
+DELAYS: Dict[str, float] = {
+    "web_search": 1.2,
+    "file_search": 0.8,
+    "notes": 0.05,
+    "todo": 0.05,
+    "calendar": 0.02,
+}
+
+# Tool sets detected for one message each
+CASES: List[Tuple[str, List[str]]] = [
+    ("notes + todo", ["notes", "todo"]),
+    ("web + file search", ["web_search", "file_search"]),
+    ("web + file + calendar", ["web_search", "file_search", "calendar"]),
+    ("web search hangs", ["web_search", "notes"]),
+]
+
+
+class SleepTool(BaseTool):
+    """Returns after a fixed delay."""
+
+    def __init__(self, name: str, delay: float):
+        super().__init__(name=name, description=f"Sleeps {delay}s")
+        self.delay = delay
+
+    def execute(self, query: str, **kwargs) -> ToolResult:
+        time.sleep(self.delay)
+        return ToolResult(success=True, data=None, context=f"{self.name} result")
+
+    def is_available(self) -> bool:
+        return True
+
+
+def make_manager(hanging: bool) -> ToolManager:
+    """Tool manager with simulated tools (web_search takes 10 s if hanging)."""
+    manager = ToolManager(max_workers=4, timeout=1.0, timeouts={"web_search": 1.5})
+    manager.tools = {name: SleepTool(name, delay) for name, delay in DELAYS.items()}
+    if hanging:
+        manager.tools["web_search"] = SleepTool("web_search", 10.0)
+    return manager
+
+
+async def main() -> None:
+    print(f"{'tools':<24}{'sequential':>12}{'concurrent':>12}  timed out")
+    for name, tools in CASES:
+        hanging = name.endswith("hangs")
+        manager = make_manager(hanging)
+
+        # Sequential: what the pipeline used to do (a hanging tool is not
+        # actually waited for here; its full delay is added)
+        sequential = sum(manager.tools[tool].delay for tool in tools)
+
+        started = time.perf_counter()
+        run = await manager.aexecute_tools(tools, "query")
+        concurrent = time.perf_counter() - started
+
+        print(f"{name:<24}{sequential:>11.2f}s{concurrent:>11.2f}s  {', '.join(run.timed_out) or '-'}")
+        manager.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
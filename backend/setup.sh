@@ -46,6 +46,6 @@ echo "📚 Next steps:"
 echo "1. Edit .env to configure your LLM provider (Ollama or llama.cpp)"
 echo "2. Start your LLM server:"
 echo "   - Ollama: ollama run qwen:1.5b-chat-v1.5-q4_0"
-echo "   - llama.cpp: ./server -m models/qwen-1_5b-chat-q4_0.gguf -c 2048 -ngl 0"
+echo "   - llama.cpp: ./server -m models/qwen-1_5b-chat-q4_0.gguf -c 4096 --parallel 2 -ngl 0"
 echo "3. Run './run.sh' to start JARVIS"
 echo ""
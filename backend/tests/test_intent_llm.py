@@ -0,0 +1,50 @@
+"""
+Tests for the LLM tier of the intent classifier with cut-off streams.
+"""
+
+import asyncio
+from typing import AsyncIterator, List
+
+from app.llm import BaseLLMProvider, DEADLINE_EXCEEDED, LLMResponse
+from app.services.intent_classifier import IntentClassifier, IntentType
+
+
+class CutOffProvider(BaseLLMProvider):
+    """Streams the given JSON pieces, then reports the deadline."""
+
+    def __init__(self, pieces: List[str]):
+        super().__init__(model_name="cut-off")
+        self.pieces = pieces
+
+    def generate(self, prompt: str, **kwargs) -> LLMResponse:
+        raise NotImplementedError
+
+    async def agenerate(self, prompt: str, **kwargs) -> LLMResponse:
+        raise NotImplementedError
+
+    async def astream(self, prompt: str, **kwargs) -> AsyncIterator[LLMResponse]:
+        for piece in self.pieces:
+            yield LLMResponse(text=piece)
+        yield LLMResponse(text="", error=DEADLINE_EXCEEDED)
+
+    def health_check(self) -> bool:
+        return True
+
+
+def _classify(pieces: List[str]) -> dict:
+    return asyncio.run(IntentClassifier(CutOffProvider(pieces)).classify_llm("what's the weather in Paris"))
+
+
+def test_truncated_intent_label_is_an_error():
+    result = _classify(['{"intent": "wea'])
+
+    assert result["intent"] == IntentType.UNKNOWN
+    assert result["error"] == DEADLINE_EXCEEDED
+
+
+def test_complete_intent_label_is_used_when_cut_later():
+    result = _classify(['{"intent": "weather", ', '"confidence": 0.9, "entities": {"location": "Par'])
+
+    assert "error" not in result
+    assert result["intent"] == IntentType.WEATHER
+    assert result["entities"] == {"location": "Par"}
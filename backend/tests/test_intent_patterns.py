@@ -0,0 +1,46 @@
+"""
+Tests for the pattern tier of the intent classifier: timers, reminders
+and calendar entries are only created for explicit create requests.
+"""
+
+import pytest
+
+from app.services.intent_classifier import IntentClassifier, IntentType
+
+
+@pytest.fixture
+def classifier():
+    return IntentClassifier(llm_provider=None)
+
+
+@pytest.mark.parametrize("message, intent", [
+    ("remind me to call mom at 5pm", IntentType.REMINDER),
+    ("don't let me forget the keys tomorrow", IntentType.REMINDER),
+    ("wake me up at 7", IntentType.REMINDER),
+    ("set an alarm for 7am", IntentType.REMINDER),
+    ("add a meeting with Sam on friday at 3", IntentType.REMINDER),
+    ("schedule a call with Ana tomorrow at 10", IntentType.REMINDER),
+    ("put the dentist on my calendar for friday at 3", IntentType.REMINDER),
+    ("set a timer for ten minutes", IntentType.TIMER),
+    ("set a 10 minute timer", IntentType.TIMER),
+    ("can you start a countdown for 30 seconds", IntentType.TIMER),
+])
+def test_create_requests_match(classifier, message, intent):
+    result = classifier._check_simple_patterns(message)
+    assert result is not None
+    assert result["intent"] == intent
+    assert "due" in result["entities"]
+
+
+@pytest.mark.parametrize("message", [
+    "do I have a reminder tomorrow",
+    "cancel my reminder for tomorrow",
+    "cancel the alarm at 7am",
+    "delete the timer for 5 minutes",
+    "how much time is left on my 10 minute timer",
+    "what's on my calendar tomorrow",
+    "show my schedule for tomorrow",
+    "did I set a reminder for tomorrow",
+])
+def test_queries_and_cancellations_dont_match(classifier, message):
+    assert classifier._check_simple_patterns(message) is None
@@ -0,0 +1,83 @@
+"""
+Tests for load shedding at the chat endpoints: requests the LLM queue
+rejects get 503 with Retry-After through the full provider stack
+(metrics, scheduling, single-flight, cache and deadline layers).
+"""
+
+import asyncio
+import json
+from typing import AsyncIterator, List
+
+import httpx
+import pytest
+
+from app import dependencies
+from app.config import settings
+from app.llm import BaseLLMProvider, LLMResponse, LLMTask
+from app.main import app
+
+
+class SlowProvider(BaseLLMProvider):
+    """Stand-in for the LLM server: streams a few chunks slowly."""
+
+    def __init__(self, **kwargs):
+        super().__init__(model_name="slow")
+
+    def generate(self, prompt: str, **kwargs) -> LLMResponse:
+        raise NotImplementedError
+
+    async def agenerate(self, prompt: str, **kwargs) -> LLMResponse:
+        text = "".join([chunk.text async for chunk in self.astream(prompt, **kwargs)])
+        return LLMResponse(text=text)
+
+    async def astream(self, prompt: str, **kwargs) -> AsyncIterator[LLMResponse]:
+        if kwargs.get("task") == LLMTask.CLASSIFICATION:
+            chunks = [json.dumps({"intent": "general", "confidence": 0.9, "entities": {}})]
+        else:
+            chunks = ["Once ", "upon ", "a ", "time."]
+        for text in chunks:
+            await asyncio.sleep(0.1)
+            yield LLMResponse(text=text)
+
+    def health_check(self) -> bool:
+        return True
+
+
+@pytest.fixture
+def overloaded_app(monkeypatch, tmp_path):
+    """The app with a slow LLM, one LLM slot and no queue; default wrapper layers."""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setattr(dependencies, "get_llm_provider", SlowProvider)
+    for name, value in {
+        "llm_max_concurrency": 1,
+        "llm_max_queue": 0,
+        "llamacpp_warm_start": False,
+        "local_classifier_enabled": False,  # Every message needs the LLM to classify
+        "intent_log_path": None,
+        "timers_journal_path": None,
+    }.items():
+        monkeypatch.setattr(settings, name, value)
+    return app
+
+
+async def _post_concurrently(path: str, messages: List[str]) -> List[httpx.Response]:
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(client.post(path, json={"message": message}) for message in messages))
+
+
+@pytest.mark.parametrize("path", ["/api/chat", "/api/chat/stream"])
+def test_rejected_requests_get_503_with_retry_after(overloaded_app, path):
+    # Different messages, so single-flight doesn't share one generation
+    messages = ["tell me a story about cats", "tell me a story about dogs", "tell me a story about owls"]
+
+    responses = asyncio.run(_post_concurrently(path, messages))
+
+    statuses = sorted(response.status_code for response in responses)
+    assert statuses == [200, 503, 503]
+    for response in responses:
+        if response.status_code == 503:
+            assert int(response.headers["Retry-After"]) >= 1
+        else:
+            assert "Once upon a time." in response.text
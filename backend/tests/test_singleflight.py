@@ -0,0 +1,64 @@
+"""
+Tests for the single-flight layer's shared streams.
+"""
+
+import asyncio
+import gc
+from typing import AsyncIterator, List
+
+from app.llm import BaseLLMProvider, LLMResponse, SingleFlightProvider
+
+
+class FailingStreamProvider(BaseLLMProvider):
+    """Streams two chunks, then raises."""
+
+    def __init__(self):
+        super().__init__(model_name="failing")
+        self.streams = 0
+
+    def generate(self, prompt: str, **kwargs) -> LLMResponse:
+        raise NotImplementedError
+
+    async def agenerate(self, prompt: str, **kwargs) -> LLMResponse:
+        raise NotImplementedError
+
+    async def astream(self, prompt: str, **kwargs) -> AsyncIterator[LLMResponse]:
+        self.streams += 1
+        for text in ("Hello", " world"):
+            await asyncio.sleep(0.01)
+            yield LLMResponse(text=text)
+        raise RuntimeError("backend went away")
+
+    def health_check(self) -> bool:
+        return True
+
+
+async def _collect(provider: BaseLLMProvider, texts: List[str]) -> None:
+    async for chunk in provider.astream("same prompt"):
+        texts.append(chunk.text)
+
+
+def test_upstream_error_reaches_every_subscriber():
+    async def run():
+        unhandled = []
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: unhandled.append(context))
+        source = FailingStreamProvider()
+        provider = SingleFlightProvider(source)
+        texts: List[List[str]] = [[], [], []]
+
+        results = await asyncio.gather(*(_collect(provider, t) for t in texts), return_exceptions=True)
+
+        assert source.streams == 1
+        assert provider.coalesced == 2
+        for result, received in zip(results, texts):
+            assert isinstance(result, RuntimeError)
+            assert str(result) == "backend went away"
+            # The chunks streamed before the error are delivered first
+            assert received == ["Hello", " world"]
+
+        # The error was handed on, not left in the background task
+        await asyncio.sleep(0)
+        gc.collect()
+        assert unhandled == []
+
+    asyncio.run(run())